@@ -2,22 +2,800 @@
 Base class for AI-specific handlers
 """
 
-from abc import ABC, abstractmethod
-from typing import Optional
-from playwright.async_api import Page
+import asyncio
+import logging
+from abc import ABC
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from playwright.async_api import ElementHandle, Page
+
+from .config_store import current_config
+from .handler_spec import SpecError, load_spec, parse_spec
+from .network_capture import NetworkCapture
+from .selector_memo import selector_memo
+
+logger = logging.getLogger("terminail-mcp-handler")
+
+# Start of the placeholder returned when no answer could be extracted
+NO_ANSWER_PREFIX = "No answer found"
+
+# In-page completion detector. A MutationObserver wakes the check whenever the
+# page changes; the answer counts as finished once its text has been stable for
+# stableMs and no "stop generating" control is visible.
+ANSWER_COMPLETION_SCRIPT = """
+({answerSelectors, stopSelectors, stableMs, startTimeoutMs, timeoutMs}) => new Promise((resolve) => {
+    const readAnswer = () => {
+        for (const selector of answerSelectors) {
+            let nodes;
+            try {
+                nodes = document.querySelectorAll(selector);
+            } catch (e) {
+                continue;
+            }
+            if (nodes.length) {
+                return nodes[nodes.length - 1].textContent || '';
+            }
+        }
+        return '';
+    };
+    const isBusy = () => stopSelectors.some((selector) => {
+        try {
+            const element = document.querySelector(selector);
+            return !!element && element.getClientRects().length > 0;
+        } catch (e) {
+            return false;
+        }
+    });
+
+    let lastText = readAnswer();
+    let started = false;
+    let settleTimer = null;
+    let checkPending = false;
+    let observer = null;
+    const timers = [];
+
+    const finish = (status) => {
+        if (observer) {
+            observer.disconnect();
+        }
+        clearTimeout(settleTimer);
+        timers.forEach(clearTimeout);
+        resolve({status, text: lastText});
+    };
+    const settle = () => {
+        if (isBusy()) {
+            started = true;
+            settleTimer = setTimeout(settle, stableMs);
+        } else if (started) {
+            finish('complete');
+        }
+    };
+    const armSettle = () => {
+        clearTimeout(settleTimer);
+        settleTimer = setTimeout(settle, stableMs);
+    };
+    const check = () => {
+        checkPending = false;
+        const text = readAnswer();
+        if (text !== lastText) {
+            lastText = text;
+            started = true;
+            armSettle();
+        } else if (!started && isBusy()) {
+            started = true;
+            armSettle();
+        }
+    };
+
+    observer = new MutationObserver(() => {
+        if (!checkPending) {
+            checkPending = true;
+            setTimeout(check, 50);
+        }
+    });
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+
+    timers.push(setTimeout(() => {
+        if (!started && !isBusy()) {
+            finish('idle');
+        }
+    }, startTimeoutMs));
+    timers.push(setTimeout(() => finish('timeout'), timeoutMs));
+    check();
+})
+"""
+
+# One-shot read of the current answer text and generation state, used when
+# streaming the answer as it renders
+ANSWER_SNAPSHOT_SCRIPT = """
+({answerSelectors, stopSelectors}) => {
+    let text = '';
+    for (const selector of answerSelectors) {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(selector);
+        } catch (e) {
+            continue;
+        }
+        if (nodes.length) {
+            text = nodes[nodes.length - 1].textContent || '';
+            break;
+        }
+    }
+    const busy = stopSelectors.some((selector) => {
+        try {
+            const element = document.querySelector(selector);
+            return !!element && element.getClientRects().length > 0;
+        } catch (e) {
+            return false;
+        }
+    });
+    return {text, busy};
+}
+"""
+
+# Resolves a selector cascade in one round-trip: returns the index of the first
+# selector that matches (optionally only counting nodes with text) and the
+# indices of selectors the DOM could not parse, such as Playwright's :has-text()
+SELECTOR_CASCADE_SCRIPT = """
+({selectors, requireText, allNodes}) => {
+    const unsupported = [];
+    for (let i = 0; i < selectors.length; i++) {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(selectors[i]);
+        } catch (e) {
+            unsupported.push(i);
+            continue;
+        }
+        if (!nodes.length) {
+            continue;
+        }
+        if (requireText) {
+            const candidates = allNodes ? Array.from(nodes) : [nodes[0]];
+            if (!candidates.some((node) => (node.textContent || '').trim())) {
+                continue;
+            }
+        }
+        return {index: i, unsupported};
+    }
+    return {index: -1, unsupported};
+}
+"""
+
+# Turns answer nodes into text: plain textContent, or markdown that keeps code
+# blocks, headings, lists, quotes and tables. Shared by the extraction scripts.
+_NODE_TEXT_JS = r"""
+const BLOCK_TAGS = new Set(['p', 'div', 'section', 'article', 'header', 'footer', 'main',
+    'figure', 'details', 'summary', 'li', 'dl', 'dd', 'dt']);
+const inlineNode = (node) => {
+    if (node.nodeType === Node.TEXT_NODE) {
+        return node.textContent.replace(/\s+/g, ' ');
+    }
+    if (node.nodeType !== Node.ELEMENT_NODE) {
+        return '';
+    }
+    const tag = node.tagName.toLowerCase();
+    const inner = inline(node);
+    if (tag === 'code') {
+        return '`' + node.textContent + '`';
+    }
+    if (tag === 'br') {
+        return '\n';
+    }
+    if ((tag === 'strong' || tag === 'b') && inner.trim()) {
+        return '**' + inner.trim() + '**';
+    }
+    if ((tag === 'em' || tag === 'i') && inner.trim()) {
+        return '*' + inner.trim() + '*';
+    }
+    if (tag === 'a' && node.getAttribute('href') && inner.trim()) {
+        return '[' + inner.trim() + '](' + node.getAttribute('href') + ')';
+    }
+    return inner;
+};
+const inline = (node) => Array.from(node.childNodes).map(inlineNode).join('');
+const table = (node) => {
+    const rows = Array.from(node.querySelectorAll('tr')).map((row) =>
+        Array.from(row.children).map((cell) => inline(cell).trim().replace(/\|/g, '\\|')));
+    if (!rows.length) {
+        return '';
+    }
+    const width = Math.max(...rows.map((row) => row.length));
+    const line = (cells) => '| ' + Array.from({length: width}, (_, i) => cells[i] || '').join(' | ') + ' |';
+    return [line(rows[0]), line(Array(width).fill('---')), ...rows.slice(1).map(line)].join('\n');
+};
+const list = (node, depth) => {
+    const ordered = node.tagName.toLowerCase() === 'ol';
+    let number = parseInt(node.getAttribute('start') || '1', 10);
+    const indent = '  '.repeat(depth);
+    const lines = [];
+    for (const item of node.children) {
+        if (item.tagName.toLowerCase() !== 'li') {
+            continue;
+        }
+        const marker = ordered ? (number++) + '.' : '-';
+        const [first, ...rest] = blocks(item, depth + 1).replace(/\n{2,}/g, '\n').split('\n');
+        lines.push(indent + marker + ' ' + (first || ''));
+        for (const line of rest) {
+            lines.push(line.startsWith(indent + '  ') ? line : indent + '  ' + line);
+        }
+    }
+    return lines.join('\n');
+};
+const blocks = (node, depth) => {
+    const out = [];
+    let text = '';
+    const flush = () => {
+        if (text.trim()) {
+            out.push(text.trim());
+        }
+        text = '';
+    };
+    for (const child of node.childNodes) {
+        const tag = child.nodeType === Node.ELEMENT_NODE ? child.tagName.toLowerCase() : '';
+        if (tag === 'pre') {
+            flush();
+            const code = child.querySelector('code') || child;
+            const language = (code.className || '').match(/language-([\w+#-]+)/);
+            out.push('```' + (language ? language[1] : '') + '\n' + code.textContent.replace(/\n$/, '') + '\n```');
+        } else if (/^h[1-6]$/.test(tag)) {
+            flush();
+            out.push('#'.repeat(Number(tag[1])) + ' ' + inline(child).trim());
+        } else if (tag === 'ul' || tag === 'ol') {
+            flush();
+            out.push(list(child, depth));
+        } else if (tag === 'blockquote') {
+            flush();
+            out.push(blocks(child, depth).split('\n').map((line) => '> ' + line).join('\n'));
+        } else if (tag === 'table') {
+            flush();
+            out.push(table(child));
+        } else if (tag === 'hr') {
+            flush();
+            out.push('---');
+        } else if (BLOCK_TAGS.has(tag)) {
+            flush();
+            const inner = blocks(child, depth);
+            if (inner) {
+                out.push(inner);
+            }
+        } else {
+            text += inlineNode(child);
+        }
+    }
+    flush();
+    return out.join('\n\n');
+};
+const nodeText = (node, markdown) => markdown
+    ? blocks({childNodes: [node]}, 0).trim()
+    : (node.textContent || '').trim();
+const nodesText = (nodes, allNodes, markdown, skip = 0) => Array.from(nodes)
+    .slice(skip, allNodes ? undefined : skip + 1)
+    .map((node) => nodeText(node, markdown))
+    .filter((text) => text)
+    .join(markdown ? '\n\n' : '\n');
+"""
+
+# Counts the nodes each answer selector matches, before a question is sent, so
+# that extraction can leave out earlier answers of the conversation
+ANSWER_COUNT_SCRIPT = """
+({selectors}) => {
+    const counts = {};
+    const unsupported = [];
+    for (let i = 0; i < selectors.length; i++) {
+        try {
+            counts[selectors[i]] = document.querySelectorAll(selectors[i]).length;
+        } catch (e) {
+            unsupported.push(i);
+        }
+    }
+    return {counts, unsupported};
+}
+"""
+
+# Extracts the answer text in one round-trip: the text of the first selector
+# whose nodes have any, plus the indices of selectors the DOM could not parse.
+# The first seen[selector] nodes of a selector belong to earlier answers.
+ANSWER_TEXT_SCRIPT = """
+({selectors, allNodes, markdown, seen}) => {
+%s
+    const unsupported = [];
+    for (let i = 0; i < selectors.length; i++) {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(selectors[i]);
+        } catch (e) {
+            unsupported.push(i);
+            continue;
+        }
+        const skip = (seen || {})[selectors[i]] || 0;
+        const text = nodes.length > skip ? nodesText(nodes, allNodes, markdown, skip) : '';
+        if (text) {
+            return {index: i, text, unsupported};
+        }
+    }
+    return {index: -1, text: '', unsupported};
+}
+""" % _NODE_TEXT_JS
+
+# Same text extraction for nodes Playwright already selected (eval_on_selector_all),
+# used for selectors only Playwright understands
+NODES_TEXT_SCRIPT = """
+(nodes, {allNodes, markdown, skip}) => {
+%s
+    return nodesText(nodes, allNodes, markdown, skip);
+}
+""" % _NODE_TEXT_JS
+
+def _same_site(current: str, target: str) -> bool:
+    """Check that current is on the origin of target and below its path"""
+    current_parts = urlsplit(current)
+    target_parts = urlsplit(target)
+    if (current_parts.scheme, current_parts.netloc) != (target_parts.scheme, target_parts.netloc):
+        return False
+    target_path = target_parts.path.rstrip("/")
+    return not target_path or current_parts.path.rstrip("/").startswith(target_path)
+
+
+@dataclass
+class AnswerDelta:
+    """Incremental piece of an answer being rendered
+
+    When replace is True the page re-rendered text that was already sent
+    (e.g. markdown formatting kicked in) and text holds the full answer so far.
+    """
+    text: str
+    replace: bool = False
+
+
+class Answer(str):
+    """Answer text that also tells how waiting for it ended
+
+    status is 'complete' when the answer settled, or the 'idle', 'timeout'
+    or 'unknown' status of wait_for_answer_complete when it was read
+    without having settled.
+    """
+    status: str
+
+    def __new__(cls, text: str, status: str = "complete"):
+        answer = super().__new__(cls, text)
+        answer.status = status
+        return answer
+
+    @property
+    def complete(self) -> bool:
+        return self.status == "complete"
+
 
 class AIHandler(ABC):
-    """Base class for AI-specific handlers"""
-    
+    """Base class for AI-specific handlers
+
+    Sites are described by specs (handler_specs/<service id>.yaml, plus the
+    handler section of the service in config.yaml) rather than code; a
+    subclass binds a spec with ``class MyHandler(AIHandler, spec="my-ai")``
+    and only needs methods of its own for sites the spec cannot describe.
+    """
+
+    # Human readable service name used in messages
+    display_name: str = "AI service"
+    # Service id in config.yaml and the URL used when it is not configured
+    service_id: str = ""
+    default_url: str = ""
+
+    # Selectors for the chat input, tried in order (configured by each handler)
+    input_selectors: List[str] = []
+    # Send buttons, tried in order; Enter is pressed when none is found
+    button_selectors: List[str] = [
+        "button[type='submit']",
+        ".send-button",
+        "[data-testid='send-button']"
+    ]
+    # Submit by pressing Enter in the input instead of clicking a send button
+    submit_with_enter: bool = False
+    # Selectors for the answer area, tried in order (configured by each handler)
+    answer_selectors: List[str] = []
+    # Join the text of every node the answer selector matches instead of using the first
+    join_answer_nodes: bool = False
+    # Controls that are only visible while the answer is still being generated
+    stop_selectors: List[str] = [
+        "[data-testid='stop-button']",
+        "button[aria-label*='Stop']",
+        "button[aria-label*='停止']",
+        ".stop-generating",
+        ".stop-button"
+    ]
+    # Time the answer text must stay unchanged before it counts as finished (ms)
+    answer_stable_ms: int = 1500
+    # Give up if the answer has not started changing within this time (ms)
+    answer_start_timeout_ms: int = 10000
+    # Interval between answer snapshots while streaming (ms)
+    stream_poll_ms: int = 200
+    # How long an already loaded page may take to show its input (ms)
+    ready_check_ms: int = 500
+    # Completion request the site streams its answer from (URL regex) and its
+    # format in network_capture.PARSERS; used when browser.network_capture is on
+    network_pattern: Optional[str] = None
+    network_format: Optional[str] = None
+
+    # URL each service actually ended up on after redirects, by service id
+    _landed_urls: Dict[str, str] = {}
+
+    def __init_subclass__(cls, spec: Optional[str] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if spec is not None:
+            cls.service_id = spec
+            for attribute, value in load_spec(spec).items():
+                setattr(cls, attribute, value)
+
     def __init__(self, page: Page):
         self.page = page
-    
-    @abstractmethod
-    async def ask_question(self, question: str) -> str:
-        """Ask a question to the AI service and return the response"""
-        pass
-    
-    @abstractmethod
+        # Answer nodes each selector matched before the last question was sent
+        self.previous_answer_nodes: Dict[str, int] = {}
+        # Settings stay fixed for the lifetime of the handler, even if config.yaml is reloaded
+        self.config = current_config()
+        self.service = self.config.services.get(self.service_id) if self.service_id else None
+        if self.service and self.service.handler:
+            try:
+                # Tuning from config.yaml applies to this handler only
+                for attribute, value in parse_spec(self.service.handler).items():
+                    setattr(self, attribute, value)
+            except SpecError as e:
+                logger.warning(f"{type(self).__name__}: ignoring handler settings of {self.service_id}: {e}")
+
+    @property
+    def service_url(self) -> str:
+        """URL of the AI service, taken from configuration when available"""
+        return self.service.url if self.service else self.default_url
+
+    def is_on_service(self) -> bool:
+        """Check whether the page is already showing the AI service"""
+        current = getattr(self.page, "url", None)
+        if not isinstance(current, str):
+            return False
+        targets = [self.service_url, self._landed_urls.get(self.service_id)]
+        return any(_same_site(current, target) for target in targets if target)
+
+    async def wait_for_input_ready(self, timeout_ms: Optional[int] = None) -> bool:
+        """Wait until one of the input selectors is visible; returns False on timeout"""
+        if not self.input_selectors:
+            return True
+        if timeout_ms is None:
+            timeout_ms = self.config.operation_timeout
+        try:
+            await self.page.wait_for_selector(
+                ", ".join(self.input_selectors), state="visible", timeout=timeout_ms
+            )
+            return True
+        except Exception:
+            return False
+
     async def navigate_to_service(self) -> None:
-        """Navigate to the AI service website"""
-        pass
\ No newline at end of file
+        """Navigate to the AI service website unless the page is already there and ready"""
+        if not self.page:
+            raise RuntimeError("Browser page not available")
+
+        if self.is_on_service() and await self.wait_for_input_ready(self.ready_check_ms):
+            logger.debug(f"{type(self).__name__}: page already on service, skipping navigation")
+            return
+
+        await self.page.goto(self.service_url)
+        landed = getattr(self.page, "url", None)
+        if self.service_id and isinstance(landed, str):
+            self._landed_urls[self.service_id] = landed
+
+        if not await self.wait_for_input_ready():
+            logger.warning(f"{type(self).__name__}: input not ready after navigation")
+
+    async def wait_for_answer_complete(self, timeout_ms: Optional[int] = None) -> str:
+        """Wait until the answer has finished rendering and return the completion status
+
+        The status is 'complete' when the answer settled, 'idle' when no answer
+        started within answer_start_timeout_ms and 'timeout' when the overall
+        limit (browser.response_timeout by default) was reached.
+        """
+        if not self.page:
+            raise RuntimeError("Browser page not available")
+
+        if timeout_ms is None:
+            timeout_ms = self.config.response_timeout
+
+        result = await self.page.evaluate(ANSWER_COMPLETION_SCRIPT, {
+            "answerSelectors": self.cascade("answer", self.answer_selectors),
+            "stopSelectors": list(self.stop_selectors),
+            "stableMs": self.answer_stable_ms,
+            "startTimeoutMs": min(self.answer_start_timeout_ms, timeout_ms),
+            "timeoutMs": timeout_ms
+        })
+
+        status = result.get("status", "unknown") if isinstance(result, dict) else "unknown"
+        if status == "timeout":
+            logger.warning(f"{type(self).__name__}: answer did not complete within {timeout_ms} ms")
+        elif status == "idle":
+            logger.warning(f"{type(self).__name__}: no answer activity detected")
+        return status
+
+    async def snapshot_answer(self) -> dict:
+        """Read the current answer text and whether the answer is still being generated"""
+        result = await self.page.evaluate(ANSWER_SNAPSHOT_SCRIPT, {
+            "answerSelectors": self.cascade("answer", self.answer_selectors),
+            "stopSelectors": list(self.stop_selectors)
+        })
+        if not isinstance(result, dict):
+            return {"text": "", "busy": False}
+        return {"text": (result.get("text") or "").strip(), "busy": bool(result.get("busy"))}
+
+    @property
+    def captures_network(self) -> bool:
+        """Whether answers are read from the completion response instead of the page"""
+        return bool(self.network_pattern and self.network_format
+                    and self.config.browser.get('network_capture', False))
+
+    async def ask_question(self, question: str) -> Answer:
+        """Ask a question to the AI service and return the response with its completion status"""
+        self.previous_answer_nodes = await self.count_answer_nodes()
+        status = "complete"
+        if self.captures_network:
+            async with NetworkCapture(self.page, self.network_pattern, self.network_format) as capture:
+                await self.submit_question(question)
+                result = await capture.wait(self.answer_start_timeout_ms, self.config.response_timeout)
+            if result.text:
+                return Answer(result.text)
+            if not result.completed:
+                logger.debug(f"{type(self).__name__}: no completion response captured, watching the page")
+                status = await self.wait_for_answer_complete()
+        else:
+            await self.submit_question(question)
+
+            # Wait until the answer has finished rendering
+            status = await self.wait_for_answer_complete()
+
+        answer = await self.extract_answer()
+        if answer:
+            return Answer(answer, status)
+        return Answer(f"No answer found from {self.display_name} - please check the website structure", status)
+
+    async def check_selectors(self) -> Dict[str, bool]:
+        """Check that the page offers what asking a question needs
+
+        input is True when an input selector resolves and submit when a send
+        button resolves or the handler submits with Enter anyway.
+        """
+        has_input = bool(await self.find_elements(self.input_selectors, cascade="input"))
+        can_submit = self.submit_with_enter or bool(await self.find_elements(self.button_selectors, cascade="button"))
+        return {"input": has_input, "submit": can_submit}
+
+    async def stream_answer(self, question: str, timeout_ms: Optional[int] = None) -> AsyncIterator[AnswerDelta]:
+        """Ask a question and yield the answer incrementally as the page renders it
+
+        Completion follows the same rules as wait_for_answer_complete. Callers
+        should use extract_answer afterwards for the authoritative full text.
+        """
+        if not self.page:
+            raise RuntimeError("Browser page not available")
+
+        if timeout_ms is None:
+            timeout_ms = self.config.response_timeout
+
+        # The answer selectors may still match the previous answer on the page
+        previous = (await self.snapshot_answer())["text"]
+        self.previous_answer_nodes = await self.count_answer_nodes()
+        await self.submit_question(question)
+
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        changed_at = started_at
+        started = False
+        sent = ""
+        while True:
+            await asyncio.sleep(self.stream_poll_ms / 1000)
+            now = loop.time()
+            snapshot = await self.snapshot_answer()
+            text = snapshot["text"]
+
+            if not started and (snapshot["busy"] or (text and text != previous)):
+                started = True
+            if started and text != sent:
+                changed_at = now
+                if text.startswith(sent):
+                    yield AnswerDelta(text[len(sent):])
+                else:
+                    yield AnswerDelta(text, replace=True)
+                sent = text
+
+            elapsed_ms = (now - started_at) * 1000
+            if started and not snapshot["busy"] and (now - changed_at) * 1000 >= self.answer_stable_ms:
+                return
+            if not started and elapsed_ms >= min(self.answer_start_timeout_ms, timeout_ms):
+                logger.warning(f"{type(self).__name__}: no answer activity detected")
+                return
+            if elapsed_ms >= timeout_ms:
+                logger.warning(f"{type(self).__name__}: answer did not complete within {timeout_ms} ms")
+                return
+
+    async def count_answer_nodes(self) -> Dict[str, int]:
+        """Count the nodes each answer selector matches, for handlers that join answer nodes
+
+        A tab that stayed on the service still shows the earlier answers of
+        the conversation, and selectors matching every paragraph or list item
+        of the answer area match theirs too.
+        """
+        if not self.join_answer_nodes or not self.answer_selectors:
+            return {}
+        selectors = list(self.answer_selectors)
+        try:
+            result = await self.page.evaluate(ANSWER_COUNT_SCRIPT, {"selectors": selectors})
+        except Exception as e:
+            logger.debug(f"{type(self).__name__}: could not count answer nodes: {e}")
+            return {}
+        if not isinstance(result, dict):
+            return {}
+
+        counts = dict(result.get("counts") or {})
+        for i in result.get("unsupported") or []:
+            try:
+                counts[selectors[i]] = await self.page.eval_on_selector_all(selectors[i], "nodes => nodes.length")
+            except Exception as e:
+                logger.debug(f"{type(self).__name__}: could not count nodes for {selectors[i]!r}: {e}")
+        return {selector: count for selector, count in counts.items() if isinstance(count, int)}
+
+    def cascade(self, name: str, selectors: List[str]) -> List[str]:
+        """Order a named selector cascade, trying the selector that has been winning first"""
+        if not self.service_id:
+            return list(selectors)
+        return selector_memo.order(self.service_id, name, selectors)
+
+    async def find_elements(self, selectors: List[str], require_text: bool = False,
+                            all_nodes: bool = False, cascade: Optional[str] = None) -> List[ElementHandle]:
+        """Find the elements of the first selector in a cascade that matches
+
+        The cascade is resolved with a single evaluate call instead of one
+        query per selector. Selectors only Playwright understands are checked
+        through Playwright, in cascade order. With all_nodes every match of the
+        winning selector is returned, otherwise only the first one. Named
+        cascades are reordered by, and feed, the selector memo.
+        """
+        if not selectors:
+            return []
+        if cascade:
+            selectors = self.cascade(cascade, selectors)
+        winner, elements = await self._resolve(selectors, require_text, all_nodes)
+        if cascade and self.service_id:
+            selector_memo.record(self.service_id, cascade, selectors, winner)
+        return elements
+
+    async def _resolve(self, selectors: List[str], require_text: bool,
+                       all_nodes: bool) -> Tuple[Optional[str], List[ElementHandle]]:
+        try:
+            result = await self.page.evaluate(SELECTOR_CASCADE_SCRIPT, {
+                "selectors": list(selectors),
+                "requireText": require_text,
+                "allNodes": all_nodes
+            })
+        except Exception as e:
+            logger.debug(f"{type(self).__name__}: could not resolve selectors in page: {e}")
+            result = None
+
+        if isinstance(result, dict) and isinstance(result.get("index"), int):
+            index = result["index"]
+            unsupported = [i for i in result.get("unsupported") or [] if index < 0 or i < index]
+            for i in unsupported:
+                elements = await self._query(selectors[i], require_text, all_nodes)
+                if elements:
+                    return selectors[i], elements
+            if index < 0:
+                return None, []
+            return selectors[index], await self._query(selectors[index], False, all_nodes)
+
+        # The page could not be evaluated (e.g. it is navigating), try each selector
+        for selector in selectors:
+            elements = await self._query(selector, require_text, all_nodes)
+            if elements:
+                return selector, elements
+        return None, []
+
+    async def _query(self, selector: str, require_text: bool, all_nodes: bool) -> List[ElementHandle]:
+        if all_nodes:
+            elements = await self.page.query_selector_all(selector) or []
+        else:
+            element = await self.page.query_selector(selector)
+            elements = [element] if element else []
+        if require_text and elements:
+            texts = [await element.text_content() for element in elements]
+            if not any(text and text.strip() for text in texts):
+                return []
+        return elements
+
+    async def submit_question(self, question: str) -> None:
+        """Type a question into the AI service and send it"""
+        if not self.page:
+            raise RuntimeError("Browser page not available")
+
+        # The last match is usually the latest input box
+        inputs = await self.find_elements(self.input_selectors, all_nodes=True, cascade="input")
+        if not inputs:
+            raise RuntimeError(f"Could not find input element for {self.display_name}")
+        input_element = inputs[-1]
+
+        await input_element.fill(question)
+        await self.page.wait_for_timeout(1000)
+
+        if self.submit_with_enter:
+            await input_element.press("Enter")
+            return
+
+        buttons = await self.find_elements(self.button_selectors, cascade="button")
+        if buttons:
+            await buttons[0].click()
+        else:
+            await input_element.press("Enter")
+
+    async def extract_answer(self, markdown: Optional[bool] = None) -> Optional[str]:
+        """Extract the latest answer from the page, or None if nothing was found
+
+        With markdown the answer keeps code blocks, headings, lists and tables;
+        by default browser.answer_format decides. Nodes that were on the page
+        before the last question was sent are left out.
+        """
+        if not self.page:
+            raise RuntimeError("Browser page not available")
+        if markdown is None:
+            markdown = self.config.browser.get('answer_format', 'text') == 'markdown'
+
+        return await self.extract_text(
+            self.answer_selectors, all_nodes=self.join_answer_nodes, markdown=markdown, cascade="answer",
+            seen=self.previous_answer_nodes
+        )
+
+    async def extract_text(self, selectors: List[str], all_nodes: bool = False, markdown: bool = False,
+                           cascade: Optional[str] = None, seen: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """Get the text of the first selector in a cascade whose nodes have any
+
+        The nodes are read and joined inside the page, so the whole cascade
+        costs one evaluate call however many nodes the answer consists of.
+        The first seen[selector] nodes of a selector are skipped.
+        """
+        if not selectors:
+            return None
+        if cascade:
+            selectors = self.cascade(cascade, selectors)
+        seen = seen or {}
+        options = {"allNodes": all_nodes, "markdown": markdown}
+        try:
+            result = await self.page.evaluate(ANSWER_TEXT_SCRIPT, {
+                "selectors": list(selectors), "seen": seen, **options
+            })
+        except Exception as e:
+            logger.debug(f"{type(self).__name__}: could not extract text in page: {e}")
+            result = None
+
+        if isinstance(result, dict) and isinstance(result.get("index"), int):
+            index = result["index"]
+            candidates = [i for i in result.get("unsupported") or [] if index < 0 or i < index]
+        else:
+            # The page could not be evaluated (e.g. it is navigating), try each selector
+            index, candidates = -1, range(len(selectors))
+
+        winner, text = None, None
+        for i in candidates:
+            text = await self._selector_text(selectors[i], {**options, "skip": seen.get(selectors[i], 0)})
+            if text:
+                winner = selectors[i]
+                break
+        else:
+            if index >= 0:
+                winner, text = selectors[index], (result.get("text") or "").strip()
+
+        if cascade and self.service_id:
+            selector_memo.record(self.service_id, cascade, selectors, winner)
+        return text or None
+
+    async def _selector_text(self, selector: str, options: dict) -> Optional[str]:
+        try:
+            text = await self.page.eval_on_selector_all(selector, NODES_TEXT_SCRIPT, options)
+        except Exception as e:
+            logger.debug(f"{type(self).__name__}: could not extract text for {selector!r}: {e}")
+            return None
+        return text.strip() if isinstance(text, str) else None
+
@@ -2,12 +2,12 @@
 Data class for AI service information
 """
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
 
-@dataclass
+@dataclass(frozen=True)
 class AIService:
-    """Represents an AI service configuration"""
+    """Represents an AI service configuration (immutable, shared through the registry)"""
     id: str
     name: str
     url: str
@@ -18,4 +18,8 @@ class AIService:
     icon: Optional[str] = None
     priority: Optional[int] = None
     authentication_required: Optional[bool] = None
-    capabilities: Optional[list] = None
\ No newline at end of file
+    capabilities: Optional[tuple] = None
+    # Handler spec overrides, see handler_spec.py
+    handler: Optional[Mapping[str, Any]] = field(default=None, compare=False)
+    # Overrides of browser.resource_blocking, see resource_blocking.py
+    resource_blocking: Optional[Mapping[str, Any]] = field(default=None, compare=False)
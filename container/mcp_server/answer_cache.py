@@ -0,0 +1,295 @@
+"""
+Answer cache
+Serves repeated questions without driving the browser again
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Mapping, Optional, Tuple
+
+from .config_store import ConfigSnapshot
+
+logger = logging.getLogger("terminail-mcp-cache")
+
+# Fallbacks when performance.caching is not configured
+DEFAULT_TTL_MINUTES = 60
+DEFAULT_MAX_CACHE_SIZE_MB = 100
+DEFAULT_MAX_DISK_SIZE_MB = 500
+
+# How often expired answers are purged and the disk tier is trimmed (seconds)
+PURGE_INTERVAL = 600.0
+
+CacheKey = Tuple[str, str]
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different spellings share a cache entry"""
+    return " ".join(unicodedata.normalize("NFKC", question).split()).casefold()
+
+@dataclass
+class _Entry:
+    answer: str
+    size: int
+    expires_at: float
+
+class _DiskTier:
+    """SQLite store that keeps answers across container restarts"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "service TEXT NOT NULL, question TEXT NOT NULL, answer TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL DEFAULT 0, "
+                "size INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (service, question))"
+            )
+            # Files written before the disk tier was bounded
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(answers)")}
+            if "created_at" not in columns:
+                self._db.execute("ALTER TABLE answers ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            if "size" not in columns:
+                self._db.execute("ALTER TABLE answers ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                self._db.execute("UPDATE answers SET size = length(CAST(answer AS BLOB)) + length(CAST(question AS BLOB))")
+
+    def get(self, key: CacheKey) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT answer, expires_at FROM answers WHERE service = ? AND question = ?", key
+            ).fetchone()
+        return row
+
+    def put(self, key: CacheKey, answer: str, expires_at: float, size: int):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO answers (service, question, answer, expires_at, created_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, answer, expires_at, time.time(), size)
+            )
+
+    def purge(self, now: float, max_bytes: int) -> int:
+        """Delete expired answers, then the oldest beyond max_bytes; returns the rows deleted"""
+        with self._lock, self._db:
+            deleted = self._db.execute("DELETE FROM answers WHERE expires_at <= ?", (now,)).rowcount
+            deleted += self._db.execute(
+                "DELETE FROM answers WHERE rowid IN ("
+                "SELECT rowid FROM (SELECT rowid, SUM(size) OVER (ORDER BY created_at DESC, rowid DESC) AS total "
+                "FROM answers) WHERE total > ?)",
+                (max_bytes,)
+            ).rowcount
+        return deleted
+
+    def size(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class AnswerCache:
+    """Size-bounded LRU cache of answers keyed by (service, normalized question)
+
+    Entries expire after the service's TTL (performance.caching.service_ttl_minutes,
+    falling back to ttl_minutes). The in-memory tier evicts least recently used
+    answers once max_cache_size_mb is exceeded. When disk_path is set, answers
+    are also written to SQLite and read back on a memory miss; expired rows
+    are purged and the oldest beyond max_disk_size_mb deleted at startup and
+    every PURGE_INTERVAL seconds while purging runs.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_CACHE_SIZE_MB * 1024 * 1024,
+                 ttl_seconds: float = DEFAULT_TTL_MINUTES * 60,
+                 service_ttls: Optional[Mapping[str, float]] = None,
+                 disk_path: Optional[str] = None, enabled: bool = True,
+                 max_disk_bytes: int = DEFAULT_MAX_DISK_SIZE_MB * 1024 * 1024):
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.service_ttls = dict(service_ttls or {})
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._disk: Optional[_DiskTier] = None
+        self._disk_path: Optional[str] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_purged = 0
+        self._purge_task: Optional[asyncio.Task] = None
+        self._open_disk(disk_path)
+
+    @classmethod
+    def from_config(cls, snapshot: ConfigSnapshot) -> "AnswerCache":
+        cache = cls()
+        cache.configure(snapshot)
+        return cache
+
+    def configure(self, snapshot: ConfigSnapshot):
+        """Apply performance.caching from a (reloaded) configuration"""
+        caching = snapshot.caching
+        self.enabled = bool(caching.get('enabled', True))
+        self.max_bytes = int(float(caching.get('max_cache_size_mb', DEFAULT_MAX_CACHE_SIZE_MB)) * 1024 * 1024)
+        self.max_disk_bytes = int(float(caching.get('max_disk_size_mb', DEFAULT_MAX_DISK_SIZE_MB)) * 1024 * 1024)
+        self.ttl_seconds = float(caching.get('ttl_minutes', DEFAULT_TTL_MINUTES)) * 60
+        self.service_ttls = {
+            service_id.lower(): float(minutes) * 60
+            for service_id, minutes in (caching.get('service_ttl_minutes') or {}).items()
+        }
+        self._open_disk(caching.get('disk_path') or None)
+        self._evict()
+
+    def _open_disk(self, path: Optional[str]):
+        if path == self._disk_path:
+            return
+        if self._disk:
+            self._disk.close()
+        self._disk, self._disk_path = None, path
+        if path:
+            try:
+                self._disk = _DiskTier(path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Answer cache disk tier disabled: {e}")
+
+    def ttl_for(self, service_id: str) -> float:
+        """TTL in seconds for a service"""
+        return self.service_ttls.get(service_id.lower(), self.ttl_seconds)
+
+    @staticmethod
+    def key(service_id: str, question: str) -> CacheKey:
+        return service_id.lower(), normalize_question(question)
+
+    async def get(self, service_id: str, question: str) -> Optional[str]:
+        """Get a cached answer, or None on a miss"""
+        if not self.enabled:
+            return None
+        key = self.key(service_id, question)
+        now = time.time()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.answer
+            self._remove(key)
+
+        if self._disk:
+            row = await self._run_disk(self._disk.get, key)
+            if row and row[1] > now:
+                self._store(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    async def put(self, service_id: str, question: str, answer: str):
+        """Cache an answer for the service's TTL"""
+        ttl = self.ttl_for(service_id)
+        if not self.enabled or ttl <= 0:
+            return
+        key = self.key(service_id, question)
+        expires_at = time.time() + ttl
+        self._store(key, answer, expires_at)
+        if self._disk:
+            await self._run_disk(self._disk.put, key, answer, expires_at, self._size(key, answer))
+
+    async def purge_expired(self):
+        """Remove expired answers from both tiers and trim the disk tier to max_disk_size_mb"""
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            self._remove(key)
+        if self._disk:
+            deleted = await self._run_disk(self._disk.purge, now, self.max_disk_bytes)
+            if deleted:
+                self.disk_purged += deleted
+                logger.info(f"Purged {deleted} answers from the disk tier")
+
+    def start_purging(self, interval: float = PURGE_INTERVAL):
+        """Purge now and then every interval seconds in a background task"""
+        if self._purge_task is None or self._purge_task.done():
+            self._purge_task = asyncio.get_running_loop().create_task(self._purge_periodically(interval))
+
+    async def stop_purging(self):
+        task, self._purge_task = self._purge_task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _purge_periodically(self, interval: float):
+        while True:
+            try:
+                await self.purge_expired()
+            except Exception as e:
+                logger.warning(f"Answer cache purge failed: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def _size(key: CacheKey, answer: str) -> int:
+        return len(answer.encode("utf-8")) + len(key[1].encode("utf-8"))
+
+    def _store(self, key: CacheKey, answer: str, expires_at: float):
+        self._remove(key)
+        size = self._size(key, answer)
+        if size > self.max_bytes:
+            # Larger than the whole cache, keep it on disk only
+            return
+        self._entries[key] = _Entry(answer, size, expires_at)
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    async def _run_disk(self, func, *args):
+        try:
+            # SQLite I/O stays off the event loop
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        except sqlite3.Error as e:
+            logger.warning(f"Answer cache disk tier error: {e}")
+            return None
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_purged": self.disk_purged,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "disk": self._disk_path if self._disk else None
+        }
+
+    def close(self):
+        """Close the disk tier"""
+        self._open_disk(None)
@@ -0,0 +1,139 @@
+"""
+Batch question jobs
+Pushes many questions through one AI service on a dedicated tab
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+
+if TYPE_CHECKING:
+    from .browser import BrowserManager
+
+logger = logging.getLogger("terminail-mcp-batch")
+
+# Number of finished jobs kept for resuming before the oldest are dropped
+DEFAULT_MAX_FINISHED_JOBS = 100
+
+@dataclass
+class BatchJob:
+    """A list of questions for one AI service and the results collected so far"""
+    id: str
+    ai: str
+    questions: List[str]
+    results: List[dict] = field(default_factory=list)
+    status: str = "pending"
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def summary(self) -> dict:
+        """Job status without the individual results"""
+        return {
+            "job_id": self.id,
+            "ai": self.ai,
+            "status": self.status,
+            "total": len(self.questions),
+            "completed": len(self.results),
+            "failed": sum(1 for result in self.results if not result["success"]),
+            "error": self.error
+        }
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def follow(self, offset: int = 0) -> AsyncIterator[dict]:
+        """Yield results starting at offset, waiting for new ones until the job finishes"""
+        index = max(0, offset)
+        while True:
+            async with self._changed:
+                while index >= len(self.results) and not self.finished:
+                    await self._changed.wait()
+            while index < len(self.results):
+                yield self.results[index]
+                index += 1
+            if self.finished and index >= len(self.results):
+                return
+
+class BatchManager:
+    """Runs batch jobs and keeps them addressable by job id"""
+
+    def __init__(self, max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS):
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    def submit(self, browser_manager: "BrowserManager", ai: str, questions: List[str],
+               job_id: Optional[str] = None) -> BatchJob:
+        """Start a job, or resume an existing one with the same id
+
+        A running job is returned as is. A failed or cancelled job restarts
+        from the first question that has no result yet.
+        """
+        job = self._jobs.get(job_id) if job_id else None
+        if job is None:
+            job = BatchJob(id=job_id or uuid.uuid4().hex, ai=ai, questions=list(questions))
+            self._jobs[job.id] = job
+            self._prune()
+        elif job.status in ("pending", "running", "completed"):
+            return job
+
+        job.status = "running"
+        job.error = None
+        job.finished_at = None
+        job.task = asyncio.get_running_loop().create_task(self._run(browser_manager, job))
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a running job; returns False if there is no such job"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job.task and not job.task.done():
+            job.task.cancel()
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                pass
+        return True
+
+    async def _run(self, browser_manager: "BrowserManager", job: BatchJob):
+        try:
+            start = len(job.results)
+            async for result in browser_manager.run_batch(job.ai, job.questions[start:], start_index=start):
+                job.results.append(result)
+                await job._notify()
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Batch job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            await job._notify()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    async def close(self):
+        """Cancel all running jobs"""
+        for job_id in list(self._jobs):
+            await self.cancel(job_id)
@@ -5,93 +5,660 @@ Handles connection to browser and automation operations
 
 import asyncio
 import logging
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from playwright.async_api import async_playwright, Browser, Page, Playwright
 
 from .utils import load_ai_urls
+from .config_store import config_store, current_config, ConfigSnapshot
 from .handler_factory import create_ai_handler
 from .chrome_manager import ChromeManager
+from .cdp_probe import CDPEndpoint, backoff_delays, probe_cdp
+from .page_pool import PagePool, DEFAULT_MAX_PAGES
+from .browser_instances import BrowserInstance, InstancePlacement, parse_endpoint
+from .resource_blocking import ResourceBlocking
+from .scheduler import RequestScheduler, SchedulerLimits
+from .single_flight import SingleFlight
+from .answer_cache import normalize_question
 
 logger = logging.getLogger("terminail-mcp-browser")
 
+# Fallback when browser.warm_up.timeout_ms is not configured
+DEFAULT_WARM_UP_TIMEOUT_MS = 30000
+
+# Hosts under which a Chrome started by ChromeManager is reachable
+LOCAL_HOSTS = ("localhost", "127.0.0.1")
+
+# Fallbacks when browser.reconnect is not configured
+DEFAULT_RECONNECT_MAX_DELAY_MS = 5000
+DEFAULT_RECONNECT_WAIT_MS = 30000
+DEFAULT_RECONNECT_GIVE_UP_MS = 300000
+# First delay between reconnect attempts (seconds)
+RECONNECT_INITIAL_DELAY = 0.25
+# How long a failed request waits for the disconnected event to arrive (seconds)
+DISCONNECT_GRACE = 1.0
+# How often a request is replayed after the browser reconnected
+MAX_REPLAYS = 1
+
+def _connection_lost(error: Exception) -> bool:
+    """Whether a Playwright error says the page, context or browser went away"""
+    message = str(error)
+    return any(text in message for text in ("has been closed", "Target closed", "Connection closed"))
+
 class BrowserManager:
     """Browser manager"""
     
     def __init__(self):
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
+        self.page_pool: Optional[PagePool] = None
         self.playwright: Optional[Playwright] = None
         self.chrome_manager: Optional[ChromeManager] = None
-        self.ai_urls = load_ai_urls()
         self.debug_port: Optional[int] = None
+        # Every connected Chrome; browser, page and page_pool are those of the first
+        self.instances: List[BrowserInstance] = []
+        self.placement = InstancePlacement()
+        # Serializes access to self.page when no page pool is available
+        self._page_lock = asyncio.Lock()
+        # Admission control for everything that drives an AI service
+        self.scheduler = RequestScheduler(SchedulerLimits.from_config(current_config().concurrency))
+        # Identical requests arriving together share one browser round-trip
+        self.single_flight = SingleFlight()
+        # Trackers, media and third-party requests aborted on the services' tabs
+        self.resource_blocking = ResourceBlocking()
+        # Outcome of the last warm-up by service id, reported on /health
+        self.readiness: Dict[str, dict] = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
+        # Reconnect supervisors by endpoint name, while an instance is down
+        self._reconnect_tasks: Dict[str, asyncio.Task] = {}
+        # Disconnected listener of each instance's current browser, by endpoint name
+        self._disconnect_listeners: Dict[str, Tuple[Browser, Callable]] = {}
+        self._closing = False
+    
+    @property
+    def ai_urls(self):
+        """URLs of the enabled AI services from the current configuration"""
+        return load_ai_urls()
+    
+    def _apply_config(self, snapshot: ConfigSnapshot):
+        """Pick up settings from a reloaded configuration without dropping warm tabs"""
+        for page_pool in self._page_pools():
+            page_pool.max_pages = self._page_pool_size(snapshot)
+        self.scheduler.configure(SchedulerLimits.from_config(snapshot.concurrency))
+        self.resource_blocking.configure(snapshot)
+    
+    @staticmethod
+    def _page_pool_size(snapshot: ConfigSnapshot) -> int:
+        pool_config = snapshot.browser.get('page_pool') or {}
+        return max(1, int(pool_config.get('max_pages', DEFAULT_MAX_PAGES)))
+    
+    @staticmethod
+    def _instance_count(snapshot: ConfigSnapshot) -> int:
+        instances_config = snapshot.browser.get('instances') or {}
+        return max(1, int(instances_config.get('count', 1)))
+    
+    def _page_pools(self) -> List[PagePool]:
+        if self.instances:
+            return [instance.page_pool for instance in self.instances]
+        return [self.page_pool] if self.page_pool else []
     
     async def start_chrome_automatically(self, headless: bool = False) -> bool:
-        """Start Chrome automatically with debug port"""
+        """Start Chrome automatically with debug port, as many instances as browser.instances.count"""
         try:
             self.chrome_manager = ChromeManager()
-            return self.chrome_manager.start_chrome(headless)
+            return await self.chrome_manager.start_pool(self._instance_count(current_config()), headless)
         except Exception as e:
             logger.error(f"Failed to start Chrome automatically: {e}")
             return False
     
-    async def connect(self, debug_port: int = 9222):
-        """Connect to the running browser instance"""
+    async def connect(self, debug_port: int = 9222, endpoints: Optional[List[str]] = None):
+        """Connect to the running browser instance
+
+        With browser.instances.count above one, the instances on the
+        following debug ports are connected as well. endpoints ("host:port",
+        local or on other hosts) replaces both; services are then sharded
+        across them. Instances that cannot be reached are skipped, only the
+        one on debug_port (or, with endpoints, at least one) is required.
+        """
         try:
+            # Connecting again replaces the browsers and Playwright of the last connect
+            await self._disconnect()
+            
             # Initialize playwright without context manager to keep it alive
             self.playwright = await async_playwright().start()
             
-            # Connect to the running browser
-            self.browser = await self.playwright.chromium.connect_over_cdp(
-                f"http://localhost:{debug_port}"
-            )
+            targets = [parse_endpoint(endpoint) for endpoint in endpoints] if endpoints else \
+                [("localhost", port) for port in self._instance_ports(debug_port)]
+            for host, port in dict.fromkeys(targets):
+                required = not endpoints and port == debug_port
+                try:
+                    instance = await self._connect_instance(port, required=required, host=host)
+                except Exception as e:
+                    if required:
+                        raise
+                    logger.warning(f"Skipping browser instance {host}:{port}: {e}")
+                    continue
+                self._watch(instance)
+                self.instances.append(instance)
+            if not self.instances:
+                raise ConnectionError(
+                    f"None of the CDP endpoints could be connected: {', '.join(str(e) for e in endpoints)}"
+                )
             
-            # Get or create page
-            contexts = self.browser.contexts
-            if contexts and contexts[0].pages:
-                self.page = contexts[0].pages[0]
-            else:
-                self.page = contexts[0].new_page() if contexts else await self.browser.new_page()
+            primary = self._mirror_primary()
+            # Once, however often /init connects again
+            config_store.unsubscribe(self._apply_config)
+            config_store.subscribe(self._apply_config)
             
             # Store the debug port for status reporting
-            self.debug_port = debug_port
+            self.debug_port = primary.port
             
-            logger.info(f"Connected to browser on port {debug_port}")
+            logger.info(f"Connected to browser at {primary.name}"
+                        + (f" and {len(self.instances) - 1} more instances" if len(self.instances) > 1 else ""))
         
         except Exception as e:
             logger.error(f"Failed to connect to browser: {e}")
             await self.close()
             raise
     
-    async def ask_ai(self, ai: str, question: str) -> str:
-        """Ask the specified AI and get the response"""
-        if not self.page:
-            raise RuntimeError("Browser page not available")
+    def _instance_ports(self, debug_port: int) -> List[int]:
+        """Debug ports to connect to, debug_port first"""
+        started = [endpoint.port for endpoint in (self.chrome_manager.endpoints if self.chrome_manager else [])]
+        if debug_port in started:
+            return [debug_port] + [port for port in started if port != debug_port]
+        return list(range(debug_port, debug_port + self._instance_count(current_config())))
+    
+    def _mirror_primary(self) -> BrowserInstance:
+        primary = self.instances[0]
+        self.browser = primary.browser
+        self.page = primary.page
+        self.page_pool = primary.page_pool
+        return primary
+    
+    async def _connect_instance(self, port: int, required: bool = True, host: str = "localhost",
+                                endpoint: Optional[CDPEndpoint] = None) -> BrowserInstance:
+        # Connect straight to the browser websocket when the endpoint is known,
+        # which saves connect_over_cdp its own /json/version round-trip
+        endpoint = endpoint or await self._devtools_endpoint(port, host)
+        if endpoint is None and not required:
+            raise ConnectionError("DevTools endpoint did not answer")
+        try:
+            browser = await self.playwright.chromium.connect_over_cdp(
+                endpoint.websocket_url if endpoint else f"http://{host}:{port}"
+            )
+        except Exception as e:
+            if endpoint is None:
+                raise
+            # The websocket URL changes when Chrome restarts, ask for the current one
+            logger.debug(f"Could not connect to {endpoint.websocket_url}, probing {host}:{port} again: {e}")
+            endpoint = await probe_cdp(host, port, timeout=0)
+            browser = await self.playwright.chromium.connect_over_cdp(
+                endpoint.websocket_url if endpoint else f"http://{host}:{port}"
+            )
         
-        # Get AI-specific handler
-        handler = create_ai_handler(ai, self.page)
-        if not handler:
-            # Fallback to generic approach for unsupported AI services
-            return await self._ask_ai_generic(ai, question)
+        # Get or create page
+        contexts = browser.contexts
+        context = contexts[0] if contexts else await browser.new_context()
+        if context.pages:
+            page = context.pages[0]
+        else:
+            page = await context.new_page()
+        
+        # Every AI service gets its own tab; the existing tab is reused first
+        page_pool = PagePool(
+            context,
+            max_pages=self._page_pool_size(current_config()),
+            spare_pages=[page]
+        )
+        return BrowserInstance(port=port, browser=browser, page_pool=page_pool, page=page, host=host)
+    
+    def _watch(self, instance: BrowserInstance):
+        """Supervise the instance's current browser through its disconnected event"""
+        browser = instance.browser
         
-        # Navigate to the AI service
-        await handler.navigate_to_service()
+        def listener(_):
+            self._instance_disconnected(instance, browser)
         
-        # Ask the question using AI-specific handler
-        return await handler.ask_question(question)
+        self._unwatch(instance.name)
+        browser.on("disconnected", listener)
+        self._disconnect_listeners[instance.name] = (browser, listener)
     
-    async def _ask_ai_generic(self, ai: str, question: str) -> str:
-        """Generic fallback method for unsupported AI services"""
-        if not self.page:
+    def _unwatch(self, name: str):
+        browser, listener = self._disconnect_listeners.pop(name, (None, None))
+        if browser is None:
+            return
+        try:
+            browser.remove_listener("disconnected", listener)
+        except Exception as e:
+            logger.debug(f"Error removing disconnected listener of {name}: {e}")
+    
+    def _instance_disconnected(self, instance: BrowserInstance, browser: Browser):
+        if instance.browser is not browser or not instance.connected:
+            # An earlier browser of the instance, or already handled
+            return
+        if not any(current is instance for current in self.instances):
+            # An instance of an earlier connect
+            return
+        # Services are routed around the instance until it is back
+        instance.connected = False
+        logger.warning(f"Browser at {instance.name} disconnected")
+        if self._closing or not self._reconnect_settings().get('enabled', True):
+            return
+        if instance.name not in self._reconnect_tasks:
+            self._reconnect_tasks[instance.name] = asyncio.get_running_loop().create_task(self._reconnect(instance))
+    
+    @staticmethod
+    def _reconnect_settings() -> dict:
+        return current_config().browser.get('reconnect') or {}
+    
+    @property
+    def reconnecting(self) -> bool:
+        return bool(self._reconnect_tasks)
+    
+    async def _reconnect(self, instance: BrowserInstance):
+        """Reattach to the instance's endpoint with backoff until it answers, then reopen its tabs
+
+        Gives up after browser.reconnect.give_up_ms; the instance then stays
+        disconnected until the next /init.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        settings = self._reconnect_settings()
+        max_delay = int(settings.get('max_delay_ms', DEFAULT_RECONNECT_MAX_DELAY_MS)) / 1000
+        give_up = int(settings.get('give_up_ms', DEFAULT_RECONNECT_GIVE_UP_MS)) / 1000
+        services = list(instance.page_pool.stats()["pages"])
+        attempts = 0
+        try:
+            for delay in backoff_delays(RECONNECT_INITIAL_DELAY, max_delay):
+                attempts += 1
+                try:
+                    await self._reattach(instance)
+                    break
+                except Exception as e:
+                    logger.debug(f"Reconnect attempt {attempts} to {instance.name} failed: {e}")
+                if loop.time() - started + delay > give_up:
+                    logger.error(f"Giving up reconnecting to {instance.name} after {attempts} attempts")
+                    return
+                await asyncio.sleep(delay)
+        finally:
+            self._reconnect_tasks.pop(instance.name, None)
+        logger.info(f"Reconnected to {instance.name} after {loop.time() - started:.1f} s ({attempts} attempts)")
+        
+        # Reopen the tabs the instance had, so the next requests find them warm
+        if services:
+            await self._reopen_tabs(instance, services)
+    
+    async def _reopen_tabs(self, instance: BrowserInstance, services: List[str]):
+        """Open the services' pages again on the reattached instance, where they stay placed"""
+        timeout = int((current_config().browser.get('warm_up') or {}).get(
+            'timeout_ms', DEFAULT_WARM_UP_TIMEOUT_MS)) / 1000
+        
+        async def reopen(ai: str):
+            async with self.scheduler.slot(ai, "low"), instance.page_pool.lease(ai) as page:
+                await self.resource_blocking.attach(ai, page)
+                handler = create_ai_handler(ai, page)
+                if handler:
+                    await handler.navigate_to_service()
+        
+        results = await asyncio.gather(
+            *(asyncio.wait_for(reopen(ai), timeout) for ai in services), return_exceptions=True
+        )
+        for ai, result in zip(services, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Reopening the tab of {ai} on {instance.name} failed: {result!r}")
+    
+    async def _reattach(self, instance: BrowserInstance):
+        # A restarted Chrome has a new websocket URL, so always probe
+        endpoint = await probe_cdp(instance.host, instance.port, timeout=0)
+        if endpoint is None:
+            raise ConnectionError("DevTools endpoint did not answer")
+        fresh = await self._connect_instance(instance.port, host=instance.host, endpoint=endpoint)
+        # Requests still holding tabs of the lost browser fail and are replayed
+        instance.browser, instance.page_pool, instance.page = fresh.browser, fresh.page_pool, fresh.page
+        instance.connected = True
+        self._watch(instance)
+        if instance is self.instances[0]:
+            self._mirror_primary()
+    
+    async def wait_for_browser(self, timeout: Optional[float] = None) -> bool:
+        """Wait while a reconnect is underway and no instance is usable
+
+        Returns False when no instance came back within timeout (default
+        browser.reconnect.wait_ms) or none is being reconnected.
+        """
+        if timeout is None:
+            timeout = int(self._reconnect_settings().get('wait_ms', DEFAULT_RECONNECT_WAIT_MS)) / 1000
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not any(instance.connected for instance in self.instances):
+            tasks = list(self._reconnect_tasks.values())
+            remaining = deadline - loop.time()
+            if not tasks or remaining <= 0:
+                return False
+            await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        return bool(self.instances)
+    
+    async def _recover(self, error: Exception) -> bool:
+        """After a failed request, wait for the browser if the connection was lost"""
+        if not self.instances or not (_connection_lost(error) or not self.is_connected()):
+            return False
+        # The disconnected event may arrive just after the error
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + DISCONNECT_GRACE
+        while all(instance.connected for instance in self.instances) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        return await self.wait_for_browser()
+    
+    async def _stop_reconnecting(self):
+        tasks, self._reconnect_tasks = list(self._reconnect_tasks.values()), {}
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+    
+    async def _devtools_endpoint(self, debug_port: int, host: str = "localhost") -> Optional[CDPEndpoint]:
+        """The DevTools endpoint on debug_port, from the Chrome we started or one probe
+
+        The endpoint of the Chrome we started may be stale if it restarted
+        since; _connect_instance probes again when connecting through it fails.
+        """
+        if self.chrome_manager and host in LOCAL_HOSTS:
+            for endpoint in [self.chrome_manager.endpoint, *self.chrome_manager.endpoints]:
+                if endpoint and endpoint.port == debug_port:
+                    return endpoint
+        return await probe_cdp(host, debug_port, timeout=0)
+    
+    def _page_pool_for(self, ai: str) -> Optional[PagePool]:
+        """Page pool of the instance the service is placed on"""
+        if len(self.instances) > 1:
+            return self.placement.place(ai, self.instances).page_pool
+        return self.page_pool
+    
+    @asynccontextmanager
+    async def lease_page(self, ai: str) -> AsyncIterator[Page]:
+        """Lease the browser tab for the specified AI
+
+        While the browser is being reconnected the lease waits for it.
+        """
+        if self.reconnecting and not await self.wait_for_browser():
+            raise ConnectionError("Browser disconnected and not reconnected yet")
+        page_pool = self._page_pool_for(ai.lower())
+        if page_pool:
+            async with page_pool.lease(ai.lower()) as page:
+                await self.resource_blocking.attach(ai.lower(), page)
+                yield page
+        elif self.page:
+            async with self._page_lock:
+                await self.resource_blocking.attach(ai.lower(), self.page)
+                yield self.page
+        else:
             raise RuntimeError("Browser page not available")
+    
+    @asynccontextmanager
+    async def dedicated_page(self, ai: str) -> AsyncIterator[Page]:
+        """Open a tab outside the page pool for long-running work such as batch jobs"""
+        if not self.page_pool:
+            # Without a pool there is only the shared page
+            async with self.lease_page(ai) as page:
+                yield page
+            return
+        
+        if self.instances and not self.is_connected() and not (self.reconnecting and await self.wait_for_browser()):
+            raise ConnectionError("No connected browser instance to open a dedicated tab on")
+        # On the least loaded connected instance
+        page_pools = [instance.page_pool for instance in self.instances if instance.connected] or self._page_pools()
+        page_pool = min(page_pools, key=lambda pool: pool.load)
+        page = await page_pool.context.new_page()
+        await self.resource_blocking.attach(ai.lower(), page)
+        try:
+            yield page
+        finally:
+            await self.resource_blocking.detach(page)
+            try:
+                await page.close()
+            except Exception as e:
+                logger.warning(f"Error closing dedicated tab: {e}")
+    
+    async def run_batch(self, ai: str, questions: List[str], start_index: int = 0) -> AsyncIterator[dict]:
+        """Ask a list of questions one after another on a dedicated tab
+
+        The tab is navigated once; each question then goes straight from
+        typing to completion detection to extraction. Yields one result dict
+        per question with "index", "question", "success", "elapsed_ms" and
+        either "answer" or "error".
+        """
+        async with self.dedicated_page(ai) as page:
+            handler = create_ai_handler(ai, page)
+            if not handler:
+                raise ValueError(f"Unsupported AI: {ai}")
             
+            await handler.navigate_to_service()
+            
+            loop = asyncio.get_running_loop()
+            for offset, question in enumerate(questions):
+                started = loop.time()
+                result = {"index": start_index + offset, "question": question}
+                # Batch questions yield to interactive requests between questions
+                async with self.scheduler.slot(ai.lower(), "low"):
+                    try:
+                        result["answer"] = await handler.ask_question(question)
+                        result["success"] = True
+                    except Exception as e:
+                        logger.error(f"Batch question {result['index']} for {ai} failed: {e}")
+                        result["success"] = False
+                        result["error"] = str(e)
+                        # The page may be in an unknown state, reload it before the next question
+                        await handler.navigate_to_service()
+                result["elapsed_ms"] = int((loop.time() - started) * 1000)
+                yield result
+    
+    async def ask_ai(self, ai: str, question: str, priority: str = "normal") -> str:
+        """Ask the specified AI and get the response
+
+        The request waits in the scheduler's priority lane until a slot is
+        free; QueueFullError is raised when too many requests are waiting.
+        A request for a question that is already being asked of the same AI
+        waits for that answer instead of asking again. Answers of supported
+        services are Answer strings carrying their completion status.
+        """
+        key = (ai.lower(), normalize_question(question))
+        return await self.single_flight.call(key, lambda: self._ask_ai(ai, question, priority))
+    
+    async def _ask_ai(self, ai: str, question: str, priority: str) -> str:
+        replays = 0
+        while True:
+            try:
+                return await self._ask_ai_once(ai, question, priority)
+            except Exception as e:
+                if replays >= MAX_REPLAYS or not await self._recover(e):
+                    raise
+                replays += 1
+                logger.warning(f"Browser connection lost while asking {ai}, replaying the request: {e}")
+    
+    async def _ask_ai_once(self, ai: str, question: str, priority: str) -> str:
+        async with self.scheduler.slot(ai.lower(), priority), self.lease_page(ai) as page:
+            # Get AI-specific handler
+            handler = create_ai_handler(ai, page)
+            if not handler:
+                # Fallback to generic approach for unsupported AI services
+                return await self._ask_ai_generic(ai, question, page)
+            
+            # Navigate to the AI service
+            await handler.navigate_to_service()
+            
+            # Ask the question using AI-specific handler
+            return await handler.ask_question(question)
+    
+    async def ask_many(self, ais: List[str], question: str, timeout: Optional[float] = None,
+                       priority: str = "normal") -> AsyncIterator[dict]:
+        """Ask several AIs the same question in parallel and yield each result as it completes
+
+        Every service runs on its own tab. Each result is a dict with "ai",
+        "success", "elapsed_ms" and either "answer" or "error". timeout
+        (seconds) bounds each service individually. Services still running
+        when the caller stops iterating are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        
+        async def run(ai: str) -> dict:
+            try:
+                answer = await asyncio.wait_for(self.ask_ai(ai, question, priority=priority), timeout)
+                result = {"ai": ai, "success": True, "answer": answer}
+            except asyncio.TimeoutError:
+                result = {"ai": ai, "success": False, "error": f"Timed out after {timeout} s"}
+            except Exception as e:
+                logger.error(f"Failed to ask {ai}: {e}")
+                result = {"ai": ai, "success": False, "error": str(e)}
+            result["elapsed_ms"] = int((loop.time() - started) * 1000)
+            return result
+        
+        # Asking the same service twice would only queue on its tab
+        tasks = [asyncio.ensure_future(run(ai)) for ai in dict.fromkeys(ais)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def stream_ai(self, ai: str, question: str, priority: str = "normal") -> AsyncIterator[dict]:
+        """Ask the specified AI and yield answer events as the page renders them
+
+        Yields {"event": "delta", "text": ...} for appended text,
+        {"event": "replace", "text": ...} when already sent text was re-rendered
+        and finally {"event": "done", "answer": ...} with the full answer.
+        Subscribers asking the same question at the same time share one stream.
+        """
+        key = (ai.lower(), normalize_question(question))
+        events = self.single_flight.stream(key, lambda: self._stream_ai(ai, question, priority))
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+    
+    async def _stream_ai(self, ai: str, question: str, priority: str) -> AsyncIterator[dict]:
+        async with self.scheduler.slot(ai.lower(), priority), self.lease_page(ai) as page:
+            handler = create_ai_handler(ai, page)
+            if not handler:
+                # Unsupported services have no incremental extraction
+                answer = await self._ask_ai_generic(ai, question, page)
+                yield {"event": "done", "answer": answer}
+                return
+            
+            await handler.navigate_to_service()
+            
+            async for delta in handler.stream_answer(question):
+                yield {"event": "replace" if delta.replace else "delta", "text": delta.text}
+            
+            answer = await handler.extract_answer()
+            if not answer:
+                answer = f"No answer found from {handler.display_name} - please check the website structure"
+            yield {"event": "done", "answer": answer}
+    
+    @property
+    def warming_up(self) -> bool:
+        return self._warm_up_task is not None and not self._warm_up_task.done()
+    
+    def start_warm_up(self, debug_port: Optional[int] = None) -> Optional[asyncio.Task]:
+        """Warm up in the background when browser.warm_up is enabled
+
+        Connects to the browser first when needed, on debug_port or
+        browser.default_debug_port.
+        """
+        snapshot = current_config()
+        settings = snapshot.browser.get('warm_up') or {}
+        if not settings.get('enabled', False) or self.warming_up:
+            return None
+        if debug_port is None:
+            debug_port = int(snapshot.browser.get('default_debug_port', 9222))
+        self._warm_up_task = asyncio.get_running_loop().create_task(
+            self._connect_and_warm_up(debug_port, list(settings.get('services') or []) or None)
+        )
+        return self._warm_up_task
+    
+    async def _connect_and_warm_up(self, debug_port: int, service_ids: Optional[List[str]]):
+        if not self.is_connected():
+            try:
+                await self.connect(debug_port)
+            except Exception as e:
+                logger.warning(f"Warm-up skipped, browser not reachable on port {debug_port}: {e}")
+                return
+        await self.warm_up(service_ids)
+    
+    async def warm_up(self, service_ids: Optional[List[str]] = None) -> Dict[str, dict]:
+        """Open a tab per service, wait for its input and check its selectors
+
+        Services are warmed up concurrently under the scheduler's low
+        priority lane, so user requests are not held up. Without service_ids
+        every enabled service is warmed up, in sequence order, as far as the
+        page pool has room. Returns the readiness of each service.
+        """
+        snapshot = current_config()
+        settings = snapshot.browser.get('warm_up') or {}
+        timeout = int(settings.get('timeout_ms', DEFAULT_WARM_UP_TIMEOUT_MS)) / 1000
+        if service_ids is None:
+            service_ids = [service.id for service in snapshot.services]
+        service_ids = list(dict.fromkeys(service_id.lower() for service_id in service_ids))
+        
+        # Warming up more services than there are tabs would evict the first ones again
+        room = sum(page_pool.max_pages for page_pool in self._page_pools()) or 1
+        for service_id in service_ids[room:]:
+            self.readiness[service_id] = {"status": "skipped", "error": "page pool is full"}
+        if len(service_ids) > room:
+            logger.info(f"Warming up {room} of {len(service_ids)} services, page pool has no room for the rest")
+        service_ids = service_ids[:room]
+        
+        for service_id in service_ids:
+            self.readiness[service_id] = {"status": "pending"}
+        await asyncio.gather(*(self._warm_up_service(service_id, timeout) for service_id in service_ids))
+        ready = sum(1 for service_id in service_ids if self.readiness[service_id]["status"] == "ready")
+        logger.info(f"Warm-up finished, {ready} of {len(service_ids)} services ready")
+        return {service_id: self.readiness[service_id] for service_id in service_ids}
+    
+    async def _warm_up_service(self, ai: str, timeout: float):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        readiness = {"status": "warming"}
+        self.readiness[ai] = readiness
+        
+        async def check() -> Dict[str, bool]:
+            async with self.scheduler.slot(ai, "low"), self.lease_page(ai) as page:
+                handler = create_ai_handler(ai, page)
+                if not handler:
+                    raise ValueError(f"Unsupported AI: {ai}")
+                await handler.navigate_to_service()
+                return await handler.check_selectors()
+        
+        try:
+            checks = await asyncio.wait_for(check(), timeout)
+            readiness = {"status": "ready" if all(checks.values()) else "degraded", "checks": checks}
+            if readiness["status"] == "degraded":
+                logger.warning(f"Warm-up of {ai}: selectors did not resolve {checks}")
+        except asyncio.TimeoutError:
+            readiness = {"status": "failed", "error": f"Timed out after {timeout} s"}
+        except Exception as e:
+            logger.warning(f"Warm-up of {ai} failed: {e}")
+            readiness = {"status": "failed", "error": str(e)}
+        readiness["elapsed_ms"] = int((loop.time() - started) * 1000)
+        readiness["checked_at"] = time.time()
+        self.readiness[ai] = readiness
+    
+    async def _ask_ai_generic(self, ai: str, question: str, page: Page) -> str:
+        """Generic fallback method for unsupported AI services"""
         # Navigate to the corresponding AI website
         url = self.ai_urls.get(ai)
         if not url:
             raise ValueError(f"Unsupported AI: {ai}")
         
-        await self.page.goto(url)
-        await self.page.wait_for_timeout(3000)
+        await page.goto(url)
+        await page.wait_for_timeout(3000)
         
         # The selectors need to be adjusted according to specific websites
         # The following are general examples, actual use needs to be adjusted for each website
@@ -107,7 +674,7 @@ class BrowserManager:
         
         input_element = None
         for selector in input_selectors:
-            elements = await self.page.query_selector_all(selector)
+            elements = await page.query_selector_all(selector)
             if elements:
                 # Select the last one (usually the latest input box)
                 input_element = elements[-1]
@@ -117,7 +684,7 @@ class BrowserManager:
             raise RuntimeError("Could not find input element")
         
         await input_element.fill(question)
-        await self.page.wait_for_timeout(1000)
+        await page.wait_for_timeout(1000)
         
         # Find and click the send button
         button_selectors = [
@@ -129,13 +696,13 @@ class BrowserManager:
         ]
         
         for selector in button_selectors:
-            button = await self.page.query_selector(selector)
+            button = await page.query_selector(selector)
             if button:
                 await button.click()
                 break
         
         # Wait for response generation (need to adjust wait time and selectors according to actual situation)
-        await self.page.wait_for_timeout(10000)
+        await page.wait_for_timeout(10000)
         
         # Extract response content
         answer_selectors = [
@@ -146,7 +713,7 @@ class BrowserManager:
         ]
         
         for selector in answer_selectors:
-            answer_element = await self.page.query_selector(selector)
+            answer_element = await page.query_selector(selector)
             if answer_element:
                 answer = await answer_element.text_content()
                 if answer and answer.strip():
@@ -156,37 +723,47 @@ class BrowserManager:
     
     async def switch_ai(self, ai: str):
         """Switch to the specified AI website"""
-        if not self.page:
-            raise RuntimeError("Browser page not available")
-        
         url = self.ai_urls.get(ai)
         if not url:
             raise ValueError(f"Unsupported AI: {ai}")
         
-        await self.page.goto(url)
-        await self.page.wait_for_timeout(2000)
+        async with self.lease_page(ai) as page:
+            handler = create_ai_handler(ai, page)
+            if handler:
+                # Reuses the tab without reloading when it is already on the service
+                await handler.navigate_to_service()
+            else:
+                await page.goto(url)
+                await page.wait_for_timeout(2000)
     
     def is_connected(self) -> bool:
-        """Check if browser is connected"""
-        if self.browser is None:
-            return False
-        # Handle both sync and async is_connected methods
-        is_connected = self.browser.is_connected
-        # If it's a coroutine, we can't properly check it in a sync method
-        # In this case, we assume it's connected if we have a browser instance
-        import inspect
-        if inspect.iscoroutinefunction(is_connected) or inspect.iscoroutine(is_connected):
-            return True
-        elif callable(is_connected):
-            return is_connected()
-        else:
-            return is_connected
+        """Check if browser is connected
+
+        Instances follow their browser's disconnected event; a browser set
+        without connect() is asked directly.
+        """
+        if self.instances:
+            return any(instance.connected for instance in self.instances)
+        return self.browser is not None and self.browser.is_connected() is True
     
-    async def close(self):
-        """Close browser connection"""
-        if self.browser:
+    async def _disconnect(self):
+        """Close the connected browsers and Playwright; Chrome itself keeps running"""
+        await self._stop_reconnecting()
+        
+        for page_pool in self._page_pools():
+            try:
+                await page_pool.close()
+            except Exception as e:
+                logger.warning(f"Error closing page pool: {e}")
+        
+        # Closing a browser fires its disconnected event, which must not start a reconnect
+        for name in list(self._disconnect_listeners):
+            self._unwatch(name)
+        browsers = [instance.browser for instance in self.instances] or ([self.browser] if self.browser else [])
+        self.instances = []
+        for browser in browsers:
             try:
-                await self.browser.close()
+                await browser.close()
             except Exception as e:
                 logger.warning(f"Error closing browser: {e}")
         
@@ -196,12 +773,34 @@ class BrowserManager:
             except Exception as e:
                 logger.warning(f"Error stopping playwright: {e}")
         
-        # Stop Chrome if we started it
-        if self.chrome_manager:
-            self.chrome_manager.stop_chrome()
-        
         self.browser = None
         self.page = None
+        self.page_pool = None
+        self.placement.clear()
+        self.resource_blocking.clear()
         self.playwright = None
+    
+    async def close(self):
+        """Close browser connection"""
+        self._closing = True
+        config_store.unsubscribe(self._apply_config)
+        await self._stop_reconnecting()
+        
+        task, self._warm_up_task = self._warm_up_task, None
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        
+        await self._disconnect()
+        
+        # Stop Chrome if we started it
+        if self.chrome_manager:
+            await self.chrome_manager.stop_chrome()
+        
         self.chrome_manager = None
+        self.readiness = {}
+        self._closing = False
         logger.info("Browser connection closed")
\ No newline at end of file
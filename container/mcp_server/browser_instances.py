@@ -0,0 +1,116 @@
+"""
+Browser instances module
+Connected Chrome instances and the placement of AI services on them
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from playwright.async_api import Browser, Page
+
+from .hash_ring import HashRing
+from .page_pool import PagePool
+
+logger = logging.getLogger("terminail-mcp-instances")
+
+# A service may go to an instance loaded up to this factor above the average
+DEFAULT_LOAD_FACTOR = 1.25
+
+def parse_endpoint(endpoint: Union[str, int], default_host: str = "localhost") -> Tuple[str, int]:
+    """Host and debug port of "port", "host:port" or an http(s)/ws(s) DevTools URL"""
+    text = str(endpoint).strip()
+    if text.isdigit():
+        return default_host, int(text)
+    parts = urlsplit(text if "://" in text else f"//{text}")
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if not port:
+        raise ValueError(f"Invalid CDP endpoint: {endpoint!r}, expected host:port")
+    return parts.hostname or default_host, port
+
+@dataclass
+class BrowserInstance:
+    """One Chrome connected over CDP, with its own page pool"""
+    port: int
+    browser: Browser
+    page_pool: PagePool
+    # The tab that was open when connecting
+    page: Optional[Page] = None
+    host: str = "localhost"
+    # Cleared when the browser disconnects
+    connected: bool = True
+
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def load(self) -> float:
+        return self.page_pool.load
+
+    def stats(self) -> dict:
+        stats = self.page_pool.stats()
+        return {
+            "endpoint": self.name,
+            "port": self.port,
+            "connected": self.connected,
+            **stats,
+            # Tabs that could take a request right now
+            "available": max(0, self.page_pool.max_pages - len(stats["leased"])) if self.connected else 0
+        }
+
+class InstancePlacement:
+    """Keeps each AI service on one browser instance
+
+    Services are placed by consistent hashing with bounded loads: a service
+    goes to the first connected instance after its hash on the ring whose
+    load is within load_factor of the average, so it keeps landing on the
+    same instance (and its logged-in session there) while load stays
+    spread. Disconnected instances are skipped. A placed service stays
+    while its instance is connected and still holds its tab (or a request
+    waiting for one), so the warm tab keeps being reused.
+    """
+
+    def __init__(self, load_factor: float = DEFAULT_LOAD_FACTOR):
+        self.load_factor = load_factor
+        self._placed: Dict[str, BrowserInstance] = {}
+        self._ring = HashRing()
+
+    def place(self, service_id: str, instances: List[BrowserInstance]) -> BrowserInstance:
+        connected = [instance for instance in instances if instance.connected]
+        if not connected:
+            raise RuntimeError("No browser instance available")
+        instance = self._placed.get(service_id)
+        if instance is not None and any(candidate is instance for candidate in connected) \
+                and instance.page_pool.has_service(service_id):
+            return instance
+
+        instance = self._choose(service_id, connected, instances)
+        if len(instances) > 1:
+            logger.debug(f"Placing {service_id} on {instance.name}")
+        self._placed[service_id] = instance
+        return instance
+
+    def _choose(self, service_id: str, connected: List[BrowserInstance],
+                instances: List[BrowserInstance]) -> BrowserInstance:
+        by_name = {instance.name: instance for instance in connected}
+        for name in {instance.name for instance in instances} - set(self._ring.nodes):
+            self._ring.add(name)
+        bound = self.load_factor * sum(instance.load for instance in connected) / len(connected)
+        for name in self._ring.walk(service_id):
+            instance = by_name.get(name)
+            if instance is not None and instance.load <= bound:
+                return instance
+        return min(connected, key=lambda candidate: candidate.load)
+
+    def placements(self) -> Dict[str, str]:
+        """Endpoint of the instance of each placed service"""
+        return {service_id: instance.name for service_id, instance in self._placed.items()}
+
+    def clear(self):
+        self._placed.clear()
+        self._ring = HashRing()
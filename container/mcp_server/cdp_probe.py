@@ -0,0 +1,97 @@
+"""
+DevTools readiness probe
+Polls Chrome's /json/version until the DevTools endpoint is usable
+
+Only the standard library is used, so the host scripts can import this
+module without the rest of the server's dependencies.
+"""
+
+import asyncio
+import json
+import time
+import urllib.request
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# Defaults for probing a Chrome that is starting up (seconds)
+DEFAULT_PROBE_TIMEOUT = 10.0
+INITIAL_DELAY = 0.05
+MAX_DELAY = 1.0
+# Timeout of a single /json/version request (seconds)
+REQUEST_TIMEOUT = 1.0
+
+@dataclass(frozen=True)
+class CDPEndpoint:
+    """A DevTools endpoint that answered /json/version"""
+    host: str
+    port: int
+    websocket_url: str
+    browser: str = ""
+    protocol_version: str = ""
+
+    @property
+    def http_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+def backoff_delays(initial: float = INITIAL_DELAY, maximum: float = MAX_DELAY) -> Iterator[float]:
+    """Exponential backoff: initial, doubling up to maximum"""
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * 2, maximum)
+
+def fetch_version(host: str = "127.0.0.1", port: int = 9222,
+                  timeout: float = REQUEST_TIMEOUT) -> Optional[CDPEndpoint]:
+    """Request /json/version once (blocking); None unless it returns a websocket URL
+
+    Chrome's answer names the address it listens on, which differs from the
+    probed one behind port mappings, so the websocket URL is pointed back at
+    host:port.
+    """
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/json/version", timeout=timeout) as response:
+            version = json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return None
+    websocket_url = version.get('webSocketDebuggerUrl') if isinstance(version, dict) else None
+    if not websocket_url:
+        return None
+    parts = urlsplit(websocket_url)
+    return CDPEndpoint(
+        host=host,
+        port=port,
+        websocket_url=urlunsplit(parts._replace(netloc=f"{host}:{port}")),
+        browser=version.get('Browser', ""),
+        protocol_version=version.get('Protocol-Version', "")
+    )
+
+def wait_for_cdp(host: str = "127.0.0.1", port: int = 9222, timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 is_alive: Optional[Callable[[], bool]] = None) -> Optional[CDPEndpoint]:
+    """Poll /json/version with backoff until it answers or timeout passes (blocking)
+
+    is_alive lets the caller stop early, e.g. when the Chrome process exited.
+    """
+    deadline = time.monotonic() + timeout
+    for delay in backoff_delays():
+        endpoint = fetch_version(host, port)
+        if endpoint or (is_alive is not None and not is_alive()):
+            return endpoint
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+
+async def probe_cdp(host: str = "127.0.0.1", port: int = 9222, timeout: float = DEFAULT_PROBE_TIMEOUT,
+                    is_alive: Optional[Callable[[], bool]] = None) -> Optional[CDPEndpoint]:
+    """Asyncio version of wait_for_cdp; requests run in the default executor"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    for delay in backoff_delays():
+        endpoint = await loop.run_in_executor(None, fetch_version, host, port)
+        if endpoint or (is_alive is not None and not is_alive()):
+            return endpoint
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(delay, remaining))
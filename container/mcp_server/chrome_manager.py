@@ -1,24 +1,40 @@
 """
 Chrome Manager - Automatically start and manage Chrome with debug port
 """
+import asyncio
 import os
 import sys
 import subprocess
-import time
 import platform
-from typing import Optional
+from typing import List, Optional
 import logging
-import socket
-import json
+
+from .cdp_probe import CDPEndpoint, fetch_version, probe_cdp
+from .host_client import HostChromeClient, HostServiceError
+from .host_protocol import DEFAULT_SERVICE_PORT
 
 logger = logging.getLogger("terminail-chrome-manager")
 
+# Port of the host Chrome service (scripts/host_chrome_service.py)
+HOST_SERVICE_PORT = DEFAULT_SERVICE_PORT
+
+# How long Chrome may take to serve the DevTools endpoint (seconds)
+CHROME_START_TIMEOUT = 10.0
+# How long to wait for Chrome started outside the container, e.g. by hand (seconds)
+HOST_CHROME_WAIT_TIMEOUT = 5.0
+
 class ChromeManager:
     """Manages Chrome browser lifecycle for debugging"""
     
     def __init__(self, debug_port: int = 9222):
         self.debug_port = debug_port
-        self.chrome_process: Optional[subprocess.Popen] = None
+        self.chrome_process: Optional[asyncio.subprocess.Process] = None
+        # Last DevTools endpoint that answered, connect_over_cdp can use its websocket URL directly
+        self.endpoint: Optional[CDPEndpoint] = None
+        # Every instance started by start_pool, the one on debug_port first
+        self.endpoints: List[CDPEndpoint] = []
+        # Connection to the host Chrome service, opened on first use in a container
+        self.host_client: Optional[HostChromeClient] = None
         self.chrome_paths = self._get_chrome_paths()
         self.is_container = self._is_running_in_container()
     
@@ -85,22 +101,87 @@ class ChromeManager:
                 return path
         return None
     
-    def is_chrome_running(self) -> bool:
-        """Check if Chrome is already running with debug port"""
+    async def is_chrome_running(self) -> bool:
+        """Check if Chrome is serving the DevTools endpoint on the debug port
+
+        An open port alone is not enough, Chrome accepts connections before
+        connect_over_cdp can use them.
+        """
+        endpoint = await asyncio.get_running_loop().run_in_executor(None, fetch_version, "127.0.0.1", self.debug_port)
+        if endpoint:
+            self.endpoint = endpoint
+        return endpoint is not None
+    
+    async def wait_until_running(self, timeout: float = CHROME_START_TIMEOUT) -> bool:
+        """Poll the DevTools endpoint with exponential backoff until it answers or timeout passes"""
+        def is_alive() -> bool:
+            if self.chrome_process and self.chrome_process.returncode is not None:
+                logger.error(f"Chrome exited with code {self.chrome_process.returncode}")
+                return False
+            return True
+        
+        endpoint = await probe_cdp("127.0.0.1", self.debug_port, timeout, is_alive=is_alive)
+        if endpoint:
+            self.endpoint = endpoint
+        return endpoint is not None
+    
+    def _host_client(self) -> HostChromeClient:
+        if self.host_client is None:
+            self.host_client = HostChromeClient('127.0.0.1', HOST_SERVICE_PORT)
+        return self.host_client
+    
+    async def _request_host_chrome(self, headless: bool = False) -> bool:
+        """Ask the host Chrome service to start Chrome; returns True once the host reports it ready"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            # When in container, Chrome runs on host, so we check localhost
-            result = sock.connect_ex(('127.0.0.1', self.debug_port))
-            sock.close()
-            return result == 0
-        except:
+            result = await self._host_client().start(port=self.debug_port, headless=headless,
+                                                  timeout=CHROME_START_TIMEOUT)
+        except HostServiceError as e:
+            logger.warning(f"Host Chrome service could not start Chrome: {e}")
             return False
+        
+        logger.info(f"Host Chrome service: {result.get('message', 'Chrome ready')}")
+        return True
+    
+    async def start_pool(self, count: int, headless: bool = False) -> bool:
+        """Start count Chrome instances on consecutive debug ports from debug_port
+
+        Only the host Chrome service runs several instances; elsewhere, or
+        when the service cannot be reached, a single Chrome is started.
+        Returns True when at least the instance on debug_port is ready.
+        """
+        if count > 1 and self.is_container:
+            try:
+                result = await self._host_client().start_pool(count, port=self.debug_port, headless=headless,
+                                                              timeout=CHROME_START_TIMEOUT)
+            except HostServiceError as e:
+                logger.warning(f"Host Chrome service could not start {count} instances: {e}")
+            else:
+                for port, error in (result.get('errors') or {}).items():
+                    logger.warning(f"Chrome instance on port {port} did not start: {error}")
+                self.endpoints = [
+                    CDPEndpoint("127.0.0.1", instance['port'], instance['websocket_url'], instance.get('browser', ""))
+                    for instance in result.get('instances', []) if instance.get('websocket_url')
+                ]
+                self.endpoints.sort(key=lambda endpoint: endpoint.port != self.debug_port)
+                if self.endpoints and self.endpoints[0].port == self.debug_port:
+                    logger.info(f"{len(self.endpoints)} Chrome instances ready on the host")
+                    self.endpoint = self.endpoints[0]
+                    return True
+        elif count > 1:
+            logger.warning("Several Chrome instances need the host Chrome service, starting one")
+        
+        started = await self.start_chrome(headless)
+        self.endpoints = [self.endpoint] if started and self.endpoint else []
+        return started
     
-    def start_chrome(self, headless: bool = False) -> bool:
-        """Start Chrome with debug port"""
+    async def start_chrome(self, headless: bool = False) -> bool:
+        """Start Chrome with debug port
+
+        Returns once the DevTools endpoint answers, without blocking the event loop.
+        """
         try:
             # Check if Chrome is already running
-            if self.is_chrome_running():
+            if await self.is_chrome_running():
                 logger.info(f"Chrome is already running on port {self.debug_port}")
                 return True
             
@@ -108,36 +189,11 @@ class ChromeManager:
             if self.is_container:
                 logger.info("Running in Podman container - attempting to start host Chrome via service")
                 
-                # Try to connect to host Chrome service
-                try:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.connect(('127.0.0.1', 9223))  # Host service port
-                    
-                    # Send request to start Chrome
-                    request = {'action': 'start_chrome'}
-                    sock.send(json.dumps(request).encode('utf-8'))
-                    
-                    # Wait for response
-                    response_data = sock.recv(1024)
-                    response = json.loads(response_data.decode('utf-8'))
-                    sock.close()
-                    
-                    if response.get('success'):
-                        logger.info("Host Chrome service started Chrome successfully")
-                        # Wait a bit for Chrome to fully start
-                        time.sleep(3)
-                        
-                        # Check if Chrome is now running
-                        if self.is_chrome_running():
-                            logger.info(f"Chrome is now running on port {self.debug_port}")
-                            return True
-                        else:
-                            logger.warning("Host service reported success but Chrome is not accessible")
-                    else:
-                        logger.error(f"Host service failed to start Chrome: {response.get('error')}")
-                        
-                except Exception as e:
-                    logger.warning(f"Could not connect to host Chrome service: {e}")
+                if await self._request_host_chrome(headless):
+                    if await self.wait_until_running():
+                        logger.info(f"Chrome is now running on port {self.debug_port}")
+                        return True
+                    logger.warning("Host service reported success but Chrome is not accessible")
                 
                 # If service communication failed, provide user instructions
                 logger.info("Please start the host Chrome service:")
@@ -146,14 +202,12 @@ class ChromeManager:
                 logger.info(f"  podman run -p 9222:9222 -p 9223:9223 ...")
                 logger.info(f"Or manually start Chrome with: --remote-debugging-port={self.debug_port}")
                 
-                # Wait a bit and check again
-                time.sleep(5)
-                if self.is_chrome_running():
+                # Give a manually started Chrome a moment to come up
+                if await self.wait_until_running(HOST_CHROME_WAIT_TIMEOUT):
                     logger.info(f"Chrome is now running on port {self.debug_port}")
                     return True
-                else:
-                    logger.warning("Chrome is still not running. Please start host service or Chrome manually.")
-                    return False
+                logger.warning("Chrome is still not running. Please start host service or Chrome manually.")
+                return False
             
             # Find Chrome executable (when running on host)
             chrome_path = self._find_chrome_executable()
@@ -182,27 +236,21 @@ class ChromeManager:
                 cmd.append("--headless=new")
             
             # Start Chrome process
+            kwargs = {}
             if platform.system() == "Windows":
                 # On Windows, we need to use CREATE_NEW_PROCESS_GROUP
-                self.chrome_process = subprocess.Popen(
-                    cmd,
-                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-            else:
-                self.chrome_process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
+                kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+            self.chrome_process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                **kwargs
+            )
             
-            # Wait for Chrome to start
-            for i in range(10):  # Wait up to 10 seconds
-                if self.is_chrome_running():
-                    logger.info(f"Chrome started successfully on port {self.debug_port}")
-                    return True
-                time.sleep(1)
+            # Wait for the DevTools endpoint
+            if await self.wait_until_running():
+                logger.info(f"Chrome started successfully on port {self.debug_port}")
+                return True
             
             logger.error("Chrome failed to start within timeout")
             return False
@@ -211,32 +259,37 @@ class ChromeManager:
             logger.error(f"Failed to start Chrome: {e}")
             return False
     
-    def stop_chrome(self):
+    async def stop_chrome(self):
         """Stop Chrome process"""
+        if self.host_client:
+            await self.host_client.close()
+            self.host_client = None
         if self.chrome_process:
             try:
-                self.chrome_process.terminate()
-                self.chrome_process.wait(timeout=5)
+                if self.chrome_process.returncode is None:
+                    self.chrome_process.terminate()
+                    await asyncio.wait_for(self.chrome_process.wait(), timeout=5)
                 logger.info("Chrome stopped successfully")
-            except:
+            except Exception:
                 try:
                     self.chrome_process.kill()
+                    await self.chrome_process.wait()
                     logger.info("Chrome killed forcefully")
                 except Exception as e:
                     logger.error(f"Failed to stop Chrome: {e}")
             finally:
                 self.chrome_process = None
     
-    def __enter__(self):
+    async def __aenter__(self):
         """Context manager entry"""
-        if self.start_chrome():
+        if await self.start_chrome():
             return self
         else:
             raise RuntimeError("Failed to start Chrome")
     
-    def __exit__(self, exc_type, exc_val, exc_tb):
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
-        self.stop_chrome()
+        await self.stop_chrome()
 
 
 # Example usage
@@ -244,11 +297,14 @@ if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(level=logging.INFO)
     
-    # Example of automatic Chrome management
-    try:
-        with ChromeManager() as chrome_manager:
+    async def example():
+        # Example of automatic Chrome management
+        async with ChromeManager():
             print("Chrome started automatically!")
             print("You can now connect to Chrome on port 9222")
-            input("Press Enter to stop Chrome...")
+            await asyncio.get_running_loop().run_in_executor(None, input, "Press Enter to stop Chrome...")
+    
+    try:
+        asyncio.run(example())
     except Exception as e:
         print(f"Failed to manage Chrome: {e}")
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Versioned configuration snapshots with hot reload
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import yaml
+
+from .service_registry import ServiceRegistry
+
+logger = logging.getLogger("terminail-mcp-config")
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
+
+# Minimum interval between checks of the file's mtime when no watcher runs (seconds)
+CONFIG_CHECK_INTERVAL = 1.0
+
+# Interval used by the watcher when config_watch.interval_seconds is not set (seconds)
+DEFAULT_WATCH_INTERVAL = 2.0
+
+# Fallbacks when browser timeouts are not configured (milliseconds)
+DEFAULT_RESPONSE_TIMEOUT_MS = 60000
+DEFAULT_OPERATION_TIMEOUT_MS = 30000
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable view of config.yaml at one point in time
+
+    A request should take one snapshot when it starts and use it throughout,
+    so a reload never changes settings in the middle of a request.
+    """
+    version: int
+    path: str
+    data: Mapping[str, Any]
+    services: ServiceRegistry
+    loaded_at: float
+
+    @classmethod
+    def from_dict(cls, data: Dict, version: int = 0, path: str = "") -> "ConfigSnapshot":
+        """Build a snapshot from a parsed configuration"""
+        return cls(
+            version=version,
+            path=path,
+            data=_freeze(data or {}),
+            services=ServiceRegistry.from_config(data or {}),
+            loaded_at=time.time()
+        )
+
+    def section(self, name: str) -> Mapping[str, Any]:
+        """Get a top-level section, empty when missing"""
+        return self.data.get(name) or MappingProxyType({})
+
+    @property
+    def browser(self) -> Mapping[str, Any]:
+        return self.section('browser')
+
+    @property
+    def response_timeout(self) -> int:
+        """Maximum time to wait for an AI response (milliseconds)"""
+        return int(self.browser.get('response_timeout', DEFAULT_RESPONSE_TIMEOUT_MS))
+
+    @property
+    def operation_timeout(self) -> int:
+        """Timeout for browser operations such as page loads (milliseconds)"""
+        return int(self.browser.get('operation_timeout', DEFAULT_OPERATION_TIMEOUT_MS))
+
+    @property
+    def concurrency(self) -> Mapping[str, Any]:
+        """The performance.concurrency section"""
+        return self.section('performance').get('concurrency') or MappingProxyType({})
+
+    @property
+    def caching(self) -> Mapping[str, Any]:
+        """The performance.caching section"""
+        return self.section('performance').get('caching') or MappingProxyType({})
+
+    @property
+    def logging_level(self) -> str:
+        return str(self.section('logging').get('level', 'INFO')).upper()
+
+    @property
+    def watch_interval(self) -> float:
+        """How often the watcher checks config.yaml for changes (seconds)"""
+        return float(self.section('config_watch').get('interval_seconds', DEFAULT_WATCH_INTERVAL))
+
+class ConfigStore:
+    """Holds the current ConfigSnapshot and swaps it atomically when the file changes"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._version = 0
+        self._listeners: List[Callable[[ConfigSnapshot], None]] = []
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        return self._path or CONFIG_PATH
+
+    def current(self) -> ConfigSnapshot:
+        """Get the current snapshot
+
+        While the watcher runs this never touches the disk. Without a watcher
+        the file's mtime is checked at most every CONFIG_CHECK_INTERVAL seconds.
+        """
+        snapshot = self._snapshot
+        if (snapshot is None or snapshot.path != self.path
+                or (self._watch_task is None and time.monotonic() - self._checked_at >= CONFIG_CHECK_INTERVAL)):
+            self.reload()
+            snapshot = self._snapshot
+        return snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the configuration if it changed; returns True when a new snapshot was installed"""
+        loaded = self._read(force)
+        return loaded is not None and self._install(*loaded, force=force)
+
+    def _read(self, force: bool = False) -> Optional[Tuple[Dict, Optional[int], str]]:
+        """Parse the file if it changed: (data, mtime, path), or None to keep the current snapshot
+
+        Only reads the disk, so it may run on a worker thread.
+        """
+        self._checked_at = time.monotonic()
+        path = self.path
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            current, current_mtime = self._snapshot, self._mtime
+        if not force and current is not None and current.path == path and mtime == current_mtime:
+            return None
+
+        data = {}
+        if mtime is not None:
+            try:
+                with open(path, 'r') as f:
+                    data = yaml.safe_load(f) or {}
+            except Exception as e:
+                logger.warning(f"Failed to load configuration: {e}")
+                if current is not None:
+                    # Keep serving the last good configuration
+                    return None
+        return data, mtime, path
+
+    def _install(self, data: Dict, mtime: Optional[int], path: str, force: bool = False) -> bool:
+        """Swap in a snapshot of data and notify the listeners on the calling thread"""
+        with self._lock:
+            current = self._snapshot
+            if not force and current is not None and current.path == path and mtime == self._mtime:
+                # Installed meanwhile by another reload
+                return False
+            self._version += 1
+            snapshot = ConfigSnapshot.from_dict(data, version=self._version, path=path)
+            self._mtime = mtime
+            self._snapshot = snapshot
+            listeners = list(self._listeners)
+
+        if current is not None:
+            logger.info(f"Configuration reloaded (version {snapshot.version})")
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.warning(f"Configuration listener failed: {e}")
+        return True
+
+    def invalidate(self):
+        """Force the configuration to be re-read on next access"""
+        with self._lock:
+            self._snapshot = None
+
+    def subscribe(self, listener: Callable[[ConfigSnapshot], None]):
+        """Call listener with every new snapshot"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[ConfigSnapshot], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def start_watching(self, interval: Optional[float] = None):
+        """Start a background task that reloads the configuration when the file changes"""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch(interval))
+
+    async def stop_watching(self):
+        """Stop the background watcher"""
+        task, self._watch_task = self._watch_task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _watch(self, interval: Optional[float]):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval or self.current().watch_interval)
+            try:
+                # File I/O and YAML parsing stay off the event loop; listeners
+                # drive loop state (scheduler waiters, caches), so they run on it
+                loaded = await loop.run_in_executor(None, self._read)
+                if loaded is not None:
+                    self._install(*loaded)
+            except Exception as e:
+                logger.warning(f"Configuration watcher error: {e}")
+
+config_store = ConfigStore()
+
+def current_config() -> ConfigSnapshot:
+    """Get the current configuration snapshot"""
+    return config_store.current()
@@ -2,55 +2,186 @@
 Factory for creating AI handlers
 """
 
-from typing import Optional
+import importlib
+import logging
+from typing import Dict, Iterable, List, Optional, Type, Union
+
 from playwright.async_api import Page
 from .ai_handler_base import AIHandler
+from .config_store import current_config
+from .handler_spec import has_spec
+
+logger = logging.getLogger("terminail-mcp-handlers")
+
+# Entry point group under which installed packages can provide handlers:
+#   [project.entry-points."terminail.handlers"]
+#   my-ai = "my_package.handler:MyAIHandler"
+ENTRY_POINT_GROUP = "terminail.handlers"
+
+# Built-in handlers, imported the first time their service is used
+BUILTIN_HANDLERS: Dict[str, str] = {
+    "deepseek": "mcp_server.handlers.deepseek_handler:DeepSeekHandler",
+    "doubao": "mcp_server.handlers.doubao_handler:DoubaoHandler",
+    "qwen": "mcp_server.handlers.qwen_handler:QwenHandler",
+    "yuanbao": "mcp_server.handlers.yuanbao_handler:YuanbaoHandler",
+    "ernie": "mcp_server.handlers.ernie_handler:ErnieHandler",
+    "kimi": "mcp_server.handlers.kimi_handler:KimiHandler",
+    "tongyi-wanxiang": "mcp_server.handlers.tongyi_wanxiang_handler:TongyiWanxiangHandler",
+    "wenxin-yiyan": "mcp_server.handlers.wenxin_yiyan_handler:WenxinYiyanHandler",
+    "chatgpt": "mcp_server.handlers.chatgpt_handler:ChatgptHandler",
+    "claude": "mcp_server.handlers.claude_handler:ClaudeHandler",
+    "gemini": "mcp_server.handlers.gemini_handler:GeminiHandler",
+    "copilot": "mcp_server.handlers.copilot_handler:CopilotHandler",
+    "perplexity": "mcp_server.handlers.perplexity_handler:PerplexityHandler",
+    "grok": "mcp_server.handlers.grok_handler:GrokHandler",
+    "pi": "mcp_server.handlers.pi_handler:PiHandler",
+    "quark": "mcp_server.handlers.quark_handler:QuarkHandler",
+    "huggingchat": "mcp_server.handlers.huggingchat_handler:HuggingchatHandler",
+    "leonardo-ai": "mcp_server.handlers.leonardo_ai_handler:LeonardoAiHandler"
+}
+
+HandlerTarget = Union[str, Type[AIHandler]]
+
+def _entry_points() -> Iterable:
+    """Installed entry points of ENTRY_POINT_GROUP"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return []
+    found = entry_points()
+    if hasattr(found, "select"):
+        return found.select(group=ENTRY_POINT_GROUP)
+    return found.get(ENTRY_POINT_GROUP, [])
+
+class HandlerRegistry:
+    """Maps service ids to handler classes, importing each one only when it is needed
+
+    Targets are "module:Class" strings, handler classes or entry points.
+    Plugins found under ENTRY_POINT_GROUP replace built-ins with the same
+    id. Services without a registered class fall back to a handler generated
+    from their spec. Handlers are cached per (service, page) and rebuilt
+    once the configuration they were created with has been reloaded.
+    """
+
+    # Page attribute holding the handlers created for it. A handler refers to
+    # its page, so they are kept on the page itself and go away together once
+    # Playwright drops the closed page; a registry-side map would keep both alive.
+    PAGE_ATTRIBUTE = "_terminail_handlers"
+
+    def __init__(self, handlers: Optional[Dict[str, HandlerTarget]] = None, discover_plugins: bool = True):
+        self._targets: Dict[str, object] = {
+            service_id.lower(): target for service_id, target in (handlers or {}).items()
+        }
+        self._discover_plugins = discover_plugins
+        self._discovered = False
+        self._classes: Dict[str, Optional[Type[AIHandler]]] = {}
+        # Replaced by clear() so that handlers cached on pages are ignored
+        self._generation = object()
+
+    def register(self, service_id: str, target: HandlerTarget):
+        """Register a handler class or a "module:Class" path for a service"""
+        service_id = service_id.lower()
+        self._targets[service_id] = target
+        self._classes.pop(service_id, None)
+
+    def _discover(self):
+        if self._discovered or not self._discover_plugins:
+            return
+        self._discovered = True
+        try:
+            for entry_point in _entry_points():
+                logger.info(f"Handler plugin for {entry_point.name}: {entry_point.value}")
+                self.register(entry_point.name, entry_point)
+        except Exception as e:
+            logger.warning(f"Handler plugin discovery failed: {e}")
 
-# Import handlers
-from .handlers.deepseek_handler import DeepSeekHandler
-from .handlers.doubao_handler import DoubaoHandler
-from .handlers.qwen_handler import QwenHandler
-from .handlers.yuanbao_handler import YuanbaoHandler
-from .handlers.ernie_handler import ErnieHandler
-from .handlers.kimi_handler import KimiHandler
-from .handlers.tongyi_wanxiang_handler import TongyiWanxiangHandler
-from .handlers.wenxin_yiyan_handler import WenxinYiyanHandler
-from .handlers.chatgpt_handler import ChatgptHandler
-from .handlers.claude_handler import ClaudeHandler
-from .handlers.gemini_handler import GeminiHandler
-from .handlers.copilot_handler import CopilotHandler
-from .handlers.perplexity_handler import PerplexityHandler
-from .handlers.grok_handler import GrokHandler
-from .handlers.pi_handler import PiHandler
-from .handlers.quark_handler import QuarkHandler
-from .handlers.huggingchat_handler import HuggingchatHandler
-from .handlers.leonardo_ai_handler import LeonardoAiHandler
+    def service_ids(self) -> List[str]:
+        """Service ids with a registered handler class"""
+        self._discover()
+        return sorted(self._targets)
+
+    def handler_class(self, service_id: str) -> Optional[Type[AIHandler]]:
+        """Get the handler class of a service, importing it on first use"""
+        self._discover()
+        service_id = service_id.lower()
+        if service_id in self._classes:
+            return self._classes[service_id] or spec_handler_class(service_id)
+
+        handler_class = None
+        target = self._targets.get(service_id)
+        if target is not None:
+            try:
+                handler_class = self._load(target)
+            except Exception as e:
+                logger.error(f"Failed to load handler for {service_id}: {e}")
+        if handler_class is not None and not (isinstance(handler_class, type) and issubclass(handler_class, AIHandler)):
+            logger.error(f"Handler for {service_id} is not an AIHandler subclass: {handler_class!r}")
+            handler_class = None
+        self._classes[service_id] = handler_class
+        return handler_class or spec_handler_class(service_id)
+
+    @staticmethod
+    def _load(target: object) -> object:
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            return getattr(importlib.import_module(module_name), attribute)
+        if hasattr(target, "load") and not isinstance(target, type):
+            # importlib.metadata.EntryPoint
+            return target.load()
+        return target
+
+    def create(self, service_id: str, page: Page) -> Optional[AIHandler]:
+        """Get the handler for a service on a page, reusing the one created before"""
+        service_id = service_id.lower()
+        handlers = self._page_handlers(page)
+        handler = handlers.get(service_id)
+        if handler is not None and handler.config.version == current_config().version:
+            return handler
+
+        handler_class = self.handler_class(service_id)
+        if handler_class is None:
+            return None
+        handler = handler_class(page)
+        handlers[service_id] = handler
+        return handler
+
+    def _page_handlers(self, page: Page) -> Dict[str, AIHandler]:
+        cached = getattr(page, self.PAGE_ATTRIBUTE, None)
+        if isinstance(cached, tuple) and cached[0] is self._generation:
+            return cached[1]
+        handlers: Dict[str, AIHandler] = {}
+        try:
+            setattr(page, self.PAGE_ATTRIBUTE, (self._generation, handlers))
+        except AttributeError:
+            # Pages that cannot carry attributes are not cached
+            pass
+        return handlers
+
+    def clear(self):
+        """Forget cached handler instances"""
+        self._generation = object()
+
+handler_registry = HandlerRegistry(BUILTIN_HANDLERS)
 
 def create_ai_handler(ai_service: str, page: Page) -> Optional[AIHandler]:
     """Factory function to create AI handler based on service name"""
-    handlers = {
-        "deepseek": DeepSeekHandler,
-        "doubao": DoubaoHandler,
-        "qwen": QwenHandler,
-        "yuanbao": YuanbaoHandler,
-        "ernie": ErnieHandler,
-        "kimi": KimiHandler,
-        "tongyi-wanxiang": TongyiWanxiangHandler,
-        "wenxin-yiyan": WenxinYiyanHandler,
-        "chatgpt": ChatgptHandler,
-        "claude": ClaudeHandler,
-        "gemini": GeminiHandler,
-        "copilot": CopilotHandler,
-        "perplexity": PerplexityHandler,
-        "grok": GrokHandler,
-        "pi": PiHandler,
-        "quark": QuarkHandler,
-        "huggingchat": HuggingchatHandler,
-        "leonardo-ai": LeonardoAiHandler
-    }
-    
-    handler_class = handlers.get(ai_service.lower())
-    if handler_class:
-        return handler_class(page)
-    
-    return None
\ No newline at end of file
+    return handler_registry.create(ai_service, page)
+
+# Generated handler classes of services that have a spec but no module
+_spec_handlers: Dict[str, Type[AIHandler]] = {}
+
+def spec_handler_class(service_id: str) -> Optional[Type[AIHandler]]:
+    """Handler class driven purely by the spec of a service
+
+    Available when the service has a bundled spec or a handler section in
+    config.yaml; None otherwise.
+    """
+    service = current_config().services.get(service_id)
+    if not has_spec(service_id) and not (service and service.handler):
+        return None
+    handler_class = _spec_handlers.get(service_id)
+    if handler_class is None:
+        namespace = {"display_name": service.name} if service else {}
+        handler_class = type(f"SpecHandler[{service_id}]", (AIHandler,), namespace, spec=service_id)
+        _spec_handlers[service_id] = handler_class
+    return handler_class
@@ -0,0 +1,97 @@
+"""
+Declarative handler specs
+Describe how to drive an AI site (input, submit, answer, completion, network, waits) as data
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Tuple
+
+import yaml
+
+SPECS_DIR = os.path.join(os.path.dirname(__file__), 'handler_specs')
+
+class SpecError(ValueError):
+    """Raised when a handler spec is malformed"""
+
+# Spec key path -> (AIHandler attribute, expected type)
+SPEC_ATTRIBUTES: Dict[Tuple[str, ...], Tuple[str, type]] = {
+    ("display_name",): ("display_name", str),
+    ("default_url",): ("default_url", str),
+    ("input", "selectors"): ("input_selectors", list),
+    ("submit", "buttons"): ("button_selectors", list),
+    ("submit", "press_enter"): ("submit_with_enter", bool),
+    ("answer", "selectors"): ("answer_selectors", list),
+    ("answer", "join_nodes"): ("join_answer_nodes", bool),
+    ("completion", "stop_selectors"): ("stop_selectors", list),
+    ("completion", "stable_ms"): ("answer_stable_ms", int),
+    ("completion", "start_timeout_ms"): ("answer_start_timeout_ms", int),
+    ("network", "pattern"): ("network_pattern", str),
+    ("network", "format"): ("network_format", str),
+    ("waits", "stream_poll_ms"): ("stream_poll_ms", int),
+    ("waits", "ready_check_ms"): ("ready_check_ms", int)
+}
+
+_SECTIONS = {path[0] for path in SPEC_ATTRIBUTES if len(path) > 1}
+
+def _check(path: str, value: Any, expected: type) -> Any:
+    if expected is list:
+        if not isinstance(value, (list, tuple)) or not all(isinstance(item, str) for item in value):
+            raise SpecError(f"{path} must be a list of selectors")
+        return list(value)
+    if expected is int and (isinstance(value, bool) or not isinstance(value, int)):
+        raise SpecError(f"{path} must be an integer")
+    if not isinstance(value, expected):
+        raise SpecError(f"{path} must be a {expected.__name__}")
+    return value
+
+def parse_spec(spec: Mapping[str, Any]) -> Dict[str, Any]:
+    """Turn a spec into the AIHandler attributes it sets
+
+    Keys that are left out keep the handler's defaults, so a spec in
+    config.yaml only needs the settings it changes.
+    """
+    if not isinstance(spec, Mapping):
+        raise SpecError("A handler spec must be a mapping")
+    attributes = {}
+    for key, value in spec.items():
+        if key in _SECTIONS:
+            if not isinstance(value, Mapping):
+                raise SpecError(f"{key} must be a mapping")
+            for sub_key, sub_value in value.items():
+                if (key, sub_key) not in SPEC_ATTRIBUTES:
+                    raise SpecError(f"Unknown handler spec key: {key}.{sub_key}")
+                attribute, expected = SPEC_ATTRIBUTES[(key, sub_key)]
+                attributes[attribute] = _check(f"{key}.{sub_key}", sub_value, expected)
+        elif (key,) in SPEC_ATTRIBUTES:
+            attribute, expected = SPEC_ATTRIBUTES[(key,)]
+            attributes[attribute] = _check(key, value, expected)
+        else:
+            raise SpecError(f"Unknown handler spec key: {key}")
+    return attributes
+
+@lru_cache(maxsize=None)
+def _load(service_id: str) -> Tuple[Tuple[str, Any], ...]:
+    path = os.path.join(SPECS_DIR, f"{service_id}.yaml")
+    if not os.path.exists(path):
+        return ()
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            attributes = parse_spec(yaml.safe_load(f) or {})
+        except SpecError as e:
+            raise SpecError(f"{path}: {e}") from e
+    return tuple(attributes.items())
+
+def load_spec(service_id: str) -> Dict[str, Any]:
+    """AIHandler attributes from the bundled spec of a service, empty when there is none"""
+    return {attribute: list(value) if isinstance(value, list) else value
+            for attribute, value in _load(service_id)}
+
+def has_spec(service_id: str) -> bool:
+    return os.path.exists(os.path.join(SPECS_DIR, f"{service_id}.yaml"))
+
+def available_specs() -> List[str]:
+    """Service ids with a bundled spec"""
+    if not os.path.isdir(SPECS_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(SPECS_DIR) if name.endswith('.yaml'))
@@ -2,88 +2,7 @@
 Handler for Wenxin Yiyan AI
 """
 
-from playwright.async_api import Page
 from ..ai_handler_base import AIHandler
-from ..utils import get_ai_service_by_id
 
-class WenxinYiyanHandler(AIHandler):
-    """Handler for Wenxin Yiyan AI"""
-    
-    def __init__(self, page: Page):
-        super().__init__(page)
-        self.service = get_ai_service_by_id("wenxin-yiyan")
-    
-    async def navigate_to_service(self) -> None:
-        """Navigate to Wenxin Yiyan website"""
-        if not self.page:
-            raise RuntimeError("Browser page not available")
-        
-        # Get URL from configuration
-        url = self.service.url if self.service else "https://yiyan.baidu.com"
-        await self.page.goto(url)
-        await self.page.wait_for_timeout(3000)
-    
-    async def ask_question(self, question: str) -> str:
-        """Ask a question to Wenxin Yiyan and return the response"""
-        if not self.page:
-            raise RuntimeError("Browser page not available")
-            
-        # Find input box and input question
-        input_selectors = [
-            ".chat-input textarea",
-            "#chat-input",
-            "textarea[placeholder*='请输入']",
-            "textarea"
-        ]
-        
-        input_element = None
-        for selector in input_selectors:
-            elements = await self.page.query_selector_all(selector)
-            if elements:
-                input_element = elements[-1]
-                break
-        
-        if not input_element:
-            raise RuntimeError("Could not find input element for Wenxin Yiyan")
-        
-        await input_element.fill(question)
-        await self.page.wait_for_timeout(1000)
-        
-        # Find and click the send button
-        button_selectors = [
-            ".send-btn",
-            "button[type='submit']",
-            ".chat-send",
-            ".submit-button"
-        ]
-        
-        button_clicked = False
-        for selector in button_selectors:
-            button = await self.page.query_selector(selector)
-            if button:
-                await button.click()
-                button_clicked = True
-                break
-        
-        if not button_clicked:
-            await input_element.press("Enter")
-        
-        # Wait for response generation
-        await self.page.wait_for_timeout(10000)
-        
-        # Extract response content
-        answer_selectors = [
-            ".answer-content:last-child",
-            ".message-answer:last-child",
-            ".chat-response:last-child .content",
-            ".response-text:last-child"
-        ]
-        
-        for selector in answer_selectors:
-            answer_element = await self.page.query_selector(selector)
-            if answer_element:
-                answer = await answer_element.text_content()
-                if answer and answer.strip():
-                    return answer.strip()
-        
-        return "No answer found from Wenxin Yiyan - please check the website structure"
\ No newline at end of file
+class WenxinYiyanHandler(AIHandler, spec="wenxin-yiyan"):
+    """Handler for Wenxin Yiyan AI, driven by handler_specs/wenxin-yiyan.yaml"""
@@ -0,0 +1,61 @@
+"""
+Consistent hash ring
+Maps keys to nodes so that adding or removing a node only moves the keys of that node
+"""
+
+import bisect
+import hashlib
+from typing import Iterable, Iterator, List, Tuple
+
+# Points per node on the ring, more points spread keys more evenly
+DEFAULT_REPLICAS = 64
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+class HashRing:
+    """Consistent hash ring over node names"""
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = DEFAULT_REPLICAS):
+        self.replicas = max(1, replicas)
+        self._points: List[Tuple[int, str]] = []
+        self._nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def add(self, node: str):
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for replica in range(self.replicas):
+            bisect.insort(self._points, (_hash(f"{node}#{replica}"), node))
+
+    def remove(self, node: str):
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        self._points = [point for point in self._points if point[1] != node]
+
+    def walk(self, key: str) -> Iterator[str]:
+        """Every node once, in ring order starting at the key's position"""
+        if not self._points:
+            return
+        start = bisect.bisect(self._points, (_hash(key),))
+        seen = set()
+        for index in range(len(self._points)):
+            node = self._points[(start + index) % len(self._points)][1]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self._nodes):
+                    return
+
+    def get(self, key: str) -> str:
+        """Node owning the key"""
+        for node in self.walk(key):
+            return node
+        raise LookupError("Hash ring is empty")
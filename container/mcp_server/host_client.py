@@ -0,0 +1,156 @@
+"""
+Host Chrome service client
+Persistent, multiplexed connection from the container to scripts/host_chrome_service.py
+"""
+
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, Optional
+
+from .host_protocol import DEFAULT_SERVICE_PORT, ProtocolError, read_message, write_message
+
+logger = logging.getLogger("terminail-host-client")
+
+# Timeouts (seconds)
+CONNECT_TIMEOUT = 2.0
+REQUEST_TIMEOUT = 15.0
+
+class HostServiceError(Exception):
+    """Raised when the host service is unreachable or rejects a command"""
+
+class HostChromeClient:
+    """Sends commands to the host Chrome service over one persistent connection
+
+    Requests are tagged with an id and may be in flight concurrently; a
+    background task routes each response to its caller. The connection is
+    opened on the first request and reopened after it drops.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_SERVICE_PORT,
+                 connect_timeout: float = CONNECT_TIMEOUT, request_timeout: float = REQUEST_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._receiver: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), timeout=self.connect_timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                raise HostServiceError(f"Could not connect to host Chrome service on {self.host}:{self.port}: {e}") from e
+            self._receiver = asyncio.create_task(self._receive(self._reader))
+
+    async def _receive(self, reader: asyncio.StreamReader):
+        """Route responses to the futures of their requests until the connection drops"""
+        error: Exception = HostServiceError("Connection to host Chrome service closed")
+        try:
+            while True:
+                response = await read_message(reader)
+                future = self._pending.pop(response.get('id'), None)
+                if future is None or future.done():
+                    logger.debug(f"Discarding response to unknown request: {response}")
+                    continue
+                if response.get('ok'):
+                    future.set_result(response.get('result') or {})
+                else:
+                    future.set_exception(HostServiceError(response.get('error') or "Command failed"))
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError) as e:
+            logger.debug(f"Host Chrome service connection ended: {e}")
+        except ProtocolError as e:
+            error = HostServiceError(f"Invalid response from host Chrome service: {e}")
+        finally:
+            self._drop_connection(error)
+
+    def _drop_connection(self, error: Exception):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def request(self, command: str, arguments: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a command and wait for its result; raises HostServiceError on failure"""
+        await self.connect()
+        writer = self._writer
+        if writer is None:
+            raise HostServiceError(f"Connection to host Chrome service closed before {command}")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await write_message(writer, {**(arguments or {}), 'id': request_id, 'command': command})
+            return await asyncio.wait_for(future, timeout=timeout or self.request_timeout)
+        except asyncio.TimeoutError as e:
+            raise HostServiceError(f"Host Chrome service did not answer {command}") from e
+        except OSError as e:
+            raise HostServiceError(f"Could not send {command} to host Chrome service: {e}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def start(self, port: Optional[int] = None, headless: bool = False,
+                    timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Start Chrome on the host (or reuse a running one) and wait until it is ready
+
+        timeout bounds the host's readiness wait; the service default applies when omitted.
+        """
+        arguments: Dict[str, Any] = {'headless': headless}
+        if port is not None:
+            arguments['port'] = port
+        if timeout is not None:
+            arguments['timeout'] = timeout
+        return await self.request('start', arguments, timeout=(timeout or 0) + self.request_timeout)
+
+    async def start_pool(self, count: int, port: Optional[int] = None, headless: bool = False,
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Start count Chrome instances on consecutive debug ports from port"""
+        arguments: Dict[str, Any] = {'count': count, 'headless': headless}
+        if port is not None:
+            arguments['port'] = port
+        if timeout is not None:
+            arguments['timeout'] = timeout
+        return await self.request('start-pool', arguments, timeout=(timeout or 0) + self.request_timeout)
+
+    async def stop(self, port: int) -> Dict[str, Any]:
+        return await self.request('stop', {'port': port})
+
+    async def status(self, port: Optional[int] = None) -> Dict[str, Any]:
+        return await self.request('status', {} if port is None else {'port': port})
+
+    async def list_instances(self) -> Dict[str, Any]:
+        return await self.request('list-instances')
+
+    async def wait_ready(self, port: int, timeout: float) -> Dict[str, Any]:
+        """Wait on the host until the DevTools endpoint on port answers"""
+        return await self.request('wait-ready', {'port': port, 'timeout': timeout},
+                                  timeout=timeout + self.request_timeout)
+
+    async def close(self):
+        receiver, self._receiver = self._receiver, None
+        if receiver is not None:
+            receiver.cancel()
+            try:
+                await receiver
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._drop_connection(HostServiceError("Client closed"))
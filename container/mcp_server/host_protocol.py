@@ -0,0 +1,62 @@
+"""
+Host Chrome service protocol
+Length-prefixed JSON messages exchanged between the container and the host service
+
+Every message is a 4-byte big-endian length followed by that many bytes of
+UTF-8 JSON. Requests are {"id": n, "command": name, ...arguments}; each gets
+one response {"id": n, "ok": true, "result": {...}} or {"id": n, "ok":
+false, "error": message}. A connection stays open for any number of
+requests and responses may arrive out of order, matched by id.
+
+Only the standard library is used, so the host service can import this
+module without the rest of the server's dependencies.
+"""
+
+import asyncio
+import json
+import struct
+from typing import Any, Dict
+
+# Port the host service listens on
+DEFAULT_SERVICE_PORT = 9223
+
+# Commands understood by the host service
+COMMANDS = ("start", "start-pool", "stop", "status", "list-instances", "wait-ready")
+
+# Upper bound of a single message body (bytes)
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+class ProtocolError(Exception):
+    """Raised for malformed or oversized messages"""
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    if len(body) > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"Message of {len(body)} bytes exceeds {MAX_MESSAGE_SIZE}")
+    return _HEADER.pack(len(body)) + body
+
+def decode_body(body: bytes) -> Dict[str, Any]:
+    try:
+        message = json.loads(body.decode('utf-8'))
+    except ValueError as e:
+        raise ProtocolError(f"Invalid message: {e}") from e
+    if not isinstance(message, dict):
+        raise ProtocolError("A message must be a JSON object")
+    return message
+
+async def read_message(reader: asyncio.StreamReader, header: bytes = b"") -> Dict[str, Any]:
+    """Read one message; raises asyncio.IncompleteReadError at end of stream
+
+    header holds length bytes the caller already consumed, if any.
+    """
+    header += await reader.readexactly(_HEADER.size - len(header))
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_MESSAGE_SIZE:
+        raise ProtocolError(f"Message of {length} bytes exceeds {MAX_MESSAGE_SIZE}")
+    return decode_body(await reader.readexactly(length))
+
+async def write_message(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    writer.write(encode_message(message))
+    await writer.drain()
@@ -5,50 +5,115 @@ Web server based on FastAPI, providing browser automation functionality
 """
 
 import asyncio
+import json
 import logging
-import os
-import yaml
 from contextlib import asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
+from .ai_handler_base import NO_ANSWER_PREFIX, Answer
+from .answer_cache import AnswerCache
+from .batch import BatchManager
 from .browser import BrowserManager
+from .browser_instances import parse_endpoint
+from .config_store import config_store, current_config, ConfigSnapshot
+from .scheduler import PRIORITIES, QueueFullError
+from .selector_memo import selector_memo
 from .utils import load_ai_urls, load_ai_services
 
 # Load configuration
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-config = {}
-if os.path.exists(CONFIG_PATH):
-    with open(CONFIG_PATH, 'r') as f:
-        config = yaml.safe_load(f) or {}
+config = current_config()
 
 # Configure logging
-log_level = config.get('logging', {}).get('level', 'INFO')
-log_format = config.get('logging', {}).get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_level = config.logging_level
+log_format = config.section('logging').get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 logging.basicConfig(
-    level=getattr(logging, log_level.upper()),
+    level=getattr(logging, log_level, logging.INFO),
     format=log_format
 )
 logger = logging.getLogger("terminail-mcp-server")
 
+def apply_logging_config(snapshot: ConfigSnapshot):
+    """Apply the logging level from a reloaded configuration"""
+    level = getattr(logging, snapshot.logging_level, None)
+    if isinstance(level, int) and logging.getLogger().level != level:
+        logging.getLogger().setLevel(level)
+        logger.info(f"Logging level set to {snapshot.logging_level}")
+
 # Global browser manager instance
 browser_manager: Optional[BrowserManager] = None
+batch_manager: Optional[BatchManager] = None
+answer_cache: Optional[AnswerCache] = None
+
+def browser_available() -> bool:
+    """Whether requests can be served, now or once a reconnect in progress completes"""
+    return browser_manager is not None and bool(browser_manager.is_connected() or browser_manager.reconnecting)
+
+def parse_offset(value) -> int:
+    """Validate a batch result offset"""
+    try:
+        offset = int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid offset: {value!r}")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    return offset
+
+def parse_timeout(value) -> Optional[float]:
+    """Validate a per-service timeout in seconds; None means no limit"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+        raise HTTPException(status_code=400, detail=f"timeout must be a positive number of seconds, got {value!r}")
+    return float(value)
+
+def check_priority(priority: str):
+    """Reject unknown scheduler priorities"""
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid priority: {priority} (expected one of {', '.join(PRIORITIES)})"
+        )
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle management"""
-    global browser_manager
+    global browser_manager, batch_manager, answer_cache
     
     # Initialize browser manager on startup
     browser_manager = BrowserManager()
+    batch_manager = BatchManager()
+    answer_cache = AnswerCache.from_config(current_config())
     logger.info("MCP Server starting up...")
     
+    # Reload config.yaml when it changes; in-flight requests keep their snapshot
+    config_store.subscribe(apply_logging_config)
+    config_store.subscribe(answer_cache.configure)
+    selector_memo.configure(current_config())
+    config_store.subscribe(selector_memo.configure)
+    config_store.start_watching()
+    # Expired answers are dropped and the disk tier kept within max_disk_size_mb
+    answer_cache.start_purging()
+    
+    # Optionally connect and open every service now instead of on its first request
+    browser_manager.start_warm_up()
+    
     yield
     
     # Clean up resources on shutdown
+    await config_store.stop_watching()
+    config_store.unsubscribe(apply_logging_config)
+    config_store.unsubscribe(answer_cache.configure)
+    config_store.unsubscribe(selector_memo.configure)
+    await answer_cache.stop_purging()
+    answer_cache.close()
+    selector_memo.save()
+    if batch_manager:
+        await batch_manager.close()
     if browser_manager:
         await browser_manager.close()
     logger.info("MCP Server shutting down...")
@@ -81,25 +146,68 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    browser_status = "connected" if browser_manager and browser_manager.is_connected() else "disconnected"
+    """Health check endpoint
+
+    services holds the readiness of each warmed up service: "ready",
+    "degraded" (loaded but selectors did not resolve), "failed", "skipped",
+    or "pending"/"warming" while the warm-up runs. endpoints reports the
+    capacity of each connected CDP endpoint. browser is "reconnecting" while
+    a lost browser is being reattached.
+    """
+    if browser_manager and browser_manager.is_connected():
+        browser_status = "connected"
+    elif browser_manager and browser_manager.reconnecting:
+        browser_status = "reconnecting"
+    else:
+        browser_status = "disconnected"
     debug_port = browser_manager.debug_port if browser_manager and browser_manager.debug_port else 9222
     
     return {
         "status": "healthy",
         "browser": browser_status,
         "debug_port": debug_port,
+        "config_version": current_config().version,
+        "warming_up": bool(browser_manager and browser_manager.warming_up),
+        "services": dict(browser_manager.readiness) if browser_manager else {},
+        "endpoints": [instance.stats() for instance in browser_manager.instances] if browser_manager else [],
         "timestamp": asyncio.get_event_loop().time()
     }
 
+@app.get("/stats")
+async def get_stats():
+    """Scheduler, request coalescing, answer cache, selector memo, browser instance and resource blocking metrics"""
+    if not browser_manager:
+        raise HTTPException(status_code=500, detail="Browser manager not initialized")
+    return {
+        "scheduler": browser_manager.scheduler.stats(),
+        "single_flight": browser_manager.single_flight.stats(),
+        "cache": answer_cache.stats() if answer_cache else None,
+        "selectors": selector_memo.stats(),
+        "instances": [instance.stats() for instance in browser_manager.instances],
+        "placements": browser_manager.placement.placements(),
+        "resource_blocking": browser_manager.resource_blocking.stats()
+    }
+
 @app.post("/init")
 async def init_browser(request: dict):
-    """Initialize browser connection"""
+    """Initialize browser connection
+
+    endpoints, a list of "host:port" CDP endpoints, shards the AI services
+    across several browsers instead of connecting to debug_port.
+    """
     if not browser_manager:
         raise HTTPException(status_code=500, detail="Browser manager not initialized")
     
     debug_port = request.get("debug_port", 9222)
     auto_start = request.get("auto_start", False)
+    endpoints = request.get("endpoints")
+    if endpoints is not None and (not isinstance(endpoints, list) or not endpoints):
+        raise HTTPException(status_code=400, detail="endpoints must be a non-empty list of host:port strings")
+    try:
+        for endpoint in endpoints or []:
+            parse_endpoint(endpoint)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     try:
         # If auto_start is enabled, try to start Chrome automatically
@@ -108,25 +216,196 @@ async def init_browser(request: dict):
             if not started:
                 logger.warning("Failed to start Chrome automatically, trying to connect to existing instance")
         
-        await browser_manager.connect(debug_port)
+        if endpoints:
+            await browser_manager.connect(debug_port, endpoints=endpoints)
+        else:
+            await browser_manager.connect(debug_port)
+        browser_manager.start_warm_up(browser_manager.debug_port or debug_port)
         return {"success": True, "message": "Browser connected successfully"}
     except Exception as e:
         logger.error(f"Failed to connect to browser: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/ask")
-async def ask_question(ai: str, question: str):
-    """Ask question to the specified AI"""
-    if not browser_manager or not browser_manager.is_connected():
+async def ask_question(ai: str, question: str, response: Response, priority: str = "normal",
+                       cache_control: Optional[str] = Header(None)):
+    """Ask question to the specified AI
+
+    Answers are served from the answer cache when possible. Send
+    "Cache-Control: no-cache" to force a fresh answer (which is then cached)
+    or "Cache-Control: no-store" to bypass the cache entirely.
+    """
+    if not browser_available():
         raise HTTPException(status_code=400, detail="Browser not connected")
+    check_priority(priority)
+    
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    use_cache = answer_cache is not None and "no-store" not in directives
+    if use_cache and "no-cache" not in directives:
+        answer = await answer_cache.get(ai, question)
+        if answer is not None:
+            response.headers["X-Cache"] = "HIT"
+            return {"success": True, "answer": answer, "cached": True}
     
     try:
-        answer = await browser_manager.ask_ai(ai, question)
+        answer = await browser_manager.ask_ai(ai, question, priority=priority)
+        # Answers cut off by a timeout or read before they started are not kept
+        complete = isinstance(answer, Answer) and answer.complete
+        if use_cache and complete and not answer.startswith(NO_ANSWER_PREFIX):
+            await answer_cache.put(ai, question, answer)
+        response.headers["X-Cache"] = "MISS"
         return {"success": True, "answer": answer}
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Failed to ask question: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/ask/multi")
+async def ask_question_multi(request: dict):
+    """Ask one question to several AIs concurrently
+
+    Streams one JSON line per service as soon as it answers, followed by a
+    summary line. With "partial" set to false the first failure cancels the
+    remaining services.
+    """
+    if not browser_available():
+        raise HTTPException(status_code=400, detail="Browser not connected")
+    
+    ais = request.get("ais")
+    question = request.get("question")
+    if not ais or not isinstance(ais, list) or not question:
+        raise HTTPException(status_code=400, detail="AIs list and question parameters are required")
+    timeout = parse_timeout(request.get("timeout"))
+    partial = request.get("partial", True)
+    priority = request.get("priority", "normal")
+    check_priority(priority)
+    
+    async def result_stream():
+        succeeded = failed = 0
+        results = browser_manager.ask_many(ais, question, timeout=timeout, priority=priority)
+        try:
+            async for result in results:
+                if result["success"]:
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+                if not result["success"] and not partial:
+                    break
+        finally:
+            await results.aclose()
+        summary = {"done": True, "success": failed == 0, "succeeded": succeeded, "failed": failed}
+        yield json.dumps(summary) + "\n"
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+def batch_stream(job, offset: int = 0):
+    """NDJSON stream of a batch job: a header line, the results from offset and a summary line"""
+    async def lines():
+        yield json.dumps(job.summary(), ensure_ascii=False) + "\n"
+        async for result in job.follow(offset):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        yield json.dumps({"done": True, **job.summary()}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.post("/ask/batch")
+async def ask_question_batch(request: dict):
+    """Start (or resume) a batch job that asks many questions to one AI
+
+    Pass an existing "job_id" to resume it; results already collected are
+    not asked again.
+    """
+    if not browser_available():
+        raise HTTPException(status_code=400, detail="Browser not connected")
+    if not batch_manager:
+        raise HTTPException(status_code=500, detail="Batch manager not initialized")
+    
+    ai = request.get("ai")
+    questions = request.get("questions")
+    job_id = request.get("job_id")
+    existing = batch_manager.get(job_id) if job_id else None
+    if not existing and (not ai or not questions or not isinstance(questions, list)):
+        raise HTTPException(status_code=400, detail="AI and questions parameters are required")
+    offset = parse_offset(request.get("offset", 0))
+    
+    job = batch_manager.submit(browser_manager, ai, questions or [], job_id=job_id)
+    return batch_stream(job, offset)
+
+@app.get("/ask/batch/{job_id}")
+async def follow_question_batch(job_id: str, offset: int = 0):
+    """Stream the results of a batch job, starting at offset"""
+    job = batch_manager.get(job_id) if batch_manager else None
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    return batch_stream(job, parse_offset(offset))
+
+@app.delete("/ask/batch/{job_id}")
+async def cancel_question_batch(job_id: str):
+    """Cancel a running batch job"""
+    if not batch_manager or not await batch_manager.cancel(job_id):
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    return {"success": True, **batch_manager.get(job_id).summary()}
+
+@app.api_route("/ask/stream", methods=["GET", "POST"])
+async def ask_question_stream(ai: str, question: str, priority: str = "normal"):
+    """Ask question to the specified AI and stream the answer as Server-Sent Events"""
+    if not browser_available():
+        raise HTTPException(status_code=400, detail="Browser not connected")
+    check_priority(priority)
+    
+    async def event_stream():
+        try:
+            async for event in browser_manager.stream_ai(ai, question, priority=priority):
+                yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Failed to stream answer: {e}")
+            error = {"event": "error", "detail": str(e)}
+            yield f"event: error\ndata: {json.dumps(error, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ws/ask")
+async def ask_question_websocket(websocket: WebSocket):
+    """Stream answers over a WebSocket
+
+    Each message from the client is a JSON object {"ai": ..., "question": ...}
+    with an optional "priority"; the server replies with the same events as
+    /ask/stream.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            request = await websocket.receive_json()
+            ai = request.get("ai")
+            question = request.get("question")
+            priority = request.get("priority", "normal")
+            if not ai or not question:
+                await websocket.send_json({"event": "error", "detail": "AI and question parameters are required"})
+                continue
+            if priority not in PRIORITIES:
+                await websocket.send_json({"event": "error", "detail": f"Invalid priority: {priority}"})
+                continue
+            if not browser_available():
+                await websocket.send_json({"event": "error", "detail": "Browser not connected"})
+                continue
+            
+            try:
+                async for event in browser_manager.stream_ai(ai, question, priority=priority):
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to stream answer: {e}")
+                await websocket.send_json({"event": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
+
 @app.get("/ais")
 async def get_supported_ais():
     """Get supported AI list"""
@@ -159,7 +438,7 @@ async def get_supported_ais():
 @app.post("/switch")
 async def switch_ai(request: dict):
     """Switch to the specified AI"""
-    if not browser_manager or not browser_manager.is_connected():
+    if not browser_available():
         raise HTTPException(status_code=400, detail="Browser not connected")
     
     ai = request.get("ai")
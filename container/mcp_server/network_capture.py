@@ -0,0 +1,210 @@
+"""
+Network answer capture
+Reads AI answers from the completion stream the site fetches instead of the rendered page
+"""
+
+import asyncio
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.async_api import Page, Response
+
+logger = logging.getLogger("terminail-mcp-network")
+
+def parse_sse(body: str) -> List[Any]:
+    """Decode the JSON payloads of a server-sent event stream
+
+    A body without any "data:" lines is treated as a single JSON document.
+    Payloads that are not JSON, such as "[DONE]", are skipped.
+    """
+    events = []
+    data_lines: List[str] = []
+    found_data = False
+
+    def flush():
+        if data_lines:
+            payload = "\n".join(data_lines)
+            data_lines.clear()
+            try:
+                events.append(json.loads(payload))
+            except ValueError:
+                pass
+
+    for line in body.splitlines():
+        if not line.strip():
+            flush()
+        elif line.startswith("data:"):
+            found_data = True
+            data_lines.append(line[5:][1:] if line[5:].startswith(" ") else line[5:])
+    flush()
+
+    if not found_data and body.strip():
+        try:
+            events.append(json.loads(body))
+        except ValueError:
+            pass
+    return events
+
+def parse_openai(events: List[Any]) -> str:
+    """OpenAI-compatible chunks: choices[].delta.content, or choices[].message.content"""
+    parts = []
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        for choice in event.get("choices") or []:
+            delta = choice.get("delta") or choice.get("message") or {}
+            content = delta.get("content")
+            if isinstance(content, str):
+                parts.append(content)
+    return "".join(parts)
+
+def parse_chatgpt(events: List[Any]) -> str:
+    """ChatGPT conversation stream, both full-message events and JSON-patch deltas"""
+    text = ""
+    path = operation = None
+
+    def apply(patch_path, patch_operation, value):
+        nonlocal text
+        if patch_path == "/message/content/parts/0" and isinstance(value, str):
+            text = text + value if patch_operation == "append" else value
+        elif patch_operation == "patch" and isinstance(value, list):
+            for patch in value:
+                if isinstance(patch, dict):
+                    apply(patch.get("p"), patch.get("o"), patch.get("v"))
+
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        value = event.get("v")
+        message = event.get("message") or (value.get("message") if isinstance(value, dict) else None)
+        if isinstance(message, dict):
+            if (message.get("author") or {}).get("role") == "assistant":
+                parts = (message.get("content") or {}).get("parts") or []
+                if parts and isinstance(parts[0], str):
+                    text = parts[0]
+            continue
+        if "p" in event or "o" in event:
+            path, operation = event.get("p", path), event.get("o", operation)
+        if value is not None:
+            apply(path, operation, value)
+    return text
+
+def parse_deepseek(events: List[Any]) -> str:
+    """DeepSeek completion stream; reasoning ("thinking") content is left out"""
+    parts = []
+    path = None
+    fragment_type = "RESPONSE"
+
+    def add_fragments(fragments):
+        nonlocal fragment_type
+        for fragment in fragments or []:
+            if isinstance(fragment, dict):
+                fragment_type = fragment.get("type", fragment_type)
+                if fragment_type == "RESPONSE" and isinstance(fragment.get("content"), str):
+                    parts.append(fragment["content"])
+
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        # Older OpenAI-style chunks
+        for choice in event.get("choices") or []:
+            delta = choice.get("delta") or {}
+            if delta.get("type", "text") == "text" and isinstance(delta.get("content"), str):
+                parts.append(delta["content"])
+        if "v" not in event:
+            continue
+        path = event.get("p", path)
+        value = event["v"]
+        if isinstance(value, dict) and isinstance(value.get("response"), dict):
+            response = value["response"]
+            add_fragments(response.get("fragments"))
+            if isinstance(response.get("content"), str):
+                parts.append(response["content"])
+        elif isinstance(value, list) and path and path.endswith("fragments"):
+            add_fragments(value)
+        elif isinstance(value, str) and path and path.endswith("content") and "thinking" not in path:
+            if fragment_type == "RESPONSE":
+                parts.append(value)
+    return "".join(parts)
+
+def parse_kimi(events: List[Any]) -> str:
+    """Kimi completion stream: "cmpl" events carry the text"""
+    return "".join(
+        event["text"] for event in events
+        if isinstance(event, dict) and event.get("event") == "cmpl" and isinstance(event.get("text"), str)
+    )
+
+# Stream formats by name, as used by AIHandler.network_format
+PARSERS: Dict[str, Callable[[List[Any]], str]] = {
+    "openai": parse_openai,
+    "chatgpt": parse_chatgpt,
+    "deepseek": parse_deepseek,
+    "kimi": parse_kimi
+}
+
+@dataclass
+class CaptureResult:
+    """Outcome of a capture
+
+    completed is True when the completion response finished, which also
+    means the answer is complete even if text could not be parsed.
+    """
+    text: Optional[str] = None
+    completed: bool = False
+
+class NetworkCapture:
+    """Listens for the completion request of one question and parses its response"""
+
+    def __init__(self, page: Page, pattern: str, stream_format: str):
+        if stream_format not in PARSERS:
+            raise ValueError(f"Unknown stream format: {stream_format}")
+        self.page = page
+        self.pattern = re.compile(pattern)
+        self.parse = PARSERS[stream_format]
+        self._started: Optional[asyncio.Event] = None
+        self._done: Optional[asyncio.Future] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "NetworkCapture":
+        self._started = asyncio.Event()
+        self._done = asyncio.get_running_loop().create_future()
+        self.page.on("response", self._on_response)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.page.remove_listener("response", self._on_response)
+        if self._reader and not self._reader.done():
+            self._reader.cancel()
+
+    def _on_response(self, response: Response):
+        if self._started.is_set() or not self.pattern.search(response.url):
+            return
+        if response.request.method != "POST":
+            return
+        self._started.set()
+        self._reader = asyncio.ensure_future(self._read(response))
+
+    async def _read(self, response: Response):
+        try:
+            # Resolves once the whole stream has been received
+            body = await response.text()
+            result = CaptureResult(text=self.parse(parse_sse(body)).strip() or None, completed=True)
+        except Exception as e:
+            logger.debug(f"Could not read completion response {response.url}: {e}")
+            result = CaptureResult()
+        if not self._done.done():
+            self._done.set_result(result)
+
+    async def wait(self, start_timeout_ms: int, timeout_ms: int) -> CaptureResult:
+        """Wait for the completion response to start and then to finish"""
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        try:
+            await asyncio.wait_for(self._started.wait(), start_timeout_ms / 1000)
+            remaining = max(0.0, timeout_ms / 1000 - (loop.time() - started_at))
+            return await asyncio.wait_for(asyncio.shield(self._done), remaining)
+        except asyncio.TimeoutError:
+            return CaptureResult()
@@ -0,0 +1,146 @@
+"""
+Page pool module
+Keeps one warm browser tab per AI service and leases it to requests
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger("terminail-mcp-page-pool")
+
+# Fallback when browser.page_pool.max_pages is not configured
+DEFAULT_MAX_PAGES = 6
+
+class PagePool:
+    """Pool of browser tabs keyed by AI service id
+
+    Each service owns at most one tab. A tab is leased to one request at a
+    time, so requests for the same service queue up while requests for
+    different services run in parallel. When the pool is full the least
+    recently used idle tab is closed to make room.
+    """
+
+    def __init__(self, context: BrowserContext, max_pages: int = DEFAULT_MAX_PAGES,
+                 spare_pages: Optional[List[Page]] = None):
+        self.context = context
+        self.max_pages = max(1, max_pages)
+        # Tabs by service id, least recently used first
+        self._pages: "OrderedDict[str, Page]" = OrderedDict()
+        self._leased: Set[str] = set()
+        self._service_locks: Dict[str, asyncio.Lock] = {}
+        self._condition = asyncio.Condition()
+        # Existing tabs (e.g. the one the user had open) that can be adopted
+        self._spare_pages: List[Page] = list(spare_pages or [])
+        # Tabs opened by the pool, closed again on shutdown
+        self._owned: Set[int] = set()
+
+    @asynccontextmanager
+    async def lease(self, service_id: str) -> AsyncIterator[Page]:
+        """Lease the tab for a service, opening one if needed"""
+        lock = self._service_locks.setdefault(service_id, asyncio.Lock())
+        async with lock:
+            page = await self._acquire(service_id)
+            try:
+                yield page
+            finally:
+                await self._release(service_id)
+
+    async def _acquire(self, service_id: str) -> Page:
+        async with self._condition:
+            page = self._pages.get(service_id)
+            if page is not None and page.is_closed():
+                logger.info(f"Tab for {service_id} was closed, opening a new one")
+                self._forget(service_id)
+                page = None
+
+            if page is None:
+                while len(self._pages) >= self.max_pages:
+                    if not await self._evict_idle():
+                        # Every tab is busy, wait for one to be returned
+                        await self._condition.wait()
+                page = await self._open_page()
+                self._pages[service_id] = page
+
+            self._pages.move_to_end(service_id)
+            self._leased.add(service_id)
+            return page
+
+    async def _release(self, service_id: str) -> None:
+        async with self._condition:
+            self._leased.discard(service_id)
+            if service_id in self._pages:
+                self._pages.move_to_end(service_id)
+            self._condition.notify_all()
+
+    async def _open_page(self) -> Page:
+        while self._spare_pages:
+            page = self._spare_pages.pop(0)
+            if not page.is_closed():
+                return page
+        page = await self.context.new_page()
+        self._owned.add(id(page))
+        return page
+
+    async def _evict_idle(self) -> bool:
+        """Close the least recently used idle tab; returns False if all tabs are leased"""
+        for service_id in self._pages:
+            if service_id not in self._leased:
+                page = self._pages[service_id]
+                self._forget(service_id)
+                logger.info(f"Evicting idle tab for {service_id}")
+                await self._close_page(page)
+                return True
+        return False
+
+    def _forget(self, service_id: str) -> None:
+        self._pages.pop(service_id, None)
+
+    async def _close_page(self, page: Page) -> None:
+        try:
+            if id(page) in self._owned:
+                self._owned.discard(id(page))
+                await page.close()
+            else:
+                # Never close tabs we did not open, keep them for reuse instead
+                self._spare_pages.append(page)
+        except Exception as e:
+            logger.warning(f"Error closing tab: {e}")
+
+    def get_page(self, service_id: str) -> Optional[Page]:
+        """Get the tab currently assigned to a service, if any"""
+        return self._pages.get(service_id)
+
+    def has_service(self, service_id: str) -> bool:
+        """Whether the service has a tab here or a request waiting for one"""
+        lock = self._service_locks.get(service_id)
+        return service_id in self._pages or (lock is not None and lock.locked())
+
+    @property
+    def load(self) -> float:
+        """Open plus leased tabs relative to max_pages, used to place new services"""
+        return (len(self._pages) + len(self._leased)) / self.max_pages
+
+    def stats(self) -> dict:
+        """Report pool usage"""
+        return {
+            "max_pages": self.max_pages,
+            "load": round(self.load, 3),
+            "pages": list(self._pages.keys()),
+            "leased": sorted(self._leased)
+        }
+
+    async def close(self):
+        """Close every tab opened by the pool"""
+        async with self._condition:
+            pages = list(self._pages.values())
+            self._pages.clear()
+            self._leased.clear()
+            for page in pages:
+                await self._close_page(page)
+            self._spare_pages.clear()
+            self._condition.notify_all()
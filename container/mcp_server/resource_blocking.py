@@ -0,0 +1,308 @@
+"""
+Resource blocking module
+Keeps trackers, images, fonts and media off the tabs of the AI services
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from playwright.async_api import CDPSession, Frame, Page
+
+from .config_store import ConfigSnapshot, current_config
+
+logger = logging.getLogger("terminail-mcp-blocking")
+
+# Resource types blocked unless configured otherwise
+DEFAULT_RESOURCE_TYPES = ("image", "media", "font")
+
+# File extensions by resource type. Chrome matches blocked URLs by wildcard
+# pattern only, so resource types are blocked by the extension of their URL.
+RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "bmp", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mov", "m4v", "mp3", "m4a", "ogg", "wav", "m3u8")
+}
+
+# Analytics, ads and session recording; subdomains match too
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "connect.facebook.com", "hotjar.com", "clarity.ms",
+    "segment.io", "segment.com", "mixpanel.com", "amplitude.com", "fullstory.com", "intercom.io",
+    "sentry.io", "datadoghq.com", "browser-intake-datadoghq.com", "newrelic.com", "nr-data.net",
+    "statsig.com", "featuregates.org", "bat.bing.com", "hm.baidu.com", "cnzz.com", "umeng.com",
+    "growingio.com", "sensorsdata.cn", "arms-retcode.aliyuncs.com", "mmstat.com"
+)
+
+# Sign-in providers and challenge pages; a tab showing one of them loads everything
+DEFAULT_ALLOW_HOSTS = (
+    "accounts.google.com", "recaptcha.net", "hcaptcha.com", "challenges.cloudflare.com",
+    "login.microsoftonline.com", "login.live.com", "appleid.apple.com", "auth0.com", "auth.openai.com",
+    "passport.baidu.com", "ptlogin2.qq.com", "graph.qq.com", "open.weixin.qq.com", "login.taobao.com",
+    "passport.alibaba.com"
+)
+
+# Nothing is blocked while the tab shows a page whose path contains one of these
+DEFAULT_LOGIN_PATHS = ("login", "signin", "sign-in", "sign_in", "signup", "auth", "oauth", "passport", "sso")
+
+# Typical transfer size by resource type (bytes). Blocked requests are never
+# downloaded, so the bytes they would have cost can only be estimated.
+ESTIMATED_BYTES = {
+    "image": 25_000,
+    "media": 400_000,
+    "font": 35_000,
+    "script": 30_000,
+    "stylesheet": 15_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "other": 2_000
+}
+
+# Navigations kept per service for /stats
+MAX_NAVIGATIONS = 10
+
+def host_matches(host: str, patterns: Iterable[str]) -> bool:
+    """Whether host is one of patterns or a subdomain of one"""
+    return any(host == pattern or host.endswith("." + pattern) for pattern in patterns)
+
+def host_patterns(host: str) -> List[str]:
+    """Blocked-URL patterns of a host and its subdomains"""
+    return [f"*://{host}/*", f"*://*.{host}/*"]
+
+def extension_patterns(extension: str) -> List[str]:
+    """Blocked-URL patterns of files with an extension, with or without a query string"""
+    return [f"*.{extension}", f"*.{extension}?*"]
+
+@dataclass(frozen=True)
+class BlockingRules:
+    """What to block on the tab of one service"""
+    enabled: bool = False
+    resource_types: FrozenSet[str] = frozenset(DEFAULT_RESOURCE_TYPES)
+    trackers: bool = True
+    allow_hosts: Tuple[str, ...] = DEFAULT_ALLOW_HOSTS
+    block_hosts: Tuple[str, ...] = ()
+    login_paths: Tuple[str, ...] = DEFAULT_LOGIN_PATHS
+
+    @classmethod
+    def from_config(cls, settings: Optional[Mapping[str, Any]],
+                    overrides: Optional[Mapping[str, Any]] = None) -> "BlockingRules":
+        """Rules from browser.resource_blocking and a service's own resource_blocking section
+
+        Service settings replace the global ones, except allow_hosts and
+        block_hosts, which are added to the global lists.
+        """
+        settings, overrides = settings or {}, overrides or {}
+        merged = {**settings, **overrides}
+        return cls(
+            enabled=bool(merged.get('enabled', False)),
+            resource_types=frozenset(merged.get('resource_types', DEFAULT_RESOURCE_TYPES)),
+            trackers=bool(merged.get('trackers', True)),
+            allow_hosts=DEFAULT_ALLOW_HOSTS + tuple(settings.get('allow_hosts') or ())
+            + tuple(overrides.get('allow_hosts') or ()),
+            block_hosts=tuple(settings.get('block_hosts') or ()) + tuple(overrides.get('block_hosts') or ()),
+            login_paths=tuple(merged.get('login_paths', DEFAULT_LOGIN_PATHS))
+        )
+
+    def url_patterns(self) -> List[str]:
+        """Wildcard URL patterns for Network.setBlockedURLs"""
+        if not self.enabled:
+            return []
+        patterns = []
+        for host in self.block_hosts + (TRACKER_HOSTS if self.trackers else ()):
+            patterns.extend(host_patterns(host))
+        for resource_type in sorted(self.resource_types):
+            for extension in RESOURCE_EXTENSIONS.get(resource_type, ()):
+                patterns.extend(extension_patterns(extension))
+        return patterns
+
+    def exempt(self, page_url: str) -> bool:
+        """Whether a tab showing page_url must load everything (sign-in pages)"""
+        try:
+            parts = urlsplit(page_url)
+        except ValueError:
+            return False
+        if host_matches((parts.hostname or "").lower(), self.allow_hosts):
+            return True
+        path = parts.path.lower()
+        return any(f"/{word}" in path for word in self.login_paths)
+
+@dataclass
+class BlockingStats:
+    """Requests blocked on the tabs of one service"""
+    blocked: int = 0
+    estimated_bytes_saved: int = 0
+    by_type: Dict[str, int] = field(default_factory=dict)
+    navigations: Deque[dict] = field(default_factory=lambda: deque(maxlen=MAX_NAVIGATIONS))
+
+    def navigation(self, url: str):
+        self.navigations.append({"url": url, "started_at": time.time(), "blocked": 0, "estimated_bytes_saved": 0})
+
+    def record(self, resource_type: str):
+        size = ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES["other"])
+        self.blocked += 1
+        self.estimated_bytes_saved += size
+        self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+        if self.navigations:
+            self.navigations[-1]["blocked"] += 1
+            self.navigations[-1]["estimated_bytes_saved"] += size
+
+    def summary(self) -> dict:
+        return {
+            "blocked": self.blocked,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "by_type": dict(self.by_type),
+            "navigations": [dict(navigation) for navigation in self.navigations]
+        }
+
+class URLBlocker:
+    """Blocked URL patterns of one tab, enforced by Chrome itself
+
+    Network.setBlockedURLs fails matching requests inside the browser, so
+    nothing goes through Python and the tab keeps its HTTP cache (a
+    Playwright route would disable it). The patterns are lifted while the
+    tab shows a sign-in page.
+    """
+
+    def __init__(self, service_id: str, page: Page, rules: BlockingRules,
+                 stats: Optional[BlockingStats] = None):
+        self.service_id = service_id
+        self.page = page
+        self.rules = rules
+        self.stats = stats if stats is not None else BlockingStats()
+        self._session: Optional[CDPSession] = None
+        self._applied: Optional[List[str]] = None
+        self._page_url = ""
+        self._pending: Optional[asyncio.Task] = None
+
+    async def install(self):
+        self._session = await self.page.context.new_cdp_session(self.page)
+        self._session.on("Network.loadingFailed", self._loading_failed)
+        await self._session.send("Network.enable")
+        self.page.on("framenavigated", self._navigated)
+        self._page_url = self.page.url
+        await self.apply()
+
+    async def apply(self):
+        """Send the patterns the rules give for the page the tab shows, when they changed"""
+        patterns = [] if self.rules.exempt(self._page_url) else self.rules.url_patterns()
+        if patterns != self._applied and self._session is not None:
+            await self._session.send("Network.setBlockedURLs", {"urls": patterns})
+            self._applied = patterns
+
+    def update(self, rules: BlockingRules):
+        self.rules = rules
+        self._schedule_apply()
+
+    def _schedule_apply(self):
+        async def run():
+            try:
+                await self.apply()
+            except Exception as e:
+                # The tab closed meanwhile
+                logger.debug(f"Error updating blocked URLs of {self.service_id}: {e}")
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Configuration reloaded outside the event loop; applied on the next navigation
+            return
+        self._pending = loop.create_task(run())
+
+    def _navigated(self, frame: Frame):
+        if frame.parent_frame is not None:
+            return
+        self._page_url = frame.url
+        self.stats.navigation(frame.url)
+        self._schedule_apply()
+
+    def _loading_failed(self, params: Dict[str, Any]):
+        # Requests failed by setBlockedURLs are reported as blocked by the inspector
+        if params.get("blockedReason") == "inspector":
+            self.stats.record(str(params.get("type") or "other").lower())
+
+    async def uninstall(self):
+        try:
+            self.page.remove_listener("framenavigated", self._navigated)
+            if self._session is not None:
+                await self._session.detach()
+        except Exception as e:
+            logger.debug(f"Error removing blocked URLs of {self.service_id}: {e}")
+        self._session = None
+
+class ResourceBlocking:
+    """URL blockers of every tab driven for an AI service
+
+    Rules come from browser.resource_blocking, overridden by the
+    resource_blocking section of a service in ai_services. Statistics are
+    kept per service across tabs, and per navigation of its tab.
+    """
+
+    def __init__(self):
+        self._blockers: Dict[int, URLBlocker] = {}
+        self._stats: Dict[str, BlockingStats] = {}
+
+    @staticmethod
+    def rules_for(service_id: str, snapshot: Optional[ConfigSnapshot] = None) -> BlockingRules:
+        snapshot = snapshot or current_config()
+        service = snapshot.services.get(service_id)
+        return BlockingRules.from_config(
+            snapshot.browser.get('resource_blocking'),
+            service.resource_blocking if service else None
+        )
+
+    def configure(self, snapshot: ConfigSnapshot):
+        """Apply reloaded rules to the tabs that are already blocking"""
+        self._prune()
+        for blocker in self._blockers.values():
+            blocker.update(self.rules_for(blocker.service_id, snapshot))
+
+    async def attach(self, service_id: str, page: Page) -> Optional[URLBlocker]:
+        """Block what the service's rules name on a tab, set up once per tab"""
+        blocker = self._blockers.get(id(page))
+        if blocker is not None and blocker.page is page:
+            if blocker.service_id != service_id:
+                # An adopted tab moved to another service
+                blocker.service_id = service_id
+                blocker.stats = self._stats.setdefault(service_id, BlockingStats())
+                blocker.update(self.rules_for(service_id))
+            return blocker
+        self._prune()
+
+        rules = self.rules_for(service_id)
+        if not rules.enabled:
+            return None
+        blocker = URLBlocker(service_id, page, rules, self._stats.setdefault(service_id, BlockingStats()))
+        try:
+            await blocker.install()
+        except Exception as e:
+            logger.warning(f"Could not block requests of {service_id}, loading everything: {e}")
+            return None
+        self._blockers[id(page)] = blocker
+        return blocker
+
+    async def detach(self, page: Page):
+        blocker = self._blockers.get(id(page))
+        if blocker is not None and blocker.page is page:
+            del self._blockers[id(page)]
+            await blocker.uninstall()
+
+    def _prune(self):
+        """Forget tabs that were closed"""
+        for key, blocker in list(self._blockers.items()):
+            try:
+                closed = blocker.page.is_closed()
+            except Exception:
+                closed = True
+            if closed:
+                del self._blockers[key]
+
+    def clear(self):
+        self._blockers.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        """Blocked requests and estimated bytes saved by service"""
+        return {service_id: stats.summary() for service_id, stats in self._stats.items()}
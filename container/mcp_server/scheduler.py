@@ -0,0 +1,194 @@
+"""
+Request scheduler
+Limits how many browser requests run at once, globally and per AI service
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Mapping
+
+logger = logging.getLogger("terminail-mcp-scheduler")
+
+# Lanes in the order they are served
+PRIORITIES = ("high", "normal", "low")
+
+# Fallbacks when performance.concurrency is not configured
+DEFAULT_MAX_CONCURRENT = 3
+DEFAULT_MAX_PER_SERVICE = 1
+DEFAULT_MAX_QUEUE_DEPTH = 100
+DEFAULT_REQUEST_DELAY_MS = 0
+
+class QueueFullError(Exception):
+    """Raised when a request cannot be queued because the queue is at capacity"""
+
+@dataclass
+class _Waiter:
+    service_id: str
+    future: asyncio.Future
+    enqueued_at: float
+
+@dataclass
+class _LaneStats:
+    granted: int = 0
+    rejected: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def to_dict(self, queued: int) -> dict:
+        return {
+            "queued": queued,
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.granted * 1000, 1) if self.granted else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1)
+        }
+
+@dataclass
+class SchedulerLimits:
+    """Concurrency settings, usually taken from performance.concurrency"""
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT
+    max_per_service: int = DEFAULT_MAX_PER_SERVICE
+    max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH
+    request_delay_ms: int = DEFAULT_REQUEST_DELAY_MS
+
+    @classmethod
+    def from_config(cls, concurrency: Mapping) -> "SchedulerLimits":
+        return cls(
+            max_concurrent=max(1, int(concurrency.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT))),
+            max_per_service=max(1, int(concurrency.get('max_per_service', DEFAULT_MAX_PER_SERVICE))),
+            max_queue_depth=max(0, int(concurrency.get('max_queue_depth', DEFAULT_MAX_QUEUE_DEPTH))),
+            request_delay_ms=max(0, int(concurrency.get('request_delay_ms', DEFAULT_REQUEST_DELAY_MS)))
+        )
+
+class RequestScheduler:
+    """Admits requests under a global and a per-service concurrency limit
+
+    Waiting requests are served by priority lane and FIFO within a lane. A
+    request whose service is at its limit does not block requests for other
+    services queued behind it. When the queue is full new requests are
+    rejected with QueueFullError.
+    """
+
+    def __init__(self, limits: SchedulerLimits = None):
+        self.limits = limits or SchedulerLimits()
+        self._lanes: Dict[str, Deque[_Waiter]] = {priority: deque() for priority in PRIORITIES}
+        self._stats: Dict[str, _LaneStats] = {priority: _LaneStats() for priority in PRIORITIES}
+        self._active = 0
+        self._active_by_service: Dict[str, int] = {}
+        self._next_start = 0.0
+
+    def configure(self, limits: SchedulerLimits):
+        """Apply new limits; queued requests are admitted right away if the limits grew"""
+        self.limits = limits
+        self._dispatch()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    @asynccontextmanager
+    async def slot(self, service_id: str, priority: str = "normal") -> AsyncIterator[None]:
+        """Wait for a free slot for the service and hold it for the duration of the block"""
+        await self.acquire(service_id, priority)
+        try:
+            yield
+        finally:
+            self.release(service_id)
+
+    async def acquire(self, service_id: str, priority: str = "normal"):
+        """Wait for a free slot; raises QueueFullError when the queue is at capacity"""
+        if priority not in self._lanes:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        loop = asyncio.get_running_loop()
+        stats = self._stats[priority]
+        if self._can_start(service_id) and self.queue_depth == 0:
+            self._start(service_id)
+            stats.granted += 1
+        else:
+            if self.queue_depth >= self.limits.max_queue_depth:
+                stats.rejected += 1
+                raise QueueFullError(
+                    f"Too many queued requests ({self.queue_depth}), please retry later"
+                )
+            waiter = _Waiter(service_id, loop.create_future(), loop.time())
+            self._lanes[priority].append(waiter)
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # The slot was granted just before the cancellation
+                    self.release(service_id)
+                else:
+                    self._lanes[priority].remove(waiter)
+                raise
+            wait = loop.time() - waiter.enqueued_at
+            stats.granted += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+
+        # Space out request starts by request_delay_ms
+        delay = self.limits.request_delay_ms / 1000
+        if delay:
+            now = loop.time()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + delay
+            if start_at > now:
+                try:
+                    await asyncio.sleep(start_at - now)
+                except asyncio.CancelledError:
+                    self.release(service_id)
+                    raise
+
+    def release(self, service_id: str):
+        """Give a slot back and admit the next waiting request"""
+        self._active = max(0, self._active - 1)
+        remaining = self._active_by_service.get(service_id, 0) - 1
+        if remaining > 0:
+            self._active_by_service[service_id] = remaining
+        else:
+            self._active_by_service.pop(service_id, None)
+        self._dispatch()
+
+    def _can_start(self, service_id: str) -> bool:
+        return (self._active < self.limits.max_concurrent
+                and self._active_by_service.get(service_id, 0) < self.limits.max_per_service)
+
+    def _start(self, service_id: str):
+        self._active += 1
+        self._active_by_service[service_id] = self._active_by_service.get(service_id, 0) + 1
+
+    def _dispatch(self):
+        for priority in PRIORITIES:
+            lane = self._lanes[priority]
+            for waiter in list(lane):
+                if self._active >= self.limits.max_concurrent:
+                    return
+                if waiter.future.done():
+                    continue
+                if self._can_start(waiter.service_id):
+                    lane.remove(waiter)
+                    self._start(waiter.service_id)
+                    waiter.future.set_result(None)
+
+    def stats(self) -> dict:
+        """Queue and wait-time metrics"""
+        return {
+            "active": self._active,
+            "active_by_service": dict(self._active_by_service),
+            "queue_depth": self.queue_depth,
+            "limits": {
+                "max_concurrent_requests": self.limits.max_concurrent,
+                "max_per_service": self.limits.max_per_service,
+                "max_queue_depth": self.limits.max_queue_depth,
+                "request_delay_ms": self.limits.request_delay_ms
+            },
+            "lanes": {
+                priority: self._stats[priority].to_dict(len(self._lanes[priority]))
+                for priority in PRIORITIES
+            }
+        }
@@ -0,0 +1,173 @@
+"""
+Learned selector order
+Remembers which selector of each handler cascade matched and tries it first
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from .config_store import ConfigSnapshot
+
+logger = logging.getLogger("terminail-mcp-selectors")
+
+# A selector must win this many lookups in a row before it is tried first
+DEFAULT_PROMOTE_AFTER = 3
+
+# Minimum interval between writes of the memo file (seconds)
+SAVE_INTERVAL = 60.0
+
+@dataclass
+class CascadeMemo:
+    """What is known about one selector cascade of one service"""
+    preferred: Optional[str] = None
+    candidate: Optional[str] = None
+    streak: int = 0
+    lookups: int = 0
+    first_try: int = 0
+    misses: int = 0
+    hits: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        return {
+            "preferred": self.preferred,
+            "lookups": self.lookups,
+            "first_try": self.first_try,
+            "first_try_rate": round(self.first_try / self.lookups, 3) if self.lookups else 0.0,
+            "misses": self.misses,
+            "hits": dict(self.hits)
+        }
+
+class SelectorMemo:
+    """Per-service memo of winning selectors
+
+    Once a selector has matched promote_after lookups in a row it is moved
+    to the front of its cascade; the other selectors keep their configured
+    order. A site redesign then shows up as a falling first-try rate in the
+    stats. The memo is written to a JSON file so it survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None, promote_after: int = DEFAULT_PROMOTE_AFTER,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.promote_after = max(1, promote_after)
+        self._lock = threading.Lock()
+        self._memos: Dict[str, Dict[str, CascadeMemo]] = {}
+        self._path: Optional[str] = None
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.load(path)
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def configure(self, snapshot: ConfigSnapshot):
+        """Apply performance.selector_memo from a (reloaded) configuration"""
+        settings = snapshot.section('performance').get('selector_memo') or {}
+        self.enabled = bool(settings.get('enabled', True))
+        self.promote_after = max(1, int(settings.get('promote_after', DEFAULT_PROMOTE_AFTER)))
+        path = settings.get('path') or None
+        if path and not os.path.isabs(path) and snapshot.path:
+            # Relative paths are relative to config.yaml
+            path = os.path.join(os.path.dirname(os.path.abspath(snapshot.path)), path)
+        if path != self._path:
+            self.save()
+            self.load(path)
+
+    def order(self, service_id: str, cascade: str, selectors: Sequence[str]) -> List[str]:
+        """Get the selectors of a cascade in the order they should be tried"""
+        selectors = list(selectors)
+        if not self.enabled:
+            return selectors
+        memo = self._memos.get(service_id, {}).get(cascade)
+        if memo is None or memo.preferred not in selectors:
+            return selectors
+        return [memo.preferred] + [selector for selector in selectors if selector != memo.preferred]
+
+    def record(self, service_id: str, cascade: str, selectors: Sequence[str], winner: Optional[str]):
+        """Record the outcome of a lookup made in the order returned by order()"""
+        if not self.enabled:
+            return
+        with self._lock:
+            memo = self._memos.setdefault(service_id, {}).setdefault(cascade, CascadeMemo())
+            memo.lookups += 1
+            if winner is None:
+                memo.misses += 1
+                memo.candidate, memo.streak = None, 0
+            else:
+                memo.hits[winner] = memo.hits.get(winner, 0) + 1
+                if selectors and selectors[0] == winner:
+                    memo.first_try += 1
+                if winner == memo.candidate:
+                    memo.streak += 1
+                else:
+                    memo.candidate, memo.streak = winner, 1
+                if memo.streak >= self.promote_after and memo.preferred != winner:
+                    logger.info(f"{service_id}: trying {cascade} selector {winner!r} first from now on")
+                    memo.preferred = winner
+            self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self.save()
+
+    def load(self, path: Optional[str]):
+        """Replace the memo with the contents of path (empty when it does not exist)"""
+        memos: Dict[str, Dict[str, CascadeMemo]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for service_id, cascades in data.items():
+                    memos[service_id] = {
+                        cascade: CascadeMemo(**values) for cascade, values in cascades.items()
+                    }
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring selector memo {path}: {e}")
+                memos = {}
+        with self._lock:
+            self._path = path
+            self._memos = memos
+            self._dirty = False
+
+    def save(self):
+        """Write the memo to its file if it changed"""
+        with self._lock:
+            self._saved_at = time.monotonic()
+            if not self._path or not self._dirty:
+                return
+            data = {
+                service_id: {cascade: asdict(memo) for cascade, memo in cascades.items()}
+                for service_id, cascades in self._memos.items()
+            }
+            self._dirty = False
+            path = self._path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save selector memo: {e}")
+
+    def reset(self, service_id: Optional[str] = None):
+        """Forget what was learned, for one service or all of them"""
+        with self._lock:
+            if service_id is None:
+                self._memos.clear()
+            else:
+                self._memos.pop(service_id, None)
+            self._dirty = True
+
+    def stats(self) -> dict:
+        """First-try hit rate and winning selectors per service and cascade"""
+        return {
+            service_id: {cascade: memo.summary() for cascade, memo in cascades.items()}
+            for service_id, cascades in self._memos.items()
+        }
+
+selector_memo = SelectorMemo()
@@ -0,0 +1,71 @@
+"""
+Immutable registry of the configured AI services
+"""
+
+import logging
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+from .ai_service import AIService
+
+logger = logging.getLogger("terminail-mcp-registry")
+
+@dataclass(frozen=True)
+class ServiceRegistry:
+    """Enabled AI services, ordered by sequence and indexed by id"""
+    services: Tuple[AIService, ...] = ()
+    by_id: Mapping[str, AIService] = field(default_factory=lambda: MappingProxyType({}))
+    
+    @classmethod
+    def from_config(cls, config: Dict) -> "ServiceRegistry":
+        """Build the registry from the ai_services section of a configuration"""
+        services = []
+        for service_data in config.get('ai_services') or []:
+            if not service_data.get('enabled', True):
+                continue
+            try:
+                capabilities = service_data.get('capabilities')
+                handler = service_data.get('handler')
+                resource_blocking = service_data.get('resource_blocking')
+                services.append(AIService(
+                    id=service_data['id'],
+                    name=service_data['name'],
+                    url=service_data['url'],
+                    category=service_data['category'],
+                    enabled=service_data.get('enabled', True),
+                    sequence=service_data.get('sequence', 0),
+                    icon=service_data.get('icon'),
+                    priority=service_data.get('priority'),
+                    authentication_required=service_data.get('authentication_required'),
+                    capabilities=tuple(capabilities) if capabilities is not None else None,
+                    handler=MappingProxyType(dict(handler)) if isinstance(handler, dict) else handler,
+                    resource_blocking=MappingProxyType(dict(resource_blocking))
+                    if isinstance(resource_blocking, dict) else resource_blocking
+                ))
+            except (KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid AI service entry {service_data!r}: {e}")
+        
+        # sorted() is stable, so services sharing a sequence keep their file order
+        ordered = tuple(sorted(services, key=lambda service: service.sequence))
+        return cls(
+            services=ordered,
+            by_id=MappingProxyType({service.id: service for service in ordered})
+        )
+    
+    def get(self, service_id: str) -> Optional[AIService]:
+        """Look up a service by id"""
+        return self.by_id.get(service_id)
+    
+    def urls(self) -> Dict[str, str]:
+        """Map of service id to URL"""
+        return {service.id: service.url for service in self.services}
+    
+    def __iter__(self) -> Iterator[AIService]:
+        return iter(self.services)
+    
+    def __len__(self) -> int:
+        return len(self.services)
+    
+    def __contains__(self, service_id: object) -> bool:
+        return service_id in self.by_id
@@ -0,0 +1,116 @@
+"""
+Single-flight request coalescing
+Concurrent identical requests share one browser round-trip
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+@dataclass
+class _Flight:
+    task: asyncio.Future
+    waiters: int = 0
+
+@dataclass
+class _Broadcast:
+    events: List[Any] = field(default_factory=list)
+    done: bool = False
+    error: Optional[BaseException] = None
+    subscribers: int = 0
+    task: Optional[asyncio.Future] = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def notify(self):
+        # Wake everyone waiting on the current event; later waits use a fresh one
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome
+
+    A caller that arrives while a call for the same key is in flight awaits
+    that call instead of starting its own. Streams work the same way: late
+    subscribers first receive the events already produced, then follow the
+    live ones. The shared work is cancelled only when every caller is gone.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Flight] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self.coalesced = 0
+
+    async def call(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await factory() or, if one is already running for key, its result"""
+        flight = self._calls.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(factory()))
+            self._calls[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(self._calls, key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller going away does not cancel the others
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Callers arriving from now on start a fresh call instead of joining this one
+                self._forget(self._calls, key, flight)
+                flight.task.cancel()
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Yield the events of factory() or of the stream already running for key"""
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._produce(key, broadcast, factory))
+        else:
+            self.coalesced += 1
+
+        broadcast.subscribers += 1
+        try:
+            index = 0
+            while True:
+                while index >= len(broadcast.events) and not broadcast.done:
+                    await broadcast.changed.wait()
+                while index < len(broadcast.events):
+                    yield broadcast.events[index]
+                    index += 1
+                if broadcast.done and index >= len(broadcast.events):
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.task.done():
+                self._forget(self._streams, key, broadcast)
+                broadcast.task.cancel()
+
+    async def _produce(self, key: Hashable, broadcast: _Broadcast,
+                       factory: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for event in factory():
+                broadcast.events.append(event)
+                broadcast.notify()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            broadcast.done = True
+            self._forget(self._streams, key, broadcast)
+            broadcast.notify()
+
+    @staticmethod
+    def _forget(registry: Dict, key: Hashable, entry: Any):
+        if registry.get(key) is entry:
+            del registry[key]
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "streams": len(self._streams),
+            "coalesced": self.coalesced
+        }
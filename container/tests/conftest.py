@@ -8,6 +8,17 @@ from fastapi.testclient import TestClient
 
 from mcp_server.main import app
 from mcp_server.browser import BrowserManager
+from mcp_server.selector_memo import SelectorMemo
+
+
+@pytest.fixture(autouse=True)
+def selector_memo(monkeypatch):
+    """Give every test its own in-memory selector memo"""
+    memo = SelectorMemo()
+    monkeypatch.setattr("mcp_server.ai_handler_base.selector_memo", memo)
+    monkeypatch.setattr("mcp_server.main.selector_memo", memo)
+    monkeypatch.setattr(memo, "configure", lambda snapshot: None)
+    return memo
 
 
 @pytest.fixture
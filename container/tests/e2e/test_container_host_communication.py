@@ -4,11 +4,12 @@ Container-Host Communication Test - Tests ChromeManager communication with host
 import pytest
 import asyncio
 import socket
-import json
+import struct
 import threading
 import time
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from mcp_server.chrome_manager import ChromeManager
+from mcp_server.host_protocol import decode_body, encode_message
 
 
 class TestContainerHostCommunicationE2E:
@@ -24,15 +25,18 @@ class TestContainerHostCommunicationE2E:
             
             try:
                 client_socket, _ = server_socket.accept()
-                data = client_socket.recv(1024)
-                if data:
-                    request = json.loads(data.decode('utf-8'))
-                    if request.get('action') == 'start_chrome':
+                client_file = client_socket.makefile('rb')
+                header = client_file.read(4)
+                if len(header) == 4:
+                    request = decode_body(client_file.read(struct.unpack('>I', header)[0]))
+                    if request.get('command') == 'start':
                         # Simulate successful Chrome start
-                        response = {'success': True, 'message': 'Chrome started', 'port': 9222}
+                        response = {'id': request.get('id'), 'ok': True,
+                                    'result': {'message': 'Chrome started', 'port': request.get('port', 9222)}}
                     else:
-                        response = {'error': 'Unknown action'}
-                    client_socket.send(json.dumps(response).encode('utf-8'))
+                        response = {'id': request.get('id'), 'ok': False, 'error': 'Unknown command'}
+                    client_socket.sendall(encode_message(response))
+                client_file.close()
                 client_socket.close()
             except Exception as e:
                 print(f"Mock service error: {e}")
@@ -57,7 +61,8 @@ class TestContainerHostCommunicationE2E:
         
         # Mock container environment
         with patch.object(ChromeManager, '_is_running_in_container', return_value=True):
-            with patch.object(ChromeManager, 'is_chrome_running', side_effect=[False, True]):  # First false, then true
+            with patch.object(ChromeManager, 'is_chrome_running', new_callable=AsyncMock, return_value=False), \
+                    patch.object(ChromeManager, 'wait_until_running', new_callable=AsyncMock, return_value=True):
                 chrome_manager = ChromeManager()
                 
                 # Verify we're in container mode
@@ -65,7 +70,7 @@ class TestContainerHostCommunicationE2E:
                 print("✓ Detected container environment")
                 
                 # Try to start Chrome (should communicate with host service)
-                success = chrome_manager.start_chrome()
+                success = await chrome_manager.start_chrome()
                 
                 # Should succeed because mock service simulates success
                 assert success is True
@@ -79,7 +84,7 @@ class TestContainerHostCommunicationE2E:
         
         # Mock container environment with no host service
         with patch.object(ChromeManager, '_is_running_in_container', return_value=True):
-            with patch.object(ChromeManager, 'is_chrome_running', return_value=False):
+            with patch.object(ChromeManager, 'is_chrome_running', new_callable=AsyncMock, return_value=False):
                 chrome_manager = ChromeManager()
                 
                 # Verify we're in container mode
@@ -87,7 +92,7 @@ class TestContainerHostCommunicationE2E:
                 print("✓ Detected container environment")
                 
                 # Try to start Chrome (should handle unavailable service gracefully)
-                success = chrome_manager.start_chrome()
+                success = await chrome_manager.start_chrome()
                 
                 # Should fail gracefully since no service is running
                 assert success is False
@@ -34,11 +34,11 @@ class TestTerminailHostChromeE2E:
             print(f"Running environment: {'Container' if is_container else 'Host'}")
             
             # Check if Chrome is running initially
-            was_running = chrome_manager.is_chrome_running()
+            was_running = await chrome_manager.is_chrome_running()
             print(f"Chrome was {'already' if was_running else 'not'} running")
             
             # Start Chrome automatically (this should work on host)
-            success = chrome_manager.start_chrome()
+            success = await chrome_manager.start_chrome()
             
             if is_container:
                 # In container, this should provide instructions but not actually start Chrome
@@ -50,17 +50,17 @@ class TestTerminailHostChromeE2E:
                 print("✅ Chrome started automatically by Terminail extension")
                 
                 # Verify Chrome is now running
-                assert chrome_manager.is_chrome_running(), "Chrome is not running after start"
+                assert await chrome_manager.is_chrome_running(), "Chrome is not running after start"
                 print("✅ Chrome is confirmed running on debug port 9222")
             
         except Exception as e:
             # Clean up on failure
-            chrome_manager.stop_chrome()
+            await chrome_manager.stop_chrome()
             pytest.fail(f"Terminail host Chrome test failed: {e}")
         
         finally:
             # Clean up
-            chrome_manager.stop_chrome()
+            await chrome_manager.stop_chrome()
     
     @pytest.mark.e2e
     @pytest.mark.asyncio
@@ -69,11 +69,11 @@ class TestTerminailHostChromeE2E:
         print("\n=== Terminail Chrome Context Manager Test ===")
         
         try:
-            with ChromeManager() as chrome_manager:
+            async with ChromeManager() as chrome_manager:
                 print("✅ Chrome started via Terminail context manager")
                 
                 # Verify Chrome is running
-                is_running = chrome_manager.is_chrome_running()
+                is_running = await chrome_manager.is_chrome_running()
                 print(f"Chrome running status: {is_running}")
                 
                 if not chrome_manager._is_running_in_container():
@@ -0,0 +1,335 @@
+"""
+Unit tests for the AIHandler base class
+"""
+import pytest
+from unittest.mock import AsyncMock
+from mcp_server.ai_handler_base import (
+    AIHandler, ANSWER_COMPLETION_SCRIPT, ANSWER_COUNT_SCRIPT, ANSWER_TEXT_SCRIPT, NODES_TEXT_SCRIPT,
+    SELECTOR_CASCADE_SCRIPT
+)
+from mcp_server.config_store import ConfigSnapshot
+from mcp_server.handlers.chatgpt_handler import ChatgptHandler
+from mcp_server.handlers.deepseek_handler import DeepSeekHandler
+
+
+class TestAnswerCompletion:
+    """Test cases for answer completion detection"""
+
+    @pytest.mark.asyncio
+    async def test_wait_for_answer_complete_uses_handler_configuration(self):
+        """Test that the in-page detector receives the handler's selectors"""
+        mock_page = AsyncMock()
+        mock_page.evaluate.return_value = {"status": "complete", "text": "done"}
+        handler = ChatgptHandler(mock_page)
+
+        status = await handler.wait_for_answer_complete(timeout_ms=5000)
+
+        assert status == "complete"
+        script, options = mock_page.evaluate.call_args.args
+        assert script == ANSWER_COMPLETION_SCRIPT
+        assert options["answerSelectors"] == ChatgptHandler.answer_selectors
+        assert options["stopSelectors"] == ChatgptHandler.stop_selectors
+        assert options["stableMs"] == AIHandler.answer_stable_ms
+        assert options["timeoutMs"] == 5000
+
+    @pytest.mark.asyncio
+    async def test_wait_for_answer_complete_defaults_to_configured_timeout(self):
+        """Test that browser.response_timeout bounds the wait"""
+        mock_page = AsyncMock()
+        mock_page.evaluate.return_value = {"status": "timeout", "text": ""}
+        handler = DeepSeekHandler(mock_page)
+        handler.config = ConfigSnapshot.from_dict({"browser": {"response_timeout": 1234}})
+
+        status = await handler.wait_for_answer_complete()
+
+        assert status == "timeout"
+        options = mock_page.evaluate.call_args.args[1]
+        assert options["timeoutMs"] == 1234
+        assert options["startTimeoutMs"] == 1234
+
+    @pytest.mark.asyncio
+    async def test_ask_question_does_not_sleep_for_answer(self):
+        """Test that ask_question waits on completion detection instead of a fixed sleep"""
+        mock_page = AsyncMock()
+        mock_page.query_selector_all.return_value = [AsyncMock()]
+        mock_page.eval_on_selector_all.return_value = "Test response"
+        mock_page.evaluate.return_value = {"status": "complete", "text": "Test response"}
+        handler = DeepSeekHandler(mock_page)
+
+        result = await handler.ask_question("Test question")
+
+        assert result == "Test response"
+        scripts = [call.args[0] for call in mock_page.evaluate.call_args_list]
+        assert scripts.count(ANSWER_COMPLETION_SCRIPT) == 1
+        for call in mock_page.wait_for_timeout.call_args_list:
+            assert call.args[0] < 10000
+
+    @pytest.mark.asyncio
+    async def test_ask_question_reports_completion_status(self):
+        """Test that an answer read after the wait timed out says so"""
+        mock_page = AsyncMock()
+        mock_page.evaluate.side_effect = [
+            {"status": "timeout", "text": "Half"},
+            {"index": 0, "text": "Half", "unsupported": []}
+        ]
+        handler = DeepSeekHandler(mock_page)
+        handler.submit_question = AsyncMock()
+
+        answer = await handler.ask_question("Test question")
+
+        assert answer == "Half"
+        assert answer.status == "timeout"
+        assert not answer.complete
+
+
+class TestAnswerStreaming:
+    """Test cases for incremental answer extraction"""
+
+    @pytest.mark.asyncio
+    async def test_stream_answer_yields_deltas_until_stable(self):
+        """Test that stream_answer yields appended text and stops once the answer settles"""
+        mock_page = AsyncMock()
+        snapshots = [
+            {"text": "Previous answer", "busy": False},
+            {"text": "Hel", "busy": True},
+            {"text": "Hello", "busy": True},
+            {"text": "Hello world", "busy": False},
+        ]
+        mock_page.evaluate.side_effect = snapshots + [{"text": "Hello world", "busy": False}] * 20
+        handler = DeepSeekHandler(mock_page)
+        handler.stream_poll_ms = 1
+        handler.answer_stable_ms = 5
+        handler.submit_question = AsyncMock()
+
+        deltas = [delta async for delta in handler.stream_answer("Hi", timeout_ms=5000)]
+
+        handler.submit_question.assert_called_once_with("Hi")
+        assert [delta.text for delta in deltas] == ["Hel", "lo", " world"]
+        assert not any(delta.replace for delta in deltas)
+
+    @pytest.mark.asyncio
+    async def test_stream_answer_reports_rewrites(self):
+        """Test that re-rendered text is sent as a replacement"""
+        mock_page = AsyncMock()
+        snapshots = [
+            {"text": "", "busy": False},
+            {"text": "**bo", "busy": True},
+            {"text": "bold", "busy": False},
+        ]
+        mock_page.evaluate.side_effect = snapshots + [{"text": "bold", "busy": False}] * 20
+        handler = DeepSeekHandler(mock_page)
+        handler.stream_poll_ms = 1
+        handler.answer_stable_ms = 5
+        handler.submit_question = AsyncMock()
+
+        deltas = [delta async for delta in handler.stream_answer("Hi", timeout_ms=5000)]
+
+        assert deltas[0].text == "**bo" and not deltas[0].replace
+        assert deltas[1].text == "bold" and deltas[1].replace
+
+
+class TestNavigation:
+    """Test cases for the navigation layer"""
+
+    @pytest.mark.asyncio
+    async def test_navigation_skipped_when_already_on_service(self):
+        """Test that a page already showing the service with a ready input is not reloaded"""
+        mock_page = AsyncMock()
+        mock_page.url = "https://chat.deepseek.com/a/chat/s/123"
+        handler = DeepSeekHandler(mock_page)
+        handler.service = None
+
+        await handler.navigate_to_service()
+
+        mock_page.goto.assert_not_called()
+        mock_page.wait_for_selector.assert_called_once()
+        assert mock_page.wait_for_selector.call_args.kwargs["timeout"] == handler.ready_check_ms
+
+    @pytest.mark.asyncio
+    async def test_navigation_reloads_when_input_not_ready(self):
+        """Test that the page is reloaded when the input does not show up"""
+        mock_page = AsyncMock()
+        mock_page.url = "https://chat.deepseek.com/"
+        mock_page.wait_for_selector.side_effect = [Exception("Timeout"), None]
+        handler = DeepSeekHandler(mock_page)
+        handler.service = None
+
+        await handler.navigate_to_service()
+
+        mock_page.goto.assert_called_once_with("https://chat.deepseek.com")
+        mock_page.wait_for_timeout.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_navigation_on_other_site(self):
+        """Test that a page on another site is navigated and waits for the input instead of sleeping"""
+        mock_page = AsyncMock()
+        mock_page.url = "https://chatgpt.com/"
+        handler = DeepSeekHandler(mock_page)
+        handler.service = None
+        handler.config = ConfigSnapshot.from_dict({"browser": {"operation_timeout": 4321}})
+
+        await handler.navigate_to_service()
+
+        mock_page.goto.assert_called_once_with("https://chat.deepseek.com")
+        mock_page.wait_for_timeout.assert_not_called()
+        assert mock_page.wait_for_selector.call_args.kwargs["timeout"] == 4321
+
+    def test_is_on_service_respects_path(self):
+        """Test that services hosted below a path only match that path"""
+        from mcp_server.handlers.huggingchat_handler import HuggingchatHandler
+
+        mock_page = AsyncMock()
+        handler = HuggingchatHandler(mock_page)
+        handler.service = None
+
+        mock_page.url = "https://huggingface.co/chat/conversation/1"
+        assert handler.is_on_service()
+        mock_page.url = "https://huggingface.co/models"
+        assert not handler.is_on_service()
+
+
+class TestSelectorCascade:
+    """Test cases for resolving selector cascades in one evaluate call"""
+
+    @pytest.mark.asyncio
+    async def test_cascade_resolved_in_one_evaluate(self):
+        """Test that only the winning selector is queried"""
+        mock_page = AsyncMock()
+        mock_page.evaluate.return_value = {"index": 2, "unsupported": []}
+        element = AsyncMock()
+        mock_page.query_selector.return_value = element
+        handler = DeepSeekHandler(mock_page)
+
+        elements = await handler.find_elements(["a", "b", "c", "d"])
+
+        assert elements == [element]
+        mock_page.evaluate.assert_called_once()
+        assert mock_page.evaluate.call_args.args[0] == SELECTOR_CASCADE_SCRIPT
+        mock_page.query_selector.assert_called_once_with("c")
+
+    @pytest.mark.asyncio
+    async def test_playwright_only_selectors_keep_their_place(self):
+        """Test that selectors the DOM cannot parse are tried through Playwright before later matches"""
+        mock_page = AsyncMock()
+        mock_page.evaluate.return_value = {"index": 2, "unsupported": [1, 3]}
+        playwright_match = AsyncMock()
+        mock_page.query_selector.side_effect = lambda selector: playwright_match if selector == "b" else None
+        handler = DeepSeekHandler(mock_page)
+
+        elements = await handler.find_elements(["a", "b", "c", "d"])
+
+        assert elements == [playwright_match]
+        assert [call.args[0] for call in mock_page.query_selector.call_args_list] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_no_match(self):
+        """Test that an empty list is returned when nothing matches"""
+        mock_page = AsyncMock()
+        mock_page.evaluate.return_value = {"index": -1, "unsupported": []}
+        handler = DeepSeekHandler(mock_page)
+
+        assert await handler.find_elements(["a", "b"]) == []
+        mock_page.query_selector.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_submit_clicks_first_matching_button(self):
+        """Test that submit fills the last input and clicks the resolved send button"""
+        mock_page = AsyncMock()
+        handler = ChatgptHandler(mock_page)
+        first_input, last_input, button = AsyncMock(), AsyncMock(), AsyncMock()
+        mock_page.evaluate.side_effect = [{"index": 0, "unsupported": []}, {"index": 1, "unsupported": []}]
+        mock_page.query_selector_all.return_value = [first_input, last_input]
+        mock_page.query_selector.return_value = button
+
+        await handler.submit_question("Hello")
+
+        last_input.fill.assert_called_once_with("Hello")
+        first_input.fill.assert_not_called()
+        mock_page.query_selector.assert_called_once_with(handler.button_selectors[1])
+        button.click.assert_called_once()
+        last_input.press.assert_not_called()
+
+
+
+class TestAnswerExtraction:
+    """Test cases for extracting the answer text in the page"""
+
+    @pytest.mark.asyncio
+    async def test_extract_answer_in_one_evaluate(self):
+        """Test that multi-node answers are joined in the page without per-node round-trips"""
+        mock_page = AsyncMock()
+        handler = ChatgptHandler(mock_page)
+        handler.config = ConfigSnapshot.from_dict({})
+        mock_page.evaluate.return_value = {"index": 1, "text": " First\nSecond ", "unsupported": []}
+
+        assert await handler.extract_answer() == "First\nSecond"
+        script, options = mock_page.evaluate.call_args.args
+        assert script == ANSWER_TEXT_SCRIPT
+        assert options["allNodes"] is True
+        assert options["markdown"] is False
+        mock_page.query_selector_all.assert_not_called()
+        mock_page.eval_on_selector_all.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_markdown_from_configuration(self):
+        """Test that browser.answer_format selects markdown extraction"""
+        mock_page = AsyncMock()
+        handler = DeepSeekHandler(mock_page)
+        handler.config = ConfigSnapshot.from_dict({"browser": {"answer_format": "markdown"}})
+        mock_page.evaluate.return_value = {"index": 0, "text": "```python\nx = 1\n```", "unsupported": []}
+
+        assert await handler.extract_answer() == "```python\nx = 1\n```"
+        assert mock_page.evaluate.call_args.args[1]["markdown"] is True
+        assert mock_page.evaluate.call_args.args[1]["allNodes"] is False
+
+    @pytest.mark.asyncio
+    async def test_playwright_only_selector_extracted_through_playwright(self):
+        """Test that a selector the DOM cannot parse is read with eval_on_selector_all"""
+        mock_page = AsyncMock()
+        handler = DeepSeekHandler(mock_page)
+        mock_page.evaluate.return_value = {"index": 1, "text": "later", "unsupported": [0]}
+        mock_page.eval_on_selector_all.return_value = "from playwright"
+
+        text = await handler.extract_text(["div:has-text('x')", ".answer"])
+
+        assert text == "from playwright"
+        selector, script, options = mock_page.eval_on_selector_all.call_args.args
+        assert selector == "div:has-text('x')"
+        assert script == NODES_TEXT_SCRIPT
+
+    @pytest.mark.asyncio
+    async def test_earlier_answers_left_out(self):
+        """Test that joined answer nodes already on the page before the question are skipped"""
+        mock_page = AsyncMock()
+        handler = ChatgptHandler(mock_page)
+        handler.config = ConfigSnapshot.from_dict({})
+        handler.submit_question = AsyncMock()
+        selectors = ChatgptHandler.answer_selectors
+        mock_page.evaluate.side_effect = [
+            {"counts": {selectors[0]: 3, selectors[1]: 5}, "unsupported": []},
+            {"status": "complete", "text": "Second answer"},
+            {"index": 1, "text": "Second answer", "unsupported": []}
+        ]
+
+        assert await handler.ask_question("Second question") == "Second answer"
+        scripts = [call.args[0] for call in mock_page.evaluate.call_args_list]
+        assert scripts == [ANSWER_COUNT_SCRIPT, ANSWER_COMPLETION_SCRIPT, ANSWER_TEXT_SCRIPT]
+        assert mock_page.evaluate.call_args.args[1]["seen"] == {selectors[0]: 3, selectors[1]: 5}
+
+    @pytest.mark.asyncio
+    async def test_single_node_answers_are_not_counted(self):
+        """Test that handlers reading one answer node do not count nodes before asking"""
+        mock_page = AsyncMock()
+        handler = DeepSeekHandler(mock_page)
+
+        assert await handler.count_answer_nodes() == {}
+        mock_page.evaluate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_no_answer(self):
+        """Test that None is returned when no selector has text"""
+        mock_page = AsyncMock()
+        handler = DeepSeekHandler(mock_page)
+        mock_page.evaluate.return_value = {"index": -1, "text": "", "unsupported": []}
+
+        assert await handler.extract_text([".answer"]) is None
@@ -0,0 +1,142 @@
+"""
+Unit tests for AnswerCache class
+"""
+import asyncio
+import sqlite3
+import pytest
+from unittest.mock import AsyncMock, patch
+from mcp_server.answer_cache import AnswerCache, normalize_question
+from mcp_server.config_store import ConfigSnapshot
+
+
+class TestAnswerCache:
+    """Test cases for AnswerCache class"""
+
+    def test_normalize_question(self):
+        """Test that case and whitespace differences share a key"""
+        assert normalize_question("  What   is\nPython? ") == normalize_question("what is python?")
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_counters(self):
+        """Test that lookups are counted"""
+        cache = AnswerCache()
+
+        assert await cache.get("deepseek", "Hello") is None
+        await cache.put("deepseek", "Hello", "Hi there")
+
+        assert await cache.get("DeepSeek", "hello ") == "Hi there"
+        assert await cache.get("qwen", "Hello") is None
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_per_service_ttl(self):
+        """Test that each service uses its own TTL"""
+        cache = AnswerCache(ttl_seconds=60, service_ttls={"qwen": 10})
+        with patch("mcp_server.answer_cache.time.time", return_value=1000):
+            await cache.put("deepseek", "Hello", "deepseek answer")
+            await cache.put("qwen", "Hello", "qwen answer")
+
+        with patch("mcp_server.answer_cache.time.time", return_value=1030):
+            assert await cache.get("deepseek", "Hello") == "deepseek answer"
+            assert await cache.get("qwen", "Hello") is None
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_disables_service(self):
+        """Test that a TTL of 0 keeps a service out of the cache"""
+        cache = AnswerCache(service_ttls={"qwen": 0})
+        await cache.put("qwen", "Hello", "answer")
+
+        assert await cache.get("qwen", "Hello") is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_size(self):
+        """Test that the least recently used answers go first once the byte budget is exceeded"""
+        cache = AnswerCache(max_bytes=30)
+        await cache.put("deepseek", "q1", "a" * 10)
+        await cache.put("deepseek", "q2", "b" * 10)
+        await cache.get("deepseek", "q1")
+        await cache.put("deepseek", "q3", "c" * 10)
+
+        assert await cache.get("deepseek", "q1") == "a" * 10
+        assert await cache.get("deepseek", "q2") is None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 30
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that answers written to disk are found by a new cache instance"""
+        path = str(tmp_path / "answers.sqlite")
+        first = AnswerCache(disk_path=path)
+        await first.put("deepseek", "Hello", "Hi there")
+        first.close()
+
+        second = AnswerCache(disk_path=path)
+        assert await second.get("deepseek", "Hello") == "Hi there"
+        assert second.stats()["disk_hits"] == 1
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_purge_bounds_disk_tier(self, tmp_path):
+        """Test that purging drops expired rows and then the oldest beyond max_disk_bytes"""
+        path = str(tmp_path / "answers.sqlite")
+        cache = AnswerCache(disk_path=path, max_disk_bytes=20, service_ttls={"qwen": 10})
+        with patch("mcp_server.answer_cache.time.time", return_value=1000):
+            await cache.put("qwen", "old", "expired")
+            await cache.put("deepseek", "q1", "a" * 10)
+        with patch("mcp_server.answer_cache.time.time", return_value=1001):
+            await cache.put("deepseek", "q2", "b" * 10)
+        cache.close()
+
+        cache = AnswerCache(disk_path=path, max_disk_bytes=20)
+        with patch("mcp_server.answer_cache.time.time", return_value=1020):
+            await cache.purge_expired()
+            assert await cache.get("qwen", "old") is None
+            assert await cache.get("deepseek", "q1") is None
+            assert await cache.get("deepseek", "q2") == "b" * 10
+        assert cache.stats()["disk_purged"] == 2
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_purging_runs_in_background(self, tmp_path):
+        """Test that start_purging purges at once and stops cleanly"""
+        cache = AnswerCache(disk_path=str(tmp_path / "answers.sqlite"))
+        with patch.object(cache, 'purge_expired', new_callable=AsyncMock) as purge_expired:
+            cache.start_purging(interval=60)
+            await asyncio.sleep(0)
+            await cache.stop_purging()
+        purge_expired.assert_awaited_once()
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_upgrades_old_files(self, tmp_path):
+        """Test that a file written without sizes is read and can be trimmed"""
+        path = str(tmp_path / "answers.sqlite")
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE answers (service TEXT NOT NULL, question TEXT NOT NULL, answer TEXT NOT NULL, "
+                   "expires_at REAL NOT NULL, PRIMARY KEY (service, question))")
+        db.execute("INSERT INTO answers VALUES ('deepseek', 'hello', 'Hi there', 1e12)")
+        db.commit()
+        db.close()
+
+        cache = AnswerCache(disk_path=path, max_disk_bytes=1)
+        assert await cache.get("deepseek", "Hello") == "Hi there"
+        await cache.purge_expired()
+        assert cache.stats()["disk_purged"] == 1
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_configure_from_snapshot(self):
+        """Test that performance.caching is applied"""
+        snapshot = ConfigSnapshot.from_dict({"performance": {"caching": {
+            "enabled": False, "ttl_minutes": 5, "max_cache_size_mb": 1,
+            "service_ttl_minutes": {"Qwen": 1}
+        }}})
+        cache = AnswerCache.from_config(snapshot)
+
+        assert cache.max_bytes == 1024 * 1024
+        assert cache.ttl_for("deepseek") == 300
+        assert cache.ttl_for("qwen") == 60
+        await cache.put("deepseek", "Hello", "answer")
+        assert await cache.get("deepseek", "Hello") is None
@@ -1,12 +1,15 @@
 """
 Unit tests for FastAPI endpoints
 """
+import json
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 from mcp_server.main import app
+from mcp_server.ai_handler_base import Answer
 from mcp_server.browser import BrowserManager
+from mcp_server.scheduler import QueueFullError
 
 
 class TestAPIEndpoints:
@@ -48,6 +51,67 @@ class TestAPIEndpoints:
             assert data["status"] == "healthy"
             assert data["browser"] == "disconnected"
     
+    def test_health_check_reconnecting(self, test_client):
+        """Test health check while a lost browser is being reattached"""
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = False
+        mock_browser_manager.reconnecting = True
+        mock_browser_manager.debug_port = 9222
+        mock_browser_manager.readiness = {}
+        mock_browser_manager.instances = []
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.get("/health")
+            
+            assert response.status_code == 200
+            assert response.json()["browser"] == "reconnecting"
+    
+    def test_health_reports_service_readiness(self, test_client):
+        """Test that /health includes the warm-up readiness of each service"""
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.debug_port = 9222
+        mock_browser_manager.warming_up = False
+        mock_browser_manager.readiness = {"deepseek": {"status": "ready", "elapsed_ms": 1200}}
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.get("/health")
+        
+        data = response.json()
+        assert data["warming_up"] is False
+        assert data["services"] == {"deepseek": {"status": "ready", "elapsed_ms": 1200}}
+    
+    def test_health_reports_endpoint_capacity(self, test_client):
+        """Test that /health lists the capacity of each CDP endpoint"""
+        instance = MagicMock()
+        instance.stats.return_value = {"endpoint": "eval-box:9222", "connected": True, "max_pages": 6, "available": 5}
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.debug_port = 9222
+        mock_browser_manager.warming_up = False
+        mock_browser_manager.readiness = {}
+        mock_browser_manager.instances = [instance]
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.get("/health")
+        
+        assert response.json()["endpoints"] == [
+            {"endpoint": "eval-box:9222", "connected": True, "max_pages": 6, "available": 5}
+        ]
+    
+    def test_init_browser_with_endpoints(self, test_client):
+        """Test that /init connects to a list of CDP endpoints"""
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.connect = AsyncMock()
+        mock_browser_manager.debug_port = 9222
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/init", json={"endpoints": ["localhost:9222", "eval-box:9222"]})
+            invalid = test_client.post("/init", json={"endpoints": ["eval-box"]})
+        
+        assert response.status_code == 200
+        mock_browser_manager.connect.assert_awaited_once_with(9222, endpoints=["localhost:9222", "eval-box:9222"])
+        assert invalid.status_code == 400
+    
     def test_init_browser_success(self, test_client):
         """Test successful browser initialization"""
         mock_browser_manager = AsyncMock()
@@ -87,7 +151,7 @@ class TestAPIEndpoints:
             data = response.json()
             assert data["success"] is True
             assert data["answer"] == "Mocked AI response"
-            mock_browser_manager.ask_ai.assert_called_once_with("deepseek", "Hello")
+            mock_browser_manager.ask_ai.assert_called_once_with("deepseek", "Hello", priority="normal")
     
     def test_ask_question_browser_not_connected(self, test_client):
         """Test asking question when browser is not connected"""
@@ -114,6 +178,226 @@ class TestAPIEndpoints:
             assert "detail" in data
             assert "AI service error" in data["detail"]
     
+    def test_ask_question_served_from_cache(self, test_client):
+        """Test that a repeated question does not drive the browser again"""
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.ask_ai.return_value = Answer("Mocked AI response")
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            first = test_client.post("/ask?ai=deepseek&question=Hello")
+            second = test_client.post("/ask?ai=deepseek&question=hello")
+            
+            assert first.headers["x-cache"] == "MISS"
+            assert second.headers["x-cache"] == "HIT"
+            assert second.json()["answer"] == "Mocked AI response"
+            mock_browser_manager.ask_ai.assert_called_once()
+    
+    def test_ask_question_unfinished_answer_not_cached(self, test_client):
+        """Test that an answer read after a timeout is asked again next time"""
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.ask_ai.return_value = Answer("Half an ans", "timeout")
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            first = test_client.post("/ask?ai=deepseek&question=Hello")
+            second = test_client.post("/ask?ai=deepseek&question=Hello")
+            
+            assert first.json()["answer"] == "Half an ans"
+            assert second.headers["x-cache"] == "MISS"
+            assert mock_browser_manager.ask_ai.call_count == 2
+    
+    def test_ask_question_cache_opt_out(self, test_client):
+        """Test that Cache-Control: no-cache forces a fresh answer"""
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.ask_ai.return_value = "Mocked AI response"
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            test_client.post("/ask?ai=deepseek&question=Hello")
+            response = test_client.post("/ask?ai=deepseek&question=Hello", headers={"Cache-Control": "no-cache"})
+            
+            assert response.headers["x-cache"] == "MISS"
+            assert mock_browser_manager.ask_ai.call_count == 2
+    
+    def test_ask_question_queue_full(self, test_client):
+        """Test that a full scheduler queue is reported as 429"""
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.ask_ai.side_effect = QueueFullError("Too many queued requests")
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/ask?ai=deepseek&question=Hello&priority=high")
+            
+            assert response.status_code == 429
+            assert response.headers["retry-after"] == "1"
+            mock_browser_manager.ask_ai.assert_called_once_with("deepseek", "Hello", priority="high")
+    
+    def test_ask_question_invalid_priority(self, test_client):
+        """Test that an unknown priority is rejected"""
+        mock_browser_manager = AsyncMock()
+        mock_browser_manager.is_connected.return_value = True
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/ask?ai=deepseek&question=Hello&priority=urgent")
+            
+            assert response.status_code == 400
+            mock_browser_manager.ask_ai.assert_not_called()
+    
+    def test_stats_reports_scheduler(self, test_client):
+        """Test that /stats exposes the scheduler metrics"""
+        response = test_client.get("/stats")
+        
+        assert response.status_code == 200
+        scheduler = response.json()["scheduler"]
+        assert scheduler["queue_depth"] == 0
+        assert set(scheduler["lanes"]) == {"high", "normal", "low"}
+    
+    def test_ask_stream_sends_server_sent_events(self, test_client):
+        """Test streaming answer deltas as Server-Sent Events"""
+        async def stream_ai(ai, question, priority="normal"):
+            yield {"event": "delta", "text": "Hel"}
+            yield {"event": "delta", "text": "lo"}
+            yield {"event": "done", "answer": "Hello"}
+        
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.stream_ai = stream_ai
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.get("/ask/stream?ai=deepseek&question=Hello")
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = [block for block in response.text.split("\n\n") if block]
+            assert events[0] == 'event: delta\ndata: {"event": "delta", "text": "Hel"}'
+            assert events[-1] == 'event: done\ndata: {"event": "done", "answer": "Hello"}'
+    
+    def test_ask_stream_browser_not_connected(self, test_client):
+        """Test streaming when browser is not connected"""
+        with patch('mcp_server.main.browser_manager', None):
+            response = test_client.get("/ask/stream?ai=deepseek&question=Hello")
+            
+            assert response.status_code == 400
+    
+    def test_ask_websocket_streams_events(self, test_client):
+        """Test streaming answer events over a WebSocket"""
+        async def stream_ai(ai, question, priority="normal"):
+            yield {"event": "delta", "text": question}
+            yield {"event": "done", "answer": question}
+        
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.stream_ai = stream_ai
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            with test_client.websocket_connect("/ws/ask") as websocket:
+                websocket.send_json({"ai": "deepseek", "question": "Hi"})
+                assert websocket.receive_json() == {"event": "delta", "text": "Hi"}
+                assert websocket.receive_json() == {"event": "done", "answer": "Hi"}
+                
+                websocket.send_json({"ai": "deepseek"})
+                assert websocket.receive_json()["event"] == "error"
+    
+    def test_ask_multi_streams_each_result(self, test_client):
+        """Test fan-out endpoint streaming one line per service"""
+        async def ask_many(ais, question, timeout=None, priority="normal"):
+            for ai in ais:
+                yield {"ai": ai, "success": True, "answer": f"{ai} answer", "elapsed_ms": 1}
+        
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.ask_many = ask_many
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/ask/multi", json={"ais": ["deepseek", "qwen"], "question": "Hello"})
+            
+            assert response.status_code == 200
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert [line.get("ai") for line in lines[:2]] == ["deepseek", "qwen"]
+            assert lines[-1] == {"done": True, "success": True, "succeeded": 2, "failed": 0}
+    
+    def test_ask_multi_stops_on_failure_without_partial(self, test_client):
+        """Test that partial=false stops at the first failed service"""
+        async def ask_many(ais, question, timeout=None, priority="normal"):
+            yield {"ai": "deepseek", "success": False, "error": "boom", "elapsed_ms": 1}
+            yield {"ai": "qwen", "success": True, "answer": "late", "elapsed_ms": 2}
+        
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.ask_many = ask_many
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/ask/multi", json={"ais": ["deepseek", "qwen"], "question": "Hello", "partial": False})
+            
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert len(lines) == 2
+            assert lines[-1] == {"done": True, "success": False, "succeeded": 0, "failed": 1}
+    
+    def test_ask_multi_requires_ais(self, test_client):
+        """Test fan-out endpoint parameter validation"""
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/ask/multi", json={"question": "Hello"})
+            
+            assert response.status_code == 400
+    
+    def test_ask_multi_invalid_timeout(self, test_client):
+        """Test that a timeout that is not a positive number is rejected"""
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            for timeout in (0, -5, "soon", True):
+                response = test_client.post("/ask/multi", json={"ais": ["deepseek"], "question": "Hello", "timeout": timeout})
+                
+                assert response.status_code == 400
+            mock_browser_manager.ask_many.assert_not_called()
+    
+    def test_ask_batch_streams_results_and_resumes(self, test_client):
+        """Test starting a batch job and following it again by job id"""
+        async def run_batch(ai, questions, start_index=0):
+            for offset, question in enumerate(questions):
+                yield {"index": start_index + offset, "question": question, "success": True, "answer": "ok", "elapsed_ms": 1}
+        
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        mock_browser_manager.run_batch = run_batch
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager):
+            response = test_client.post("/ask/batch", json={"ai": "deepseek", "questions": ["a", "b"]})
+            
+            assert response.status_code == 200
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            job_id = lines[0]["job_id"]
+            assert [line["index"] for line in lines[1:-1]] == [0, 1]
+            assert lines[-1]["done"] is True
+            assert lines[-1]["status"] == "completed"
+            
+            response = test_client.get(f"/ask/batch/{job_id}?offset=1")
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert [line["index"] for line in lines[1:-1]] == [1]
+    
+    def test_ask_batch_invalid_offset(self, test_client):
+        """Test that a non-numeric or negative offset is rejected before a job starts"""
+        mock_browser_manager = MagicMock()
+        mock_browser_manager.is_connected.return_value = True
+        
+        with patch('mcp_server.main.browser_manager', mock_browser_manager), \
+                patch('mcp_server.main.batch_manager') as mock_batch_manager:
+            for offset in ("abc", -1, None):
+                response = test_client.post("/ask/batch", json={"ai": "deepseek", "questions": ["a"], "offset": offset})
+                assert response.status_code == 400
+            mock_batch_manager.submit.assert_not_called()
+    
+    def test_ask_batch_unknown_job(self, test_client):
+        """Test following a batch job that does not exist"""
+        response = test_client.get("/ask/batch/missing")
+        
+        assert response.status_code == 404
+    
     def test_get_supported_ais(self, test_client):
         """Test getting supported AI list"""
         response = test_client.get("/ais")
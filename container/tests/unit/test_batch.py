@@ -0,0 +1,96 @@
+"""
+Unit tests for batch question jobs
+"""
+import asyncio
+import pytest
+
+from mcp_server.batch import BatchManager
+
+
+class FakeBrowserManager:
+    """Browser manager stand-in that answers batch questions from a script"""
+
+    def __init__(self, fail_at=None, gate=None):
+        self.fail_at = fail_at
+        self.gate = gate
+        self.calls = []
+
+    async def run_batch(self, ai, questions, start_index=0):
+        self.calls.append((ai, list(questions), start_index))
+        for offset, question in enumerate(questions):
+            index = start_index + offset
+            if self.gate:
+                await self.gate.wait()
+            if index == self.fail_at:
+                self.fail_at = None
+                raise RuntimeError("Browser disconnected")
+            yield {"index": index, "question": question, "success": True, "answer": question.upper(), "elapsed_ms": 1}
+
+
+class TestBatchManager:
+    """Test cases for BatchManager"""
+
+    @pytest.mark.asyncio
+    async def test_job_collects_all_results(self):
+        """Test that a job runs every question and completes"""
+        manager = BatchManager()
+        job = manager.submit(FakeBrowserManager(), "deepseek", ["a", "b", "c"])
+
+        results = [result async for result in job.follow()]
+
+        assert [result["answer"] for result in results] == ["A", "B", "C"]
+        assert job.status == "completed"
+        assert job.summary()["completed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_follow_from_offset(self):
+        """Test that following a job can start part way through"""
+        manager = BatchManager()
+        job = manager.submit(FakeBrowserManager(), "deepseek", ["a", "b", "c"])
+        await job.task
+
+        results = [result async for result in job.follow(offset=2)]
+
+        assert [result["index"] for result in results] == [2]
+
+    @pytest.mark.asyncio
+    async def test_failed_job_resumes_where_it_stopped(self):
+        """Test that resubmitting a failed job only asks the remaining questions"""
+        manager = BatchManager()
+        browser_manager = FakeBrowserManager(fail_at=1)
+        job = manager.submit(browser_manager, "deepseek", ["a", "b", "c"], job_id="eval-1")
+        await job.task
+        assert job.status == "failed"
+        assert job.error == "Browser disconnected"
+
+        resumed = manager.submit(browser_manager, "deepseek", ["a", "b", "c"], job_id="eval-1")
+        await resumed.task
+
+        assert resumed is job
+        assert job.status == "completed"
+        assert browser_manager.calls[1] == ("deepseek", ["b", "c"], 1)
+        assert [result["index"] for result in job.results] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_running_job_is_not_restarted(self):
+        """Test that submitting a running job id returns the same job"""
+        manager = BatchManager()
+        gate = asyncio.Event()
+        browser_manager = FakeBrowserManager(gate=gate)
+        job = manager.submit(browser_manager, "deepseek", ["a"], job_id="eval-2")
+
+        assert manager.submit(browser_manager, "deepseek", ["a"], job_id="eval-2") is job
+        gate.set()
+        await job.task
+        assert len(browser_manager.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_job(self):
+        """Test that a running job can be cancelled"""
+        manager = BatchManager()
+        job = manager.submit(FakeBrowserManager(gate=asyncio.Event()), "deepseek", ["a"])
+        await asyncio.sleep(0)
+
+        assert await manager.cancel(job.id)
+        assert job.status == "cancelled"
+        assert not await manager.cancel("missing")
@@ -0,0 +1,137 @@
+"""
+Unit tests for browser instance placement
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from mcp_server.browser_instances import BrowserInstance, InstancePlacement, parse_endpoint
+from mcp_server.hash_ring import HashRing
+from mcp_server.page_pool import PagePool
+
+
+def make_instance(port, max_pages=4, host="localhost"):
+    """Browser instance whose page pool opens mock tabs"""
+    context = MagicMock()
+
+    def new_page():
+        page = MagicMock()
+        page.is_closed.return_value = False
+        page.close = AsyncMock()
+        return page
+
+    context.new_page = AsyncMock(side_effect=new_page)
+    return BrowserInstance(port=port, browser=MagicMock(), page_pool=PagePool(context, max_pages=max_pages), host=host)
+
+
+class TestHashRing:
+    """Test cases for the consistent hash ring"""
+
+    def test_keys_map_to_the_same_node(self):
+        """Test that rings with the same nodes agree, whatever the insertion order"""
+        first = HashRing(["a:9222", "b:9222", "c:9222"])
+        second = HashRing(["c:9222", "a:9222", "b:9222"])
+
+        for key in ("deepseek", "qwen", "kimi", "chatgpt"):
+            assert first.get(key) == second.get(key)
+
+    def test_removing_a_node_only_moves_its_keys(self):
+        """Test that keys of the remaining nodes stay where they were"""
+        ring = HashRing(["a:9222", "b:9222", "c:9222"])
+        keys = [f"service-{index}" for index in range(200)]
+        before = {key: ring.get(key) for key in keys}
+
+        ring.remove("b:9222")
+
+        for key in keys:
+            if before[key] != "b:9222":
+                assert ring.get(key) == before[key]
+        assert set(before.values()) == {"a:9222", "b:9222", "c:9222"}
+
+    def test_walk_visits_every_node_once(self):
+        """Test that walking the ring yields each node exactly once"""
+        ring = HashRing(["a:9222", "b:9222", "c:9222"])
+        assert sorted(ring.walk("deepseek")) == ["a:9222", "b:9222", "c:9222"]
+        assert list(HashRing().walk("deepseek")) == []
+
+
+class TestInstancePlacement:
+    """Test cases for InstancePlacement"""
+
+    def test_parse_endpoint(self):
+        """Test the accepted endpoint notations"""
+        assert parse_endpoint("9223") == ("localhost", 9223)
+        assert parse_endpoint(9223) == ("localhost", 9223)
+        assert parse_endpoint("10.0.0.5:9222") == ("10.0.0.5", 9222)
+        assert parse_endpoint("http://eval-box:9333") == ("eval-box", 9333)
+        assert parse_endpoint("ws://eval-box:9333/devtools/browser/abc") == ("eval-box", 9333)
+        with pytest.raises(ValueError):
+            parse_endpoint("eval-box")
+
+    def test_idle_placement_follows_the_ring(self):
+        """Test that without load a service always lands on the same instance"""
+        for _ in range(3):
+            instances = [make_instance(9222), make_instance(9223), make_instance(9224)]
+            placement = InstancePlacement()
+            assert placement.place("deepseek", instances).name == HashRing(
+                [instance.name for instance in instances]
+            ).get("deepseek")
+
+    @pytest.mark.asyncio
+    async def test_services_spread_over_instances(self):
+        """Test that load bounds keep every instance in use"""
+        first, second = make_instance(9222), make_instance(9223)
+        placement = InstancePlacement()
+
+        for service_id in ("deepseek", "qwen", "kimi", "chatgpt"):
+            async with placement.place(service_id, [first, second]).page_pool.lease(service_id):
+                pass
+
+        assert sorted(placement.placements().values()) == [
+            "localhost:9222", "localhost:9222", "localhost:9223", "localhost:9223"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_service_stays_on_its_instance(self):
+        """Test that a service keeps its instance while the tab is there"""
+        instances = [make_instance(9222), make_instance(9223)]
+        placement = InstancePlacement()
+
+        owner = placement.place("deepseek", instances)
+        async with owner.page_pool.lease("deepseek"):
+            pass
+        async with owner.page_pool.lease("qwen"):
+            pass
+
+        assert placement.place("deepseek", instances) is owner
+
+    @pytest.mark.asyncio
+    async def test_service_is_placed_again_after_eviction(self):
+        """Test that an evicted service moves when its instance is the busier one"""
+        instances = [make_instance(9222, max_pages=1), make_instance(9223, max_pages=1)]
+        placement = InstancePlacement()
+
+        owner = placement.place("deepseek", instances)
+        async with owner.page_pool.lease("deepseek"):
+            pass
+        async with owner.page_pool.lease("qwen"):
+            pass
+
+        assert placement.place("deepseek", instances) is not owner
+
+    def test_disconnected_instance_is_routed_around(self):
+        """Test that services of a dead endpoint move to a connected one"""
+        instances = [make_instance(9222, host="a"), make_instance(9222, host="b")]
+        placement = InstancePlacement()
+        owner = placement.place("deepseek", instances)
+
+        owner.connected = False
+
+        assert placement.place("deepseek", instances) is not owner
+
+    def test_no_instances(self):
+        """Test that placing without connected instances fails"""
+        instance = make_instance(9222)
+        instance.connected = False
+        with pytest.raises(RuntimeError):
+            InstancePlacement().place("deepseek", [])
+        with pytest.raises(RuntimeError):
+            InstancePlacement().place("deepseek", [instance])
@@ -1,21 +1,51 @@
 """
 Unit tests for BrowserManager class
 """
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from mcp_server.browser import BrowserManager
+from mcp_server.page_pool import PagePool
+from mcp_server.cdp_probe import CDPEndpoint
+
+
+def make_page():
+    """Tab mock whose coroutine methods are async and the rest plain, as in Playwright"""
+    page = MagicMock()
+    page.url = ""
+    page.is_closed.return_value = False
+    for method in ("goto", "reload", "close", "title", "evaluate", "wait_for_selector", "wait_for_timeout",
+                   "query_selector", "query_selector_all", "eval_on_selector_all", "bring_to_front"):
+        setattr(page, method, AsyncMock())
+    session = MagicMock()
+    session.send = AsyncMock()
+    session.detach = AsyncMock()
+    page.context.new_cdp_session = AsyncMock(return_value=session)
+    return page
+
+
+def make_browser(page=None):
+    """Browser mock with one context showing page"""
+    browser = MagicMock()
+    browser.close = AsyncMock()
+    browser.new_context = AsyncMock()
+    context = MagicMock()
+    context.pages = [page or make_page()]
+    context.new_page = AsyncMock(side_effect=make_page)
+    browser.contexts = [context]
+    return browser
 
 
 @pytest.fixture
 def mock_page():
     """Mock page fixture"""
-    return AsyncMock()
+    return make_page()
 
 
 @pytest.fixture
 def mock_browser():
     """Mock browser fixture"""
-    return AsyncMock()
+    return make_browser()
 
 
 @pytest.fixture
@@ -50,13 +80,8 @@ class TestBrowserManager:
         manager = BrowserManager()
         
         # Mock browser objects
-        mock_browser = AsyncMock()
-        mock_context = AsyncMock()
-        mock_page = AsyncMock()
-        
-        # Setup mock chain
-        mock_browser.contexts = [mock_context]
-        mock_context.pages = [mock_page]
+        mock_page = make_page()
+        mock_browser = make_browser(mock_page)
         mock_browser.is_connected.return_value = True
         
         # Mock the playwright.chromium.connect_over_cdp method directly
@@ -64,20 +89,226 @@ class TestBrowserManager:
             # Create a simple mock that returns a playwright instance with our mocked browser
             mock_playwright_instance = AsyncMock()
             mock_playwright_instance.chromium.connect_over_cdp.return_value = mock_browser
-            
-            # Create a simple async context manager mock
-            mock_context_manager = AsyncMock()
-            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_playwright_instance)
-            mock_context_manager.__aexit__ = AsyncMock(return_value=None)
-            mock_async_playwright.return_value = mock_context_manager
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
             
             await manager.connect(debug_port=9222)
             
             # Verify connection
-            mock_browser.is_connected.return_value = True
             assert manager.is_connected() is True
-            assert manager.browser is not None
-            assert manager.page is not None
+            assert manager.browser is mock_browser
+            assert manager.page is mock_page
+    
+    @pytest.mark.asyncio
+    async def test_connect_uses_known_websocket_url(self):
+        """Test that a probed DevTools endpoint is connected to directly"""
+        manager = BrowserManager()
+        manager.chrome_manager = MagicMock()
+        manager.chrome_manager.endpoint = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/abc")
+        mock_browser = make_browser()
+        
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright:
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.return_value = mock_browser
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+            
+            await manager.connect(debug_port=9222)
+        
+        mock_playwright_instance.chromium.connect_over_cdp.assert_awaited_once_with(
+            "ws://127.0.0.1:9222/devtools/browser/abc"
+        )
+    
+    @pytest.mark.asyncio
+    async def test_connect_probes_again_when_websocket_url_is_stale(self):
+        """Test that a websocket URL left over from before a Chrome restart is looked up again"""
+        manager = BrowserManager()
+        manager.chrome_manager = MagicMock()
+        manager.chrome_manager.endpoint = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/old")
+        fresh = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/new")
+        mock_browser = make_browser()
+        
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright, \
+                patch('mcp_server.browser.probe_cdp', new_callable=AsyncMock, return_value=fresh) as probe:
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.side_effect = [
+                Exception("WebSocket error: 404 Not Found"), mock_browser
+            ]
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+            
+            await manager.connect(debug_port=9222)
+        
+        probe.assert_awaited_once_with("localhost", 9222, timeout=0)
+        assert mock_playwright_instance.chromium.connect_over_cdp.await_args.args == (fresh.websocket_url,)
+        assert manager.browser is mock_browser
+    
+    @pytest.mark.asyncio
+    async def test_connect_every_started_instance(self):
+        """Test that all instances started by the host service are connected"""
+        manager = BrowserManager()
+        manager.chrome_manager = MagicMock()
+        manager.chrome_manager.endpoint = None
+        manager.chrome_manager.endpoints = [
+            CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/a"),
+            CDPEndpoint("127.0.0.1", 9223, "ws://127.0.0.1:9223/devtools/browser/b")
+        ]
+
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright:
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.side_effect = lambda url: make_browser()
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+        
+            await manager.connect(debug_port=9222)
+        
+        assert [instance.port for instance in manager.instances] == [9222, 9223]
+        assert manager.page_pool is manager.instances[0].page_pool
+        # Once deepseek has its tab, the next service goes to the idle instance
+        async with manager.lease_page("deepseek"):
+            assert manager._page_pool_for("qwen") is not manager._page_pool_for("deepseek")
+        
+    @pytest.mark.asyncio
+    async def test_connect_endpoints_skips_unreachable(self):
+        """Test that sharding connects the reachable endpoints and skips the rest"""
+        manager = BrowserManager()
+        mock_browser = make_browser()
+        
+        async def probe(host, port, timeout):
+            if host == "dead-box":
+                return None
+            return CDPEndpoint(host, port, f"ws://{host}:{port}/devtools/browser/x")
+        
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright, \
+                patch('mcp_server.browser.probe_cdp', side_effect=probe):
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.return_value = mock_browser
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+            
+            await manager.connect(endpoints=["eval-box:9333", "dead-box:9222"])
+        
+        assert [instance.name for instance in manager.instances] == ["eval-box:9333"]
+        assert manager.debug_port == 9333
+        mock_playwright_instance.chromium.connect_over_cdp.assert_awaited_once_with(
+            "ws://eval-box:9333/devtools/browser/x"
+        )
+        # A disconnect takes the instance out of routing
+        disconnected = mock_browser.on.call_args.args[1]
+        disconnected(mock_browser)
+        assert manager.instances[0].connected is False
+        assert manager.reconnecting
+        await manager.close()
+        assert not manager.reconnecting
+    
+    @pytest.mark.asyncio
+    async def test_reconnect_after_disconnect(self):
+        """Test that a lost browser is reattached with backoff and its tabs reopened"""
+        manager = BrowserManager()
+        old_browser, new_browser = make_browser(), make_browser()
+        endpoint = CDPEndpoint("localhost", 9222, "ws://localhost:9222/devtools/browser/x")
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright, \
+                patch('mcp_server.browser.probe_cdp', side_effect=[endpoint, None, endpoint]) as probe, \
+                patch('mcp_server.browser.RECONNECT_INITIAL_DELAY', 0.01), \
+                patch('mcp_server.browser.create_ai_handler') as create_handler:
+            create_handler.return_value = AsyncMock()
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.side_effect = [old_browser, new_browser]
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+            
+            await manager.connect(debug_port=9222)
+            async with manager.lease_page("deepseek"):
+                pass
+            
+            # Chrome restarts
+            old_browser.on.call_args.args[1](old_browser)
+            assert manager.is_connected() is False
+            assert manager.reconnecting
+            task = manager._reconnect_tasks["localhost:9222"]
+            
+            assert await manager.wait_for_browser(timeout=2) is True
+            await task
+        
+        assert probe.call_count == 3
+        assert manager.is_connected() is True
+        assert not manager.reconnecting
+        assert manager.browser is new_browser
+        assert manager.page_pool is manager.instances[0].page_pool
+        new_browser.on.assert_called_once()
+        # The tab is reopened on the same instance, where the service stays placed
+        create_handler.return_value.navigate_to_service.assert_awaited_once()
+        assert manager.instances[0].page_pool.stats()["pages"] == ["deepseek"]
+        assert manager.readiness == {}
+        # A late event from the old browser is ignored
+        old_browser.on.call_args.args[1](old_browser)
+        assert manager.is_connected() is True
+    
+    @pytest.mark.asyncio
+    async def test_reconnect_gives_up(self):
+        """Test that a removed endpoint does not keep a supervisor running"""
+        manager = BrowserManager()
+        instance = MagicMock(connected=False)
+        instance.name = "eval-box:9222"
+        instance.page_pool.stats.return_value = {"pages": []}
+        manager.instances = [instance]
+        
+        with patch('mcp_server.browser.probe_cdp', new_callable=AsyncMock, return_value=None) as probe, \
+                patch('mcp_server.browser.RECONNECT_INITIAL_DELAY', 0.01), \
+                patch.object(BrowserManager, '_reconnect_settings', return_value={"give_up_ms": 50, "max_delay_ms": 20}):
+            manager._reconnect_tasks[instance.name] = asyncio.ensure_future(manager._reconnect(instance))
+            await asyncio.wait_for(manager._reconnect_tasks[instance.name], 2)
+        
+        assert probe.await_count > 1
+        assert not manager.reconnecting
+        assert instance.connected is False
+        assert await manager.wait_for_browser(timeout=0.1) is False
+    
+    @pytest.mark.asyncio
+    async def test_ask_ai_replayed_after_reconnect(self):
+        """Test that a question cut off by a disconnect is asked again once the browser is back"""
+        manager = BrowserManager()
+        instance = MagicMock(connected=True)
+        manager.instances = [instance]
+        attempts = []
+        
+        async def come_back():
+            await asyncio.sleep(0.01)
+            instance.connected = True
+            manager._reconnect_tasks.pop("localhost:9222")
+        
+        async def ask_once(ai, question, priority):
+            attempts.append(ai)
+            if len(attempts) == 1:
+                instance.connected = False
+                manager._reconnect_tasks["localhost:9222"] = asyncio.ensure_future(come_back())
+                raise Exception("Target page, context or browser has been closed")
+            return "Answer"
+        
+        with patch.object(manager, '_ask_ai_once', side_effect=ask_once):
+            assert await manager.ask_ai("deepseek", "Question") == "Answer"
+        assert attempts == ["deepseek", "deepseek"]
+    
+    @pytest.mark.asyncio
+    async def test_leased_tab_is_routed_through_resource_blocking(self):
+        """Test that every leased tab gets its service's request blocking"""
+        manager = BrowserManager()
+        page = MagicMock()
+        page.is_closed.return_value = False
+        context = MagicMock()
+        context.new_page = AsyncMock(return_value=page)
+        manager.page_pool = PagePool(context)
+        
+        with patch.object(manager.resource_blocking, 'attach', new_callable=AsyncMock) as attach:
+            async with manager.lease_page("DeepSeek") as leased:
+                assert leased is page
+        
+        attach.assert_awaited_once_with("deepseek", page)
+    
+    @pytest.mark.asyncio
+    async def test_ask_ai_other_errors_are_not_replayed(self):
+        """Test that failures unrelated to the connection are raised at once"""
+        manager = BrowserManager()
+        manager.instances = [MagicMock(connected=True)]
+        
+        with patch.object(manager, '_ask_ai_once', side_effect=Exception("Input not found")) as ask_once:
+            with pytest.raises(Exception, match="Input not found"):
+                await manager.ask_ai("deepseek", "Question")
+        assert ask_once.call_count == 1
     
     @pytest.mark.asyncio
     async def test_connect_failure(self):
@@ -190,6 +421,186 @@ class TestBrowserManager:
         with pytest.raises(RuntimeError, match="Browser page not available"):
             await manager.switch_ai("deepseek")
     
+    @pytest.mark.asyncio
+    async def test_ask_ai_coalesces_identical_requests(self, mock_page):
+        """Test that the same question asked concurrently drives the browser once"""
+        manager = BrowserManager()
+        manager.page = mock_page
+        handler = AsyncMock()
+        
+        async def ask_question(question):
+            await asyncio.sleep(0.01)
+            return "answer"
+        
+        handler.ask_question.side_effect = ask_question
+        
+        with patch('mcp_server.browser.create_ai_handler', return_value=handler):
+            results = await asyncio.gather(
+                manager.ask_ai("deepseek", "Hello"),
+                manager.ask_ai("DeepSeek", "  hello"),
+                manager.ask_ai("qwen", "Hello")
+            )
+        
+        assert results == ["answer"] * 3
+        assert handler.ask_question.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_ask_many_yields_results_as_they_complete(self):
+        """Test that fan-out returns the fastest service first and reports failures"""
+        manager = BrowserManager()
+        delays = {"deepseek": 0.05, "qwen": 0.0}
+        
+        async def ask_ai(ai, question, priority="normal"):
+            if ai == "kimi":
+                raise RuntimeError("Could not find input element")
+            await asyncio.sleep(delays[ai])
+            return f"{ai}: {question}"
+        
+        manager.ask_ai = ask_ai
+        results = [result async for result in manager.ask_many(["deepseek", "qwen", "kimi"], "Hi")]
+        
+        assert [result["ai"] for result in results if result["success"]] == ["qwen", "deepseek"]
+        failed = [result for result in results if not result["success"]]
+        assert failed[0]["ai"] == "kimi"
+        assert "Could not find input element" in failed[0]["error"]
+        assert all("elapsed_ms" in result for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_ask_many_applies_per_service_timeout(self):
+        """Test that a slow service times out without holding back the others"""
+        manager = BrowserManager()
+        
+        async def ask_ai(ai, question, priority="normal"):
+            await asyncio.sleep(1 if ai == "deepseek" else 0)
+            return "answer"
+        
+        manager.ask_ai = ask_ai
+        results = [result async for result in manager.ask_many(["deepseek", "qwen"], "Hi", timeout=0.05)]
+        
+        assert results[0] == {"ai": "qwen", "success": True, "answer": "answer", "elapsed_ms": results[0]["elapsed_ms"]}
+        assert results[1]["ai"] == "deepseek"
+        assert not results[1]["success"]
+        assert "Timed out" in results[1]["error"]
+    
+    @pytest.mark.asyncio
+    async def test_dedicated_page_skips_disconnected_instances(self):
+        """Test that batch tabs are opened on a connected instance only"""
+        manager = BrowserManager()
+        down, up = MagicMock(connected=False), MagicMock(connected=True)
+        down.page_pool.load, up.page_pool.load = 0.0, 0.5
+        up.page_pool.context.new_page = AsyncMock(return_value=make_page())
+        manager.instances = [down, up]
+        manager.page_pool = down.page_pool
+        
+        async with manager.dedicated_page("deepseek"):
+            pass
+        
+        up.page_pool.context.new_page.assert_awaited_once()
+        down.page_pool.context.new_page.assert_not_called()
+        
+        up.connected = False
+        with pytest.raises(ConnectionError):
+            async with manager.dedicated_page("deepseek"):
+                pass
+    
+    @pytest.mark.asyncio
+    async def test_connect_again_subscribes_once(self):
+        """Test that repeated /init calls do not pile up configuration listeners"""
+        manager = BrowserManager()
+        mock_browser = make_browser()
+        
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright, \
+                patch('mcp_server.browser.config_store') as mock_config_store:
+            listeners = []
+            mock_config_store.subscribe.side_effect = listeners.append
+            mock_config_store.unsubscribe.side_effect = lambda listener: listener in listeners and listeners.remove(listener)
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.return_value = mock_browser
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+            
+            await manager.connect(debug_port=9222)
+            await manager.connect(debug_port=9222)
+            
+            assert listeners == [manager._apply_config]
+    
+    @pytest.mark.asyncio
+    async def test_connect_again_replaces_previous_connection(self):
+        """Test that connecting again closes the earlier browsers and ignores their events"""
+        manager = BrowserManager()
+        old_browser, new_browser = browsers = [make_browser(), make_browser()]
+        
+        with patch('mcp_server.browser.async_playwright') as mock_async_playwright:
+            mock_playwright_instance = AsyncMock()
+            mock_playwright_instance.chromium.connect_over_cdp.side_effect = browsers
+            mock_async_playwright.return_value.start = AsyncMock(return_value=mock_playwright_instance)
+            
+            await manager.connect(debug_port=9222)
+            old_listener = old_browser.on.call_args.args[1]
+            await manager.connect(debug_port=9222)
+        
+        old_browser.close.assert_awaited_once()
+        old_browser.remove_listener.assert_called_once_with("disconnected", old_listener)
+        mock_playwright_instance.stop.assert_awaited_once()
+        assert [instance.browser for instance in manager.instances] == [new_browser]
+        
+        # A disconnected event of the earlier browser arriving late changes nothing
+        old_listener(old_browser)
+        assert manager.instances[0].connected
+        assert not manager.reconnecting
+        
+        await manager.close()
+    
+    @pytest.mark.asyncio
+    async def test_run_batch_navigates_once(self, mock_page):
+        """Test that a batch pipelines questions without navigating between them"""
+        manager = BrowserManager()
+        manager.page = mock_page
+        handler = AsyncMock()
+        handler.ask_question.side_effect = ["first", RuntimeError("no input"), "third"]
+        
+        with patch('mcp_server.browser.create_ai_handler', return_value=handler):
+            results = [result async for result in manager.run_batch("deepseek", ["q1", "q2", "q3"], start_index=5)]
+        
+        assert [result["index"] for result in results] == [5, 6, 7]
+        assert [result["success"] for result in results] == [True, False, True]
+        assert results[2]["answer"] == "third"
+        # Once up front and once to recover from the failed question
+        assert handler.navigate_to_service.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_reports_readiness(self, mock_page):
+        """Test that warm-up opens each service and records whether it is usable"""
+        manager = BrowserManager()
+        manager.page = mock_page
+        ready, degraded = AsyncMock(), AsyncMock()
+        ready.check_selectors.return_value = {"input": True, "submit": True}
+        degraded.check_selectors.return_value = {"input": False, "submit": True}
+        handlers = {"deepseek": ready, "qwen": degraded, "kimi": None}
+        
+        # Room for three tabs
+        manager.page_pool = MagicMock(max_pages=3)
+        
+        with patch('mcp_server.browser.create_ai_handler', side_effect=lambda ai, page: handlers[ai]), \
+                patch.object(BrowserManager, 'lease_page') as lease_page:
+            lease_page.return_value.__aenter__.return_value = mock_page
+            readiness = await manager.warm_up(["deepseek", "qwen", "kimi", "chatgpt"])
+        
+        assert readiness["deepseek"]["status"] == "ready"
+        assert readiness["qwen"]["status"] == "degraded"
+        assert readiness["qwen"]["checks"] == {"input": False, "submit": True}
+        assert readiness["kimi"]["status"] == "failed"
+        assert "chatgpt" not in readiness
+        assert manager.readiness["chatgpt"]["status"] == "skipped"
+        ready.navigate_to_service.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_warm_up_disabled_by_default(self):
+        """Test that nothing is started unless browser.warm_up.enabled is set"""
+        manager = BrowserManager()
+        
+        assert manager.start_warm_up() is None
+        assert not manager.warming_up
+    
     def test_is_connected_false(self):
         """Test is_connected when browser is not connected"""
         manager = BrowserManager()
@@ -199,7 +610,8 @@ class TestBrowserManager:
         """Test is_connected when browser is connected"""
         manager = BrowserManager()
         manager.browser = mock_browser
-        mock_browser.is_connected.return_value = True
+        # Browser.is_connected() is synchronous in Playwright
+        mock_browser.is_connected = MagicMock(return_value=True)
         
         assert manager.is_connected()
     
@@ -0,0 +1,61 @@
+"""
+Unit tests for the DevTools readiness probe
+"""
+import io
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from mcp_server.cdp_probe import CDPEndpoint, backoff_delays, fetch_version, probe_cdp, wait_for_cdp
+
+VERSION = {
+    "Browser": "Chrome/120.0.6099.109",
+    "Protocol-Version": "1.3",
+    "webSocketDebuggerUrl": "ws://127.0.0.1:9222/devtools/browser/abc"
+}
+
+
+def http_response(payload):
+    response = MagicMock()
+    response.__enter__.return_value = io.BytesIO(json.dumps(payload).encode('utf-8'))
+    return response
+
+
+class TestCDPProbe:
+    """Test cases for the DevTools readiness probe"""
+
+    def test_backoff_delays(self):
+        """Test that delays double up to the maximum"""
+        delays = backoff_delays(0.05, 0.3)
+        assert [next(delays) for _ in range(5)] == [0.05, 0.1, 0.2, 0.3, 0.3]
+
+    def test_fetch_version_points_websocket_at_probed_address(self):
+        """Test that the websocket URL uses the probed host and port"""
+        with patch('mcp_server.cdp_probe.urllib.request.urlopen', return_value=http_response(VERSION)) as urlopen:
+            endpoint = fetch_version("localhost", 9333)
+
+        assert urlopen.call_args.args[0] == "http://localhost:9333/json/version"
+        assert endpoint == CDPEndpoint("localhost", 9333, "ws://localhost:9333/devtools/browser/abc",
+                                       "Chrome/120.0.6099.109", "1.3")
+        assert endpoint.http_url == "http://localhost:9333"
+
+    def test_fetch_version_not_ready(self):
+        """Test that a refused connection or an answer without websocket URL is not ready"""
+        with patch('mcp_server.cdp_probe.urllib.request.urlopen', side_effect=OSError("refused")):
+            assert fetch_version() is None
+        with patch('mcp_server.cdp_probe.urllib.request.urlopen', return_value=http_response({"Browser": "x"})):
+            assert fetch_version() is None
+
+    def test_wait_for_cdp_retries_with_backoff(self):
+        """Test that the blocking probe sleeps between attempts until Chrome answers"""
+        endpoint = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/abc")
+        with patch('mcp_server.cdp_probe.fetch_version', side_effect=[None, None, endpoint]), \
+                patch('mcp_server.cdp_probe.time.sleep') as sleep:
+            assert wait_for_cdp(timeout=10) == endpoint
+        assert [call.args[0] for call in sleep.call_args_list] == [0.05, 0.1]
+
+    @pytest.mark.asyncio
+    async def test_probe_cdp_single_attempt(self):
+        """Test that a zero timeout makes exactly one attempt"""
+        with patch('mcp_server.cdp_probe.fetch_version', return_value=None) as fetch:
+            assert await probe_cdp(timeout=0) is None
+        assert fetch.call_count == 1
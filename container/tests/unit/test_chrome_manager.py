@@ -0,0 +1,124 @@
+"""
+Unit tests for ChromeManager class
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from mcp_server.cdp_probe import CDPEndpoint
+from mcp_server.chrome_manager import ChromeManager
+
+
+@pytest.fixture
+def chrome_manager():
+    """ChromeManager running on the host"""
+    with patch.object(ChromeManager, '_is_running_in_container', return_value=False):
+        manager = ChromeManager()
+    return manager
+
+
+class TestChromeManager:
+    """Test cases for ChromeManager class"""
+
+    @pytest.mark.asyncio
+    async def test_is_chrome_running_requires_devtools_endpoint(self, chrome_manager):
+        """Test that Chrome counts as running only once /json/version answers"""
+        endpoint = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/x")
+        with patch('mcp_server.chrome_manager.fetch_version', return_value=None):
+            assert await chrome_manager.is_chrome_running() is False
+        with patch('mcp_server.chrome_manager.fetch_version', return_value=endpoint):
+            assert await chrome_manager.is_chrome_running() is True
+        assert chrome_manager.endpoint == endpoint
+
+    @pytest.mark.asyncio
+    async def test_wait_until_running_polls_without_blocking(self, chrome_manager):
+        """Test that readiness polling backs off on the event loop"""
+        endpoint = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/x")
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0.01)
+
+        task = asyncio.ensure_future(ticker())
+        with patch('mcp_server.cdp_probe.fetch_version', side_effect=[None, None, endpoint]) as fetch:
+            assert await chrome_manager.wait_until_running(timeout=5) is True
+        task.cancel()
+
+        assert fetch.call_count == 3
+        assert ticks
+        assert chrome_manager.endpoint == endpoint
+
+    @pytest.mark.asyncio
+    async def test_wait_until_running_stops_when_chrome_exits(self, chrome_manager):
+        """Test that polling gives up as soon as the Chrome process is gone"""
+        chrome_manager.chrome_process = MagicMock(returncode=1)
+        with patch('mcp_server.cdp_probe.fetch_version', return_value=None) as fetch:
+            assert await chrome_manager.wait_until_running(timeout=5) is False
+        assert fetch.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_start_chrome_spawns_subprocess(self, chrome_manager):
+        """Test that Chrome is started with asyncio and awaited until ready"""
+        process = MagicMock(returncode=None)
+        with patch.object(chrome_manager, 'is_chrome_running', AsyncMock(return_value=False)), \
+                patch.object(chrome_manager, 'wait_until_running', AsyncMock(return_value=True)), \
+                patch.object(chrome_manager, '_find_chrome_executable', return_value="/usr/bin/chromium"), \
+                patch('mcp_server.chrome_manager.os.makedirs'), \
+                patch('mcp_server.chrome_manager.asyncio.create_subprocess_exec',
+                      AsyncMock(return_value=process)) as create_subprocess_exec:
+            assert await chrome_manager.start_chrome(headless=True) is True
+
+        args = create_subprocess_exec.call_args.args
+        assert args[0] == "/usr/bin/chromium"
+        assert "--remote-debugging-port=9222" in args
+        assert "--headless=new" in args
+        assert chrome_manager.chrome_process is process
+
+    @pytest.mark.asyncio
+    async def test_stop_chrome(self, chrome_manager):
+        """Test that the process is terminated and awaited"""
+        process = MagicMock(returncode=None)
+        process.wait = AsyncMock(return_value=0)
+        chrome_manager.chrome_process = process
+
+        await chrome_manager.stop_chrome()
+
+        process.terminate.assert_called_once()
+        process.wait.assert_awaited_once()
+        assert chrome_manager.chrome_process is None
+
+    @pytest.mark.asyncio
+    async def test_start_pool_asks_host_service(self, chrome_manager):
+        """Test that a container asks the host service for several instances"""
+        chrome_manager.is_container = True
+        host_client = MagicMock()
+        host_client.start_pool = AsyncMock(return_value={
+            'instances': [
+                {'port': 9223, 'websocket_url': "ws://127.0.0.1:9223/devtools/browser/b"},
+                {'port': 9222, 'websocket_url': "ws://127.0.0.1:9222/devtools/browser/a"}
+            ],
+            'errors': {'9224': "Chrome did not become ready"}
+        })
+        chrome_manager.host_client = host_client
+
+        assert await chrome_manager.start_pool(3) is True
+
+        assert host_client.start_pool.call_args.args == (3,)
+        assert host_client.start_pool.call_args.kwargs['port'] == 9222
+        assert [endpoint.port for endpoint in chrome_manager.endpoints] == [9222, 9223]
+        assert chrome_manager.endpoint.websocket_url == "ws://127.0.0.1:9222/devtools/browser/a"
+
+    @pytest.mark.asyncio
+    async def test_start_pool_on_host_starts_one_chrome(self, chrome_manager):
+        """Test that outside a container a single Chrome is started"""
+        endpoint = CDPEndpoint("127.0.0.1", 9222, "ws://127.0.0.1:9222/devtools/browser/x")
+
+        async def start_chrome(headless=False):
+            chrome_manager.endpoint = endpoint
+            return True
+
+        with patch.object(chrome_manager, 'start_chrome', side_effect=start_chrome):
+            assert await chrome_manager.start_pool(3) is True
+
+        assert chrome_manager.endpoints == [endpoint]
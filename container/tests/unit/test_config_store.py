@@ -0,0 +1,133 @@
+"""
+Unit tests for ConfigStore hot reload
+"""
+import asyncio
+import os
+import threading
+import pytest
+from unittest.mock import AsyncMock
+
+from mcp_server.config_store import ConfigStore, ConfigSnapshot
+from mcp_server.handlers.deepseek_handler import DeepSeekHandler
+
+
+def write_config(path, response_timeout, level="INFO"):
+    """Write a config file and make sure its mtime changes"""
+    previous = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_text(
+        "browser:\n"
+        f"  response_timeout: {response_timeout}\n"
+        "logging:\n"
+        f"  level: \"{level}\"\n"
+        "ai_services:\n"
+        "  - id: \"deepseek\"\n"
+        "    name: \"DeepSeek\"\n"
+        "    url: \"https://chat.deepseek.com\"\n"
+        "    category: \"domestic\"\n"
+    )
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, previous + 1_000_000_000)))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.yaml"
+    write_config(path, 1000)
+    return path
+
+
+class TestConfigStore:
+    """Test cases for ConfigStore"""
+
+    def test_reload_swaps_snapshot_and_bumps_version(self, config_path):
+        """Test that a changed file produces a new snapshot with a higher version"""
+        store = ConfigStore(str(config_path))
+        first = store.current()
+
+        write_config(config_path, 2000, level="DEBUG")
+        assert store.reload() is True
+        second = store.current()
+
+        assert second.version == first.version + 1
+        assert second.response_timeout == 2000
+        assert second.logging_level == "DEBUG"
+        # The old snapshot is untouched
+        assert first.response_timeout == 1000
+
+    def test_reload_without_changes_keeps_snapshot(self, config_path):
+        """Test that an unchanged file does not produce a new snapshot"""
+        store = ConfigStore(str(config_path))
+        first = store.current()
+
+        assert store.reload() is False
+        assert store.current() is first
+
+    def test_invalid_file_keeps_last_good_snapshot(self, config_path):
+        """Test that a broken edit does not replace a working configuration"""
+        store = ConfigStore(str(config_path))
+        first = store.current()
+
+        config_path.write_text("browser: [unclosed\n")
+        stat = os.stat(config_path)
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert store.reload() is False
+        assert store.current() is first
+
+    def test_listeners_receive_new_snapshots(self, config_path):
+        """Test that subscribers are notified of reloads"""
+        store = ConfigStore(str(config_path))
+        store.current()
+        received = []
+        store.subscribe(received.append)
+
+        write_config(config_path, 3000)
+        store.reload()
+
+        assert [snapshot.response_timeout for snapshot in received] == [3000]
+
+    @pytest.mark.asyncio
+    async def test_watcher_picks_up_changes(self, config_path):
+        """Test that the background watcher reloads a changed file"""
+        store = ConfigStore(str(config_path))
+        assert store.current().response_timeout == 1000
+
+        store.start_watching(interval=0.01)
+        try:
+            write_config(config_path, 4000)
+            for _ in range(100):
+                if store.current().response_timeout == 4000:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await store.stop_watching()
+
+        assert store.current().response_timeout == 4000
+
+    @pytest.mark.asyncio
+    async def test_watcher_notifies_listeners_on_the_event_loop(self, config_path):
+        """Test that listeners run on the loop thread, not on the executor that reads the file"""
+        store = ConfigStore(str(config_path))
+        store.current()
+        threads = []
+        store.subscribe(lambda snapshot: threads.append(threading.get_ident()))
+
+        store.start_watching(interval=0.01)
+        try:
+            write_config(config_path, 5000)
+            for _ in range(100):
+                if threads:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await store.stop_watching()
+
+        assert threads == [threading.get_ident()]
+
+    def test_handler_keeps_its_snapshot(self):
+        """Test that a handler created before a reload keeps its settings"""
+        handler = DeepSeekHandler(AsyncMock())
+        snapshot = handler.config
+
+        assert isinstance(snapshot, ConfigSnapshot)
+        assert handler.service is snapshot.services.get("deepseek")
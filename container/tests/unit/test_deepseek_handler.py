@@ -2,6 +2,7 @@
 Unit tests for DeepSeek AI handler
 """
 import pytest
+from dataclasses import replace
 from unittest.mock import AsyncMock, patch
 from mcp_server.handlers.deepseek_handler import DeepSeekHandler
 from mcp_server.ai_handler_base import AIHandler
@@ -53,7 +54,8 @@ class TestDeepSeekHandler:
         
         # Mock the service URL
         if handler.service:
-            handler.service.url = "https://chat.deepseek.com"
+            # Services are shared through the registry and immutable
+            handler.service = replace(handler.service, url="https://chat.deepseek.com")
         else:
             # Fallback if service is not loaded
             with patch.object(handler, 'service', None):
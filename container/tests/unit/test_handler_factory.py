@@ -1,10 +1,15 @@
 """
 Unit tests for handler factory
 """
+import gc
+import weakref
 import pytest
-from mcp_server.handler_factory import create_ai_handler
+from mcp_server import handler_factory
+from mcp_server.handler_factory import BUILTIN_HANDLERS, HandlerRegistry, create_ai_handler
 from mcp_server.ai_handler_base import AIHandler
-from unittest.mock import AsyncMock
+from mcp_server.config_store import ConfigSnapshot
+from mcp_server.handlers.pi_handler import PiHandler
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 class TestHandlerFactory:
@@ -46,4 +51,78 @@ class TestHandlerFactory:
         assert handler2 is not None, "Handler for mixed case DeepSeek should not be None"
         assert handler3 is not None, "Handler for lowercase deepseek should not be None"
         assert isinstance(handler1, type(handler2)), "Handlers should be of the same type"
-        assert isinstance(handler2, type(handler3)), "Handlers should be of the same type"
\ No newline at end of file
+        assert isinstance(handler2, type(handler3)), "Handlers should be of the same type"
+
+
+class PluginHandler(AIHandler):
+    """Handler shipped by a plugin"""
+    service_id = "plugin-ai"
+
+
+class TestHandlerRegistry:
+    """Test cases for the lazy handler registry"""
+
+    def test_handler_modules_imported_on_first_use(self):
+        """Test that a handler module is only imported when its service is used"""
+        registry = HandlerRegistry(BUILTIN_HANDLERS, discover_plugins=False)
+        with patch.object(handler_factory.importlib, "import_module",
+                          wraps=handler_factory.importlib.import_module) as import_module:
+            assert registry.service_ids() == sorted(BUILTIN_HANDLERS)
+            import_module.assert_not_called()
+
+            assert registry.handler_class("pi") is PiHandler
+            assert registry.handler_class("PI") is PiHandler
+            import_module.assert_called_once_with("mcp_server.handlers.pi_handler")
+
+    def test_handlers_cached_per_service_and_page(self):
+        """Test that a page keeps its handler until the configuration is reloaded"""
+        registry = HandlerRegistry(BUILTIN_HANDLERS, discover_plugins=False)
+        page, other_page = AsyncMock(), AsyncMock()
+
+        handler = registry.create("pi", page)
+        assert registry.create("pi", page) is handler
+        assert registry.create("pi", other_page) is not handler
+        assert registry.create("deepseek", page) is not handler
+
+        reloaded = ConfigSnapshot.from_dict({}, version=handler.config.version + 1)
+        with patch("mcp_server.handler_factory.current_config", return_value=reloaded), \
+                patch("mcp_server.ai_handler_base.current_config", return_value=reloaded):
+            assert registry.create("pi", page) is not handler
+
+    def test_handlers_go_away_with_their_pages(self):
+        """Test that the cache does not keep dropped pages and their handlers alive"""
+        registry = HandlerRegistry(BUILTIN_HANDLERS, discover_plugins=False)
+        pages = [MagicMock() for _ in range(50)]
+        handlers = [weakref.ref(registry.create("pi", page)) for page in pages]
+
+        del pages
+        gc.collect()
+
+        assert all(handler() is None for handler in handlers)
+
+    def test_clear_forgets_cached_handlers(self):
+        """Test that clear() makes pages get new handlers"""
+        registry = HandlerRegistry(BUILTIN_HANDLERS, discover_plugins=False)
+        page = MagicMock()
+        handler = registry.create("pi", page)
+
+        registry.clear()
+
+        assert registry.create("pi", page) is not handler
+
+    def test_plugins_from_entry_points(self):
+        """Test that entry point plugins add services and replace built-ins"""
+        plugin = MagicMock()
+        plugin.name = "pi"
+        plugin.value = "plugin_package:PluginHandler"
+        plugin.load.return_value = PluginHandler
+        registry = HandlerRegistry(BUILTIN_HANDLERS)
+        with patch.object(handler_factory, "_entry_points", return_value=[plugin]):
+            assert registry.handler_class("pi") is PluginHandler
+
+    def test_invalid_handler_target(self):
+        """Test that a target that is not an AIHandler is ignored"""
+        registry = HandlerRegistry({"broken-ai": "mcp_server.handler_factory:HandlerRegistry"},
+                                   discover_plugins=False)
+        assert registry.handler_class("broken-ai") is None
+        assert registry.create("broken-ai", AsyncMock()) is None
@@ -0,0 +1,148 @@
+"""
+Unit tests for declarative handler specs
+"""
+import pytest
+from unittest.mock import AsyncMock, patch
+from mcp_server.ai_handler_base import AIHandler
+from mcp_server.config_store import ConfigSnapshot
+from mcp_server.handler_factory import create_ai_handler
+from mcp_server.handler_spec import SpecError, available_specs, load_spec, parse_spec
+from mcp_server.handlers.chatgpt_handler import ChatgptHandler
+from mcp_server.handlers.deepseek_handler import DeepSeekHandler
+
+
+def snapshot_with_service(service_id, handler=None):
+    service = {"id": service_id, "name": "My AI", "url": "https://my-ai.example.com", "category": "international"}
+    if handler is not None:
+        service["handler"] = handler
+    return ConfigSnapshot.from_dict({"ai_services": [service]})
+
+
+class TestParseSpec:
+    """Test cases for parse_spec"""
+
+    def test_sections_map_to_handler_attributes(self):
+        """Test that every spec section sets the matching AIHandler attribute"""
+        attributes = parse_spec({
+            "display_name": "My AI",
+            "input": {"selectors": ["textarea"]},
+            "submit": {"buttons": ["button.send"], "press_enter": True},
+            "answer": {"selectors": [".answer"], "join_nodes": True},
+            "completion": {"stop_selectors": [".stop"], "stable_ms": 800, "start_timeout_ms": 5000},
+            "network": {"pattern": "/api/chat", "format": "openai"},
+            "waits": {"stream_poll_ms": 100, "ready_check_ms": 250}
+        })
+
+        assert attributes == {
+            "display_name": "My AI",
+            "input_selectors": ["textarea"],
+            "button_selectors": ["button.send"],
+            "submit_with_enter": True,
+            "answer_selectors": [".answer"],
+            "join_answer_nodes": True,
+            "stop_selectors": [".stop"],
+            "answer_stable_ms": 800,
+            "answer_start_timeout_ms": 5000,
+            "network_pattern": "/api/chat",
+            "network_format": "openai",
+            "stream_poll_ms": 100,
+            "ready_check_ms": 250
+        }
+        for attribute in attributes:
+            assert hasattr(AIHandler, attribute)
+
+    @pytest.mark.parametrize("spec", [
+        {"inputs": {"selectors": ["textarea"]}},
+        {"input": {"selector": "textarea"}},
+        {"input": {"selectors": "textarea"}},
+        {"completion": {"stable_ms": "fast"}},
+        {"completion": {"stable_ms": True}},
+        {"submit": ["button"]},
+        ["textarea"]
+    ])
+    def test_invalid_specs(self, spec):
+        """Test that unknown keys and wrong types are rejected"""
+        with pytest.raises(SpecError):
+            parse_spec(spec)
+
+
+class TestBundledSpecs:
+    """Test cases for the specs shipped in handler_specs/"""
+
+    def test_every_bundled_spec_parses(self):
+        """Test that the bundled specs are valid and describe a usable site"""
+        assert len(available_specs()) == 18
+        for service_id in available_specs():
+            spec = load_spec(service_id)
+            assert spec["input_selectors"], service_id
+            assert spec["answer_selectors"], service_id
+            assert spec["default_url"].startswith("https://"), service_id
+
+    def test_subclass_binds_spec(self):
+        """Test that spec= sets the service id and the spec's attributes on the class"""
+        assert DeepSeekHandler.service_id == "deepseek"
+        assert DeepSeekHandler.submit_with_enter is True
+        assert DeepSeekHandler.input_selectors == load_spec("deepseek")["input_selectors"]
+        assert ChatgptHandler.join_answer_nodes is True
+        assert ChatgptHandler.network_format == "chatgpt"
+        # The base class keeps its defaults
+        assert AIHandler.input_selectors == []
+        assert AIHandler.submit_with_enter is False
+
+    def test_load_spec_returns_copies(self):
+        """Test that callers cannot modify the cached spec"""
+        load_spec("deepseek")["input_selectors"].append("#mutated")
+        assert "#mutated" not in load_spec("deepseek")["input_selectors"]
+
+
+class TestConfigOverrides:
+    """Test cases for handler sections in config.yaml"""
+
+    def test_service_handler_section_overrides_spec(self):
+        """Test that config.yaml tunes one handler instance without touching the class"""
+        snapshot = snapshot_with_service("deepseek", {
+            "answer": {"selectors": [".tuned"]},
+            "completion": {"stable_ms": 700}
+        })
+        with patch("mcp_server.ai_handler_base.current_config", return_value=snapshot):
+            handler = DeepSeekHandler(AsyncMock())
+
+        assert handler.answer_selectors == [".tuned"]
+        assert handler.answer_stable_ms == 700
+        assert handler.input_selectors == DeepSeekHandler.input_selectors
+        assert DeepSeekHandler.answer_selectors != [".tuned"]
+
+    def test_invalid_handler_section_is_ignored(self):
+        """Test that a malformed handler section keeps the bundled spec"""
+        snapshot = snapshot_with_service("deepseek", {"answer": {"selectors": 5}})
+        with patch("mcp_server.ai_handler_base.current_config", return_value=snapshot):
+            handler = DeepSeekHandler(AsyncMock())
+
+        assert handler.answer_selectors == DeepSeekHandler.answer_selectors
+
+
+class TestSpecHandlers:
+    """Test cases for services described only by a spec"""
+
+    def test_service_defined_in_config_only(self):
+        """Test that a service with a handler section needs no handler module"""
+        snapshot = snapshot_with_service("my-ai", {
+            "input": {"selectors": ["textarea.prompt"]},
+            "answer": {"selectors": [".reply"]}
+        })
+        with patch("mcp_server.handler_factory.current_config", return_value=snapshot), \
+                patch("mcp_server.ai_handler_base.current_config", return_value=snapshot):
+            handler = create_ai_handler("my-ai", AsyncMock())
+
+        assert isinstance(handler, AIHandler)
+        assert handler.service_id == "my-ai"
+        assert handler.display_name == "My AI"
+        assert handler.service_url == "https://my-ai.example.com"
+        assert handler.input_selectors == ["textarea.prompt"]
+        assert handler.answer_selectors == [".reply"]
+
+    def test_service_without_spec(self):
+        """Test that a configured service without any spec has no handler"""
+        snapshot = snapshot_with_service("bare-ai")
+        with patch("mcp_server.handler_factory.current_config", return_value=snapshot):
+            assert create_ai_handler("bare-ai", AsyncMock()) is None
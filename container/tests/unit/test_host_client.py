@@ -0,0 +1,148 @@
+"""
+Unit tests for the host Chrome service protocol and client
+"""
+import asyncio
+import struct
+import pytest
+from mcp_server.host_client import HostChromeClient, HostServiceError
+from mcp_server.host_protocol import (
+    MAX_MESSAGE_SIZE, ProtocolError, decode_body, encode_message, read_message, write_message
+)
+
+
+class FakeHostService:
+    """Framed server that answers status immediately and start after a delay"""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = 0
+        self.server = None
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request = await read_message(reader)
+                self.requests.append(request)
+                asyncio.create_task(self.respond(request, writer))
+        except asyncio.IncompleteReadError:
+            pass
+
+    async def respond(self, request, writer):
+        command = request['command']
+        if command == 'start':
+            await asyncio.sleep(0.05)
+            response = {'id': request['id'], 'ok': True, 'result': {'port': request.get('port'), 'message': 'Chrome started'}}
+        elif command == 'status':
+            response = {'id': request['id'], 'ok': True, 'result': {'ready': True}}
+        elif command == 'drop':
+            writer.close()
+            return
+        else:
+            response = {'id': request['id'], 'ok': False, 'error': f"Unknown command: {command}"}
+        await write_message(writer, response)
+
+
+class TestHostProtocol:
+    """Test cases for the length-prefixed JSON framing"""
+
+    def test_encode_message_prefixes_length(self):
+        """Test that a message is its big-endian body length followed by UTF-8 JSON"""
+        data = encode_message({'id': 1, 'command': 'status'})
+        (length,) = struct.unpack('>I', data[:4])
+        assert length == len(data) - 4
+        assert decode_body(data[4:]) == {'id': 1, 'command': 'status'}
+
+    def test_decode_body_rejects_non_objects(self):
+        """Test that invalid JSON and non-object messages are protocol errors"""
+        with pytest.raises(ProtocolError):
+            decode_body(b'{not json')
+        with pytest.raises(ProtocolError):
+            decode_body(b'[1, 2]')
+
+    @pytest.mark.asyncio
+    async def test_read_message_round_trip(self):
+        """Test that consecutive messages are read back one at a time"""
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_message({'id': 1}) + encode_message({'id': 2, 'text': '你好'}))
+        reader.feed_eof()
+
+        assert await read_message(reader) == {'id': 1}
+        assert await read_message(reader) == {'id': 2, 'text': '你好'}
+        with pytest.raises(asyncio.IncompleteReadError):
+            await read_message(reader)
+
+    @pytest.mark.asyncio
+    async def test_read_message_rejects_oversized(self):
+        """Test that a length above the limit is refused before reading the body"""
+        reader = asyncio.StreamReader()
+        reader.feed_data(struct.pack('>I', MAX_MESSAGE_SIZE + 1))
+
+        with pytest.raises(ProtocolError):
+            await read_message(reader)
+
+
+class TestHostChromeClient:
+    """Test cases for the host Chrome service client"""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_multiplexed_on_one_connection(self):
+        """Test that concurrent commands share a connection and get their own responses"""
+        async with FakeHostService() as service:
+            client = HostChromeClient(port=service.port)
+            try:
+                started, status = await asyncio.gather(client.start(port=9333), client.status())
+            finally:
+                await client.close()
+
+        assert started == {'port': 9333, 'message': 'Chrome started'}
+        assert status == {'ready': True}
+        assert service.connections == 1
+        assert [request['command'] for request in service.requests] == ['start', 'status']
+        assert len({request['id'] for request in service.requests}) == 2
+
+    @pytest.mark.asyncio
+    async def test_error_response_raises(self):
+        """Test that a rejected command raises HostServiceError with the service's message"""
+        async with FakeHostService() as service:
+            client = HostChromeClient(port=service.port)
+            try:
+                with pytest.raises(HostServiceError, match="Unknown command: reboot"):
+                    await client.request('reboot')
+                # The connection stays usable
+                assert await client.status() == {'ready': True}
+            finally:
+                await client.close()
+        assert service.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_connection_drops(self):
+        """Test that pending requests fail when the connection drops and the next one reconnects"""
+        async with FakeHostService() as service:
+            client = HostChromeClient(port=service.port)
+            try:
+                with pytest.raises(HostServiceError):
+                    await client.request('drop')
+                assert await client.status() == {'ready': True}
+            finally:
+                await client.close()
+        assert service.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_unreachable_service(self):
+        """Test that a refused connection raises HostServiceError"""
+        async with FakeHostService() as service:
+            port = service.port
+        client = HostChromeClient(port=port, connect_timeout=0.5)
+
+        with pytest.raises(HostServiceError, match="Could not connect"):
+            await client.status()
@@ -0,0 +1,195 @@
+"""
+Unit tests for network answer capture
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from mcp_server.config_store import ConfigSnapshot
+from mcp_server.handlers.deepseek_handler import DeepSeekHandler
+from mcp_server.network_capture import (
+    NetworkCapture, parse_chatgpt, parse_deepseek, parse_kimi, parse_openai, parse_sse
+)
+
+
+def sse(*events):
+    return "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+
+
+class FakePage:
+    """Page that delivers responses to its "response" listeners"""
+
+    def __init__(self, responses=()):
+        self.listeners = []
+        self.responses = list(responses)
+        self.url = "https://chat.deepseek.com/"
+
+    def on(self, event, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, event, listener):
+        self.listeners.remove(listener)
+
+    def respond(self):
+        for response in self.responses:
+            for listener in list(self.listeners):
+                listener(response)
+
+
+def response(url, body, method="POST"):
+    mock_response = MagicMock()
+    mock_response.url = url
+    mock_response.request.method = method
+    mock_response.text = AsyncMock(return_value=body)
+    return mock_response
+
+
+class TestStreamParsers:
+    """Test cases for the completion stream parsers"""
+
+    def test_parse_sse(self):
+        """Test that data payloads are decoded and non-JSON payloads skipped"""
+        body = "event: message\ndata: {\"a\": 1}\n\ndata: {\"b\":\ndata: 2}\n\ndata: [DONE]\n\n"
+        assert parse_sse(body) == [{"a": 1}, {"b": 2}]
+        assert parse_sse('{"plain": true}') == [{"plain": True}]
+
+    def test_parse_openai(self):
+        """Test that OpenAI-style deltas are concatenated"""
+        events = parse_sse(sse(
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Hel"}}]},
+            {"choices": [{"delta": {"content": "lo"}}]}
+        ))
+        assert parse_openai(events) == "Hello"
+
+    def test_parse_chatgpt_patches(self):
+        """Test that ChatGPT's JSON-patch deltas are applied to the message text"""
+        events = [
+            {"v": {"message": {"author": {"role": "user"}, "content": {"parts": ["Question"]}}}},
+            {"p": "/message/content/parts/0", "o": "append", "v": "Hel"},
+            {"v": "lo"},
+            {"p": "", "o": "patch", "v": [
+                {"p": "/message/content/parts/0", "o": "append", "v": "!"},
+                {"p": "/message/status", "o": "replace", "v": "finished_successfully"}
+            ]}
+        ]
+        assert parse_chatgpt(events) == "Hello!"
+
+    def test_parse_chatgpt_full_messages(self):
+        """Test that cumulative assistant messages keep the latest text"""
+        events = [
+            {"message": {"author": {"role": "assistant"}, "content": {"parts": ["Hel"]}}},
+            {"message": {"author": {"role": "assistant"}, "content": {"parts": ["Hello"]}}}
+        ]
+        assert parse_chatgpt(events) == "Hello"
+
+    def test_parse_deepseek_skips_thinking(self):
+        """Test that DeepSeek reasoning content is left out of the answer"""
+        events = [
+            {"v": {"response": {"fragments": [{"type": "THINK", "content": "Hmm"}]}}},
+            {"p": "response/fragments/-1/content", "o": "APPEND", "v": " let me think"},
+            {"p": "response/fragments", "o": "APPEND", "v": [{"type": "RESPONSE", "content": "An"}]},
+            {"p": "response/fragments/-1/content", "v": "swer"},
+            {"v": "!"},
+            {"p": "response/status", "v": "FINISHED"}
+        ]
+        assert parse_deepseek(events) == "Answer!"
+
+    def test_parse_deepseek_chunks(self):
+        """Test the older chunk format with separate thinking deltas"""
+        events = [
+            {"choices": [{"delta": {"type": "thinking", "content": "Hmm"}}]},
+            {"choices": [{"delta": {"type": "text", "content": "Answer"}}]}
+        ]
+        assert parse_deepseek(events) == "Answer"
+
+    def test_parse_kimi(self):
+        """Test that Kimi cmpl events are concatenated"""
+        events = [{"event": "req"}, {"event": "cmpl", "text": "Hi"}, {"event": "cmpl", "text": " there"},
+                  {"event": "all_done"}]
+        assert parse_kimi(events) == "Hi there"
+
+
+class TestNetworkCapture:
+    """Test cases for NetworkCapture"""
+
+    @pytest.mark.asyncio
+    async def test_captures_matching_response(self):
+        """Test that only the matching POST response is parsed"""
+        page = FakePage([
+            response("https://chat.deepseek.com/api/v0/chat/completion", "", method="GET"),
+            response("https://chat.deepseek.com/api/v0/other", "x"),
+            response("https://chat.deepseek.com/api/v0/chat/completion",
+                     sse({"choices": [{"delta": {"content": " Answer "}}]}))
+        ])
+
+        async with NetworkCapture(page, r"/api/v0/chat/completion", "deepseek") as capture:
+            page.respond()
+            result = await capture.wait(1000, 1000)
+
+        assert result.text == "Answer"
+        assert result.completed is True
+        assert page.listeners == []
+
+    @pytest.mark.asyncio
+    async def test_no_response_times_out(self):
+        """Test that a capture without a matching response gives up after the start timeout"""
+        page = FakePage()
+
+        async with NetworkCapture(page, r"/completion", "openai") as capture:
+            result = await capture.wait(10, 1000)
+
+        assert result.text is None
+        assert result.completed is False
+
+    def test_unknown_format(self):
+        """Test that an unknown stream format is rejected"""
+        with pytest.raises(ValueError):
+            NetworkCapture(FakePage(), r"/completion", "nope")
+
+
+class TestHandlerNetworkCapture:
+    """Test cases for ask_question in network capture mode"""
+
+    @staticmethod
+    def handler(page):
+        handler = DeepSeekHandler(page)
+        handler.config = ConfigSnapshot.from_dict({"browser": {"network_capture": True}})
+        handler.submit_question = AsyncMock(side_effect=lambda question: page.respond())
+        handler.wait_for_answer_complete = AsyncMock(return_value="complete")
+        handler.extract_answer = AsyncMock(return_value="From the page")
+        return handler
+
+    @pytest.mark.asyncio
+    async def test_answer_from_network(self):
+        """Test that a captured answer skips completion detection and extraction"""
+        page = FakePage([response("https://chat.deepseek.com/api/v0/chat/completion",
+                                  sse({"choices": [{"delta": {"content": "From the network"}}]}))])
+        handler = self.handler(page)
+
+        assert await handler.ask_question("Question") == "From the network"
+        handler.wait_for_answer_complete.assert_not_called()
+        handler.extract_answer.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unparsed_stream_reads_page_without_waiting(self):
+        """Test that a finished but unparsed stream still marks the answer complete"""
+        page = FakePage([response("https://chat.deepseek.com/api/v0/chat/completion", "garbage")])
+        handler = self.handler(page)
+
+        assert await handler.ask_question("Question") == "From the page"
+        handler.wait_for_answer_complete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_page(self):
+        """Test that the page is watched when no completion response shows up"""
+        handler = self.handler(FakePage())
+        handler.answer_start_timeout_ms = 10
+
+        assert await handler.ask_question("Question") == "From the page"
+        handler.wait_for_answer_complete.assert_awaited_once()
+
+    def test_disabled_by_default(self):
+        """Test that network capture is opt-in"""
+        handler = DeepSeekHandler(FakePage())
+        handler.config = ConfigSnapshot.from_dict({})
+        assert handler.captures_network is False
@@ -0,0 +1,136 @@
+"""
+Unit tests for PagePool class
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from mcp_server.page_pool import PagePool
+
+
+def make_page():
+    """Create a mock page that reports itself as open"""
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.close = AsyncMock()
+    return page
+
+
+@pytest.fixture
+def mock_context():
+    """Mock browser context that opens a new mock page on demand"""
+    context = MagicMock()
+    context.new_page = AsyncMock(side_effect=lambda: make_page())
+    return context
+
+
+class TestPagePool:
+    """Test cases for PagePool class"""
+
+    @pytest.mark.asyncio
+    async def test_lease_reuses_tab_per_service(self, mock_context):
+        """Test that each service keeps its own warm tab"""
+        pool = PagePool(mock_context, max_pages=4)
+
+        async with pool.lease("deepseek") as first:
+            pass
+        async with pool.lease("deepseek") as second:
+            pass
+        async with pool.lease("qwen") as other:
+            pass
+
+        assert first is second
+        assert other is not first
+        assert mock_context.new_page.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_spare_page_is_adopted_first(self, mock_context):
+        """Test that an existing tab is used before opening new ones"""
+        existing = make_page()
+        pool = PagePool(mock_context, max_pages=4, spare_pages=[existing])
+
+        async with pool.lease("deepseek") as page:
+            assert page is existing
+
+        mock_context.new_page.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_lru_idle_tab_is_evicted(self, mock_context):
+        """Test that the least recently used idle tab is closed when the pool is full"""
+        pool = PagePool(mock_context, max_pages=2)
+
+        async with pool.lease("deepseek") as deepseek_page:
+            pass
+        async with pool.lease("qwen"):
+            pass
+        async with pool.lease("kimi"):
+            pass
+
+        deepseek_page.close.assert_called_once()
+        assert pool.stats()["pages"] == ["qwen", "kimi"]
+
+    @pytest.mark.asyncio
+    async def test_different_services_run_in_parallel(self, mock_context):
+        """Test that leases for different services do not block each other"""
+        pool = PagePool(mock_context, max_pages=4)
+        both_leased = asyncio.Event()
+        active = []
+
+        async def use(service_id):
+            async with pool.lease(service_id):
+                active.append(service_id)
+                if len(active) == 2:
+                    both_leased.set()
+                await asyncio.wait_for(both_leased.wait(), timeout=1)
+
+        await asyncio.gather(use("deepseek"), use("qwen"))
+
+        assert sorted(active) == ["deepseek", "qwen"]
+
+    @pytest.mark.asyncio
+    async def test_full_pool_waits_for_release(self, mock_context):
+        """Test that a lease waits when every tab is in use"""
+        pool = PagePool(mock_context, max_pages=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with pool.lease("deepseek"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(pool._acquire("qwen"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        release.set()
+        await holder
+        await asyncio.wait_for(waiter, timeout=1)
+        assert pool.stats()["pages"] == ["qwen"]
+
+    @pytest.mark.asyncio
+    async def test_close_only_closes_owned_tabs(self, mock_context):
+        """Test that tabs the pool did not open are left alone"""
+        existing = make_page()
+        pool = PagePool(mock_context, max_pages=4, spare_pages=[existing])
+
+        async with pool.lease("deepseek"):
+            pass
+        async with pool.lease("qwen") as owned:
+            pass
+        await pool.close()
+
+        existing.close.assert_not_called()
+        owned.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_load_counts_open_and_leased_tabs(self, mock_context):
+        """Test that load grows with open tabs and again while they are leased"""
+        pool = PagePool(mock_context, max_pages=4)
+        assert pool.load == 0
+
+        async with pool.lease("deepseek"):
+            assert pool.load == 0.5
+            assert pool.has_service("deepseek")
+        assert pool.load == 0.25
+        assert pool.has_service("deepseek")
+        assert not pool.has_service("qwen")
@@ -0,0 +1,194 @@
+"""
+Unit tests for the resource blocking layer
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from mcp_server.config_store import ConfigSnapshot
+from mcp_server.resource_blocking import (
+    BlockingRules, ESTIMATED_BYTES, ResourceBlocking, TRACKER_HOSTS, URLBlocker
+)
+
+
+def make_snapshot(settings, service_settings=None):
+    service = {"id": "deepseek", "name": "DeepSeek", "url": "https://chat.deepseek.com",
+               "category": "domestic", "enabled": True}
+    if service_settings is not None:
+        service["resource_blocking"] = service_settings
+    return ConfigSnapshot.from_dict({"browser": {"resource_blocking": settings}, "ai_services": [service]})
+
+
+def make_page(url="https://chat.deepseek.com/"):
+    """Tab whose CDP session records what it is sent"""
+    page = MagicMock()
+    page.url = url
+    page.is_closed.return_value = False
+    session = MagicMock()
+    session.send = AsyncMock()
+    session.detach = AsyncMock()
+    page.context.new_cdp_session = AsyncMock(return_value=session)
+    return page, session
+
+
+def blocked_urls(session):
+    """URL patterns of the last Network.setBlockedURLs call"""
+    calls = [call for call in session.send.await_args_list if call.args[0] == "Network.setBlockedURLs"]
+    return calls[-1].args[1]["urls"] if calls else None
+
+
+def main_frame(url):
+    frame = MagicMock()
+    frame.url = url
+    frame.parent_frame = None
+    return frame
+
+
+class TestBlockingRules:
+    """Test cases for BlockingRules"""
+
+    def test_url_patterns(self):
+        """Test that trackers, blocked hosts and resource types become wildcard patterns"""
+        rules = BlockingRules(enabled=True, resource_types=frozenset({"font"}), block_hosts=("ads.example.org",))
+        patterns = rules.url_patterns()
+
+        assert "*://ads.example.org/*" in patterns
+        assert "*://*.ads.example.org/*" in patterns
+        assert f"*://*.{TRACKER_HOSTS[0]}/*" in patterns
+        assert "*.woff2" in patterns and "*.woff2?*" in patterns
+        # Scripts and styles are never blocked, so they stay cacheable
+        assert not any(pattern.endswith((".js", ".css")) for pattern in patterns)
+        assert "*.png" not in patterns
+
+    def test_disabled_rules_block_nothing(self):
+        """Test that rules are off unless enabled"""
+        assert BlockingRules.from_config({}).url_patterns() == []
+        assert BlockingRules(enabled=True, trackers=False, resource_types=frozenset()).url_patterns() == []
+
+    def test_sign_in_pages_are_exempt(self):
+        """Test that sign-in providers and login pages load completely"""
+        rules = BlockingRules(enabled=True)
+
+        assert rules.exempt("https://accounts.google.com/v3/signin/identifier")
+        assert rules.exempt("https://chat.deepseek.com/sign_in")
+        assert not rules.exempt("https://chat.deepseek.com/a/chat/s/123")
+
+    def test_service_overrides(self):
+        """Test that a service's settings replace the global ones and extend the host lists"""
+        rules = BlockingRules.from_config(
+            {"enabled": True, "allow_hosts": ["sso.example.org"], "block_hosts": ["ads.example.org"]},
+            {"resource_types": ["media"], "block_hosts": ["beacon.example.net"]}
+        )
+
+        assert rules.resource_types == frozenset({"media"})
+        assert rules.block_hosts == ("ads.example.org", "beacon.example.net")
+        assert rules.exempt("https://sso.example.org/start")
+
+
+class TestURLBlocker:
+    """Test cases for URLBlocker"""
+
+    @pytest.mark.asyncio
+    async def test_install_sends_patterns(self):
+        """Test that the tab's patterns are handed to Chrome instead of routing requests"""
+        page, session = make_page()
+        rules = BlockingRules(enabled=True)
+        blocker = URLBlocker("deepseek", page, rules)
+
+        await blocker.install()
+
+        session.send.assert_any_await("Network.enable")
+        assert blocked_urls(session) == rules.url_patterns()
+        page.route.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_blocked_requests_are_counted_per_navigation(self):
+        """Test that requests Chrome blocked are counted with an estimate of the bytes saved"""
+        page, session = make_page()
+        blocker = URLBlocker("deepseek", page, BlockingRules(enabled=True))
+        await blocker.install()
+
+        blocker._navigated(main_frame("https://chat.deepseek.com/a/chat"))
+        blocker._loading_failed({"type": "Image", "blockedReason": "inspector"})
+        blocker._loading_failed({"type": "Script", "blockedReason": "inspector"})
+        blocker._loading_failed({"type": "Fetch", "errorText": "net::ERR_ABORTED"})
+
+        stats = blocker.stats.summary()
+        assert stats["blocked"] == 2
+        assert stats["by_type"] == {"image": 1, "script": 1}
+        assert stats["estimated_bytes_saved"] == ESTIMATED_BYTES["image"] + ESTIMATED_BYTES["script"]
+        assert stats["navigations"][-1]["url"] == "https://chat.deepseek.com/a/chat"
+        assert stats["navigations"][-1]["blocked"] == 2
+
+    @pytest.mark.asyncio
+    async def test_patterns_lifted_on_login_pages(self):
+        """Test that nothing is blocked while the tab shows a sign-in page"""
+        page, session = make_page()
+        rules = BlockingRules(enabled=True)
+        blocker = URLBlocker("deepseek", page, rules)
+        await blocker.install()
+
+        blocker._navigated(main_frame("https://chat.deepseek.com/sign_in"))
+        await blocker._pending
+        assert blocked_urls(session) == []
+
+        blocker._navigated(main_frame("https://chat.deepseek.com/"))
+        await blocker._pending
+        assert blocked_urls(session) == rules.url_patterns()
+
+
+class TestResourceBlocking:
+    """Test cases for ResourceBlocking"""
+
+    @pytest.mark.asyncio
+    async def test_attach_sets_up_each_tab_once(self):
+        """Test that a tab gets one CDP session, with its service's rules"""
+        blocking = ResourceBlocking()
+        page, session = make_page()
+
+        with patch('mcp_server.resource_blocking.current_config',
+                   return_value=make_snapshot({"enabled": True}, {"trackers": False})):
+            blocker = await blocking.attach("deepseek", page)
+            assert await blocking.attach("deepseek", page) is blocker
+
+        page.context.new_cdp_session.assert_awaited_once_with(page)
+        assert blocker.rules.trackers is False
+        assert "deepseek" in blocking.stats()
+
+        await blocking.detach(page)
+        session.detach.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_disabled_service_is_not_blocked(self):
+        """Test that a service with blocking disabled gets no CDP session"""
+        blocking = ResourceBlocking()
+        page, _ = make_page()
+
+        with patch('mcp_server.resource_blocking.current_config',
+                   return_value=make_snapshot({"enabled": True}, {"enabled": False})):
+            assert await blocking.attach("deepseek", page) is None
+
+        page.context.new_cdp_session.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_configure_updates_blocking_tabs(self):
+        """Test that reloaded rules are sent to tabs that are already blocking"""
+        blocking = ResourceBlocking()
+        page, session = make_page()
+
+        with patch('mcp_server.resource_blocking.current_config', return_value=make_snapshot({"enabled": True})):
+            blocker = await blocking.attach("deepseek", page)
+        blocking.configure(make_snapshot({"enabled": True, "resource_types": ["media"], "trackers": False}))
+        await blocker._pending
+
+        assert blocker.rules.resource_types == frozenset({"media"})
+        assert blocked_urls(session) == blocker.rules.url_patterns()
+        assert "*.png" not in blocked_urls(session)
+
+    @pytest.mark.asyncio
+    async def test_failed_session_loads_everything(self):
+        """Test that a tab whose CDP session cannot be opened is still usable"""
+        blocking = ResourceBlocking()
+        page, _ = make_page()
+        page.context.new_cdp_session.side_effect = Exception("Target page, context or browser has been closed")
+
+        with patch('mcp_server.resource_blocking.current_config', return_value=make_snapshot({"enabled": True})):
+            assert await blocking.attach("deepseek", page) is None
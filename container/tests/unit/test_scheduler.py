@@ -0,0 +1,164 @@
+"""
+Unit tests for RequestScheduler class
+"""
+import asyncio
+import pytest
+from mcp_server.scheduler import QueueFullError, RequestScheduler, SchedulerLimits
+
+
+async def settle():
+    """Let pending tasks run up to their next await"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestSchedulerLimits:
+    """Test cases for SchedulerLimits"""
+
+    def test_from_config(self):
+        """Test that performance.concurrency settings are read"""
+        limits = SchedulerLimits.from_config({"max_concurrent_requests": 5, "request_delay_ms": 250})
+
+        assert limits.max_concurrent == 5
+        assert limits.request_delay_ms == 250
+        assert limits.max_per_service == 1
+
+    def test_from_empty_config(self):
+        """Test defaults when nothing is configured"""
+        assert SchedulerLimits.from_config({}) == SchedulerLimits()
+
+
+class TestRequestScheduler:
+    """Test cases for RequestScheduler class"""
+
+    @pytest.mark.asyncio
+    async def test_global_limit(self):
+        """Test that no more than max_concurrent requests run at once"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=2, max_per_service=2))
+        release = asyncio.Event()
+        running = []
+
+        async def request(service_id):
+            async with scheduler.slot(service_id):
+                running.append(service_id)
+                await release.wait()
+
+        tasks = [asyncio.create_task(request(ai)) for ai in ("deepseek", "qwen", "kimi")]
+        await settle()
+        assert running == ["deepseek", "qwen"]
+        assert scheduler.stats()["queue_depth"] == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert running == ["deepseek", "qwen", "kimi"]
+        assert scheduler.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_per_service_limit_does_not_block_other_services(self):
+        """Test that a request for a busy service lets other services pass"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=3, max_per_service=1))
+        release = asyncio.Event()
+        running = []
+
+        async def request(service_id):
+            async with scheduler.slot(service_id):
+                running.append(service_id)
+                await release.wait()
+
+        tasks = [asyncio.create_task(request(ai)) for ai in ("deepseek", "deepseek", "qwen")]
+        await settle()
+        assert running == ["deepseek", "qwen"]
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert running == ["deepseek", "qwen", "deepseek"]
+
+    @pytest.mark.asyncio
+    async def test_priority_lanes(self):
+        """Test that higher lanes are served first and each lane is FIFO"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=1, max_per_service=1))
+        order = []
+
+        async def request(name, priority):
+            async with scheduler.slot("deepseek", priority):
+                order.append(name)
+
+        await scheduler.acquire("deepseek")
+        tasks = [
+            asyncio.create_task(request("low", "low")),
+            asyncio.create_task(request("normal-1", "normal")),
+            asyncio.create_task(request("high", "high")),
+            asyncio.create_task(request("normal-2", "normal")),
+        ]
+        await settle()
+        scheduler.release("deepseek")
+        await asyncio.gather(*tasks)
+
+        assert order == ["high", "normal-1", "normal-2", "low"]
+        lanes = scheduler.stats()["lanes"]
+        assert lanes["normal"]["granted"] == 3
+        assert lanes["low"]["max_wait_ms"] >= lanes["high"]["max_wait_ms"]
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        """Test that requests beyond max_queue_depth are rejected"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=1, max_queue_depth=1))
+        await scheduler.acquire("deepseek")
+        waiter = asyncio.create_task(scheduler.acquire("deepseek"))
+        await settle()
+
+        with pytest.raises(QueueFullError):
+            await scheduler.acquire("qwen")
+        assert scheduler.stats()["lanes"]["normal"]["rejected"] == 1
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test that cancelling a queued request does not leak a slot"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=1))
+        await scheduler.acquire("deepseek")
+        waiter = asyncio.create_task(scheduler.acquire("qwen"))
+        await settle()
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release("deepseek")
+
+        assert scheduler.stats()["active"] == 0
+        await asyncio.wait_for(scheduler.acquire("kimi"), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_configure_admits_waiting_requests(self):
+        """Test that raising the limit admits queued requests immediately"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=1, max_per_service=2))
+        await scheduler.acquire("deepseek")
+        waiter = asyncio.create_task(scheduler.acquire("qwen"))
+        await settle()
+        assert not waiter.done()
+
+        scheduler.configure(SchedulerLimits(max_concurrent=2, max_per_service=2))
+        await asyncio.wait_for(waiter, timeout=1)
+        assert scheduler.stats()["active"] == 2
+
+    @pytest.mark.asyncio
+    async def test_request_delay_spaces_out_starts(self):
+        """Test that request_delay_ms keeps a gap between request starts"""
+        scheduler = RequestScheduler(SchedulerLimits(max_concurrent=2, max_per_service=2, request_delay_ms=50))
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        await scheduler.acquire("deepseek")
+        await scheduler.acquire("deepseek")
+
+        assert loop.time() - started >= 0.045
+
+    @pytest.mark.asyncio
+    async def test_unknown_priority(self):
+        """Test that an unknown priority is rejected"""
+        scheduler = RequestScheduler()
+
+        with pytest.raises(ValueError):
+            await scheduler.acquire("deepseek", "urgent")
@@ -0,0 +1,91 @@
+"""
+Unit tests for SelectorMemo class
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock
+from mcp_server.config_store import ConfigSnapshot
+from mcp_server.handlers.qwen_handler import QwenHandler
+from mcp_server.selector_memo import SelectorMemo
+
+
+SELECTORS = ["#a", "#b", "#c"]
+
+
+class TestSelectorMemo:
+    """Test cases for SelectorMemo class"""
+
+    def test_winner_promoted_after_streak(self):
+        """Test that a selector moves to the front only after winning several lookups in a row"""
+        memo = SelectorMemo(promote_after=2)
+
+        memo.record("qwen", "input", SELECTORS, "#c")
+        assert memo.order("qwen", "input", SELECTORS) == SELECTORS
+
+        memo.record("qwen", "input", SELECTORS, "#c")
+        assert memo.order("qwen", "input", SELECTORS) == ["#c", "#a", "#b"]
+        assert memo.order("kimi", "input", SELECTORS) == SELECTORS
+
+    def test_first_try_rate(self):
+        """Test that stats report how often the first selector tried matched"""
+        memo = SelectorMemo(promote_after=1)
+
+        memo.record("qwen", "answer", SELECTORS, "#b")
+        ordered = memo.order("qwen", "answer", SELECTORS)
+        memo.record("qwen", "answer", ordered, "#b")
+        memo.record("qwen", "answer", ordered, None)
+
+        stats = memo.stats()["qwen"]["answer"]
+        assert stats["lookups"] == 3
+        assert stats["first_try"] == 1
+        assert stats["misses"] == 1
+        assert stats["first_try_rate"] == pytest.approx(0.333)
+        assert stats["hits"] == {"#b": 2}
+
+    def test_unknown_preferred_selector_ignored(self):
+        """Test that a learned selector the handler no longer declares is not used"""
+        memo = SelectorMemo(promote_after=1)
+        memo.record("qwen", "input", ["#old"], "#old")
+
+        assert memo.order("qwen", "input", SELECTORS) == SELECTORS
+
+    def test_persisted_across_restarts(self, tmp_path):
+        """Test that the learned order is saved and loaded again"""
+        path = str(tmp_path / "memo.json")
+        memo = SelectorMemo(path=path, promote_after=1)
+        memo.record("qwen", "input", SELECTORS, "#b")
+        memo.save()
+
+        assert json.loads(open(path).read())["qwen"]["input"]["preferred"] == "#b"
+        assert SelectorMemo(path=path).order("qwen", "input", SELECTORS) == ["#b", "#a", "#c"]
+
+    def test_configure_resolves_relative_path(self, tmp_path):
+        """Test that a relative memo path is resolved against config.yaml"""
+        memo = SelectorMemo()
+        snapshot = ConfigSnapshot.from_dict(
+            {"performance": {"selector_memo": {"path": "data/memo.json", "promote_after": 5}}},
+            path=str(tmp_path / "config.yaml")
+        )
+
+        memo.configure(snapshot)
+
+        assert memo.path == str(tmp_path / "data" / "memo.json")
+        assert memo.promote_after == 5
+
+    @pytest.mark.asyncio
+    async def test_handler_tries_learned_selector_first(self, selector_memo):
+        """Test that handlers send the learned order to the page and record the winner"""
+        selector_memo.promote_after = 1
+        mock_page = AsyncMock()
+        handler = QwenHandler(mock_page)
+        last = handler.input_selectors[-1]
+        mock_page.evaluate.return_value = {"index": len(handler.input_selectors) - 1, "unsupported": []}
+        mock_page.query_selector_all.return_value = [AsyncMock()]
+
+        await handler.find_elements(handler.input_selectors, all_nodes=True, cascade="input")
+        mock_page.evaluate.return_value = {"index": 0, "unsupported": []}
+        await handler.find_elements(handler.input_selectors, all_nodes=True, cascade="input")
+
+        sent = mock_page.evaluate.call_args.args[1]["selectors"]
+        assert sent[0] == last
+        assert selector_memo.stats()["qwen"]["input"]["first_try"] == 1
@@ -0,0 +1,103 @@
+"""
+Unit tests for the cached service registry
+"""
+import dataclasses
+import os
+import pytest
+from unittest.mock import patch
+
+from mcp_server import config_store, utils
+from mcp_server.service_registry import ServiceRegistry
+
+
+CONFIG_TEMPLATE = """
+ai_services:
+  - id: "qwen"
+    name: "Qwen"
+    url: "{qwen_url}"
+    category: "domestic"
+    enabled: true
+    sequence: 1
+  - id: "deepseek"
+    name: "DeepSeek"
+    url: "https://chat.deepseek.com"
+    category: "domestic"
+    enabled: true
+    sequence: 0
+  - id: "disabled"
+    name: "Disabled"
+    url: "https://example.com"
+    category: "international"
+    enabled: false
+    sequence: 2
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    """Point the configuration loader at a temporary config file"""
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG_TEMPLATE.format(qwen_url="https://tongyi.aliyun.com"))
+    with patch.object(config_store, 'CONFIG_PATH', str(path)):
+        utils.invalidate_config_cache()
+        yield path
+    utils.invalidate_config_cache()
+
+
+class TestServiceRegistry:
+    """Test cases for the service registry"""
+
+    def test_services_ordered_by_sequence(self, config_file):
+        """Test that services are ordered by sequence and disabled ones are skipped"""
+        registry = utils.get_service_registry()
+
+        assert [service.id for service in registry] == ["deepseek", "qwen"]
+        assert "disabled" not in registry
+        assert registry.get("qwen").url == "https://tongyi.aliyun.com"
+
+    def test_registry_is_immutable(self, config_file):
+        """Test that neither the registry nor its services can be modified"""
+        registry = utils.get_service_registry()
+
+        with pytest.raises(TypeError):
+            registry.by_id["new"] = registry.get("qwen")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            registry.get("qwen").url = "https://example.com"
+        with pytest.raises(TypeError):
+            utils.load_config()["ai_services"][0]["url"] = "https://example.com"
+
+    def test_lookups_do_not_reparse(self, config_file):
+        """Test that repeated lookups reuse the parsed configuration"""
+        utils.get_service_registry()
+
+        with patch('mcp_server.config_store.yaml.safe_load') as mock_load:
+            for _ in range(10):
+                assert utils.get_ai_service_by_id("deepseek") is not None
+            utils.load_ai_services()
+            utils.load_ai_urls()
+
+        mock_load.assert_not_called()
+
+    def test_registry_reloaded_when_file_changes(self, config_file):
+        """Test that a modified config file is picked up"""
+        first = utils.get_service_registry()
+
+        config_file.write_text(CONFIG_TEMPLATE.format(qwen_url="https://qianwen.aliyun.com"))
+        stat = os.stat(config_file)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        with patch.object(config_store, 'CONFIG_CHECK_INTERVAL', 0):
+            second = utils.get_service_registry()
+
+        assert second is not first
+        assert second.get("qwen").url == "https://qianwen.aliyun.com"
+
+    def test_invalid_entries_are_skipped(self):
+        """Test that an entry missing required fields does not break the registry"""
+        registry = ServiceRegistry.from_config({
+            "ai_services": [
+                {"id": "broken"},
+                {"id": "deepseek", "name": "DeepSeek", "url": "https://chat.deepseek.com", "category": "domestic"}
+            ]
+        })
+
+        assert [service.id for service in registry] == ["deepseek"]
@@ -0,0 +1,130 @@
+"""
+Unit tests for SingleFlight class
+"""
+import asyncio
+import pytest
+from mcp_server.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight class"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_result(self):
+        """Test that callers with the same key run the work once"""
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flights.call("key", work) for _ in range(3)))
+
+        assert results == ["answer"] * 3
+        assert len(calls) == 1
+        assert flights.stats() == {"in_flight": 0, "streams": 0, "coalesced": 2}
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test that a failure is raised in every waiting caller"""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(flights.call("key", work), flights.call("key", work),
+                                       return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the shared work keeps running while someone still waits"""
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "answer"
+
+        first = asyncio.create_task(flights.call("key", work))
+        second = asyncio.create_task(flights.call("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "answer"
+
+    @pytest.mark.asyncio
+    async def test_call_after_last_caller_left_starts_afresh(self):
+        """Test that a caller arriving while abandoned work is being cancelled does not join it"""
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        first = asyncio.create_task(flights.call("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        assert await flights.call("key", work) == "answer"
+        assert len(calls) == 2
+        assert flights.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_late_stream_subscriber_gets_all_events(self):
+        """Test that a second subscriber replays earlier events and follows the live ones"""
+        flights = SingleFlight()
+        started = asyncio.Event()
+        release = asyncio.Event()
+        produced = []
+
+        async def events():
+            produced.append(1)
+            yield "Hel"
+            started.set()
+            await release.wait()
+            yield "lo"
+
+        async def collect():
+            return [event async for event in flights.stream("key", events)]
+
+        first = asyncio.create_task(collect())
+        await started.wait()
+        second = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await first == ["Hel", "lo"]
+        assert await second == ["Hel", "lo"]
+        assert len(produced) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_is_cancelled_when_last_subscriber_leaves(self):
+        """Test that the producer stops once nobody listens"""
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def events():
+            try:
+                yield "first"
+                await asyncio.sleep(10)
+                yield "never"
+            finally:
+                cancelled.set()
+
+        stream = flights.stream("key", events)
+        assert await stream.__anext__() == "first"
+        await stream.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert flights.stats()["streams"] == 0
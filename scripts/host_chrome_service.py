@@ -1,35 +1,128 @@
 #!/usr/bin/env python3
 """
-Host Chrome Service - Runs on HOST to start Chrome when requested by CONTAINER
+Host Chrome Service - Runs on HOST to start and manage Chrome for the CONTAINER
+
+One asyncio server speaking the length-prefixed JSON protocol of
+container/mcp_server/host_protocol.py. Connections are persistent and carry
+any number of concurrent commands:
+
+    start           start Chrome on a debug port (or adopt a running one), wait until ready
+    start-pool      start Chrome instances on consecutive debug ports of the port range
+    stop            stop a Chrome instance this service started
+    status          state of one debug port, or of the service
+    list-instances  all known Chrome instances
+    wait-ready      wait until the DevTools endpoint of a port answers
+
+Each instance needs a user data directory of its own. With --profile, every
+instance gets a copy of that (logged-in) profile, made when the instance
+first starts; without it the default debug port keeps Chrome's default
+profile and further ports start from empty directories.
 """
-import socket
-import subprocess
+import argparse
+import asyncio
+import inspect
 import json
-import sys
 import os
 import platform
-import logging
-import threading
+import shutil
+import subprocess
+import sys
 import time
-from typing import Optional
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# The DevTools probe and the protocol are shared with the container (standard library only)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'container'))
+from mcp_server.cdp_probe import DEFAULT_PROBE_TIMEOUT, fetch_version, probe_cdp  # noqa: E402
+from mcp_server.host_protocol import (  # noqa: E402
+    DEFAULT_SERVICE_PORT, ProtocolError, encode_message, read_message, write_message
+)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("host-chrome-service")
 
+DEFAULT_DEBUG_PORT = 9222
+DEFAULT_PORT_RANGE = (DEFAULT_DEBUG_PORT, DEFAULT_DEBUG_PORT + 7)
+# Where the per-instance user data directories live
+DEFAULT_DATA_ROOT = os.path.join(os.path.expanduser("~"), ".terminail", "chrome_instances")
+# Profile files not worth copying, or that would make Chrome think the profile is in use
+PROFILE_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "*.lock", "Cache", "Code Cache", "GPUCache", "ShaderCache",
+    "GrShaderCache", "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache", "Crashpad", "Crash Reports"
+)
+# How long stop waits for Chrome to exit before killing it (seconds)
+STOP_TIMEOUT = 5.0
+# Upper bound of a client supplied readiness timeout (seconds)
+MAX_WAIT_TIMEOUT = 120.0
+
+class CommandError(Exception):
+    """A command that cannot be carried out; reported to the client"""
+
+@dataclass
+class ChromeInstance:
+    """A Chrome serving DevTools on a debug port"""
+    port: int
+    process: Optional[asyncio.subprocess.Process] = None
+    user_data_dir: Optional[str] = None
+    websocket_url: Optional[str] = None
+    browser: str = ""
+    started_at: float = field(default_factory=time.time)
+
+    @property
+    def managed(self) -> bool:
+        """Whether this service started the process (and may stop it)"""
+        return self.process is not None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is None or self.process.returncode is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'port': self.port,
+            'pid': self.process.pid if self.process else None,
+            'managed': self.managed,
+            'alive': self.alive,
+            'user_data_dir': self.user_data_dir,
+            'websocket_url': self.websocket_url,
+            'browser': self.browser,
+            'started_at': self.started_at
+        }
+
 class HostChromeService:
     """Service that runs on HOST to start Chrome when requested by CONTAINER"""
-    
-    def __init__(self, listen_port: int = 9223, chrome_debug_port: int = 9222):
+
+    def __init__(self, listen_host: str = '127.0.0.1', listen_port: int = DEFAULT_SERVICE_PORT,
+                 chrome_debug_port: int = DEFAULT_DEBUG_PORT, port_range: Tuple[int, int] = DEFAULT_PORT_RANGE,
+                 profile: Optional[str] = None, data_root: str = DEFAULT_DATA_ROOT):
+        self.listen_host = listen_host
         self.listen_port = listen_port
         self.chrome_debug_port = chrome_debug_port
-        self.server_socket: Optional[socket.socket] = None
-        self.running = False
-    
+        # Debug ports start-pool may use, inclusive
+        self.port_range = port_range
+        # Logged-in profile cloned for every instance
+        self.profile = profile
+        self.data_root = data_root
+        self.instances: Dict[int, ChromeInstance] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.started_at = time.time()
+        # Serializes start/stop per debug port, concurrent starts share one Chrome
+        self._port_locks: Dict[int, asyncio.Lock] = {}
+        self.commands: Dict[str, Callable[..., Awaitable[Dict[str, Any]]]] = {
+            'start': self.start_chrome,
+            'start-pool': self.start_pool,
+            'stop': self.stop_chrome,
+            'status': self.status,
+            'list-instances': self.list_instances,
+            'wait-ready': self.wait_ready
+        }
+
     def _find_chrome_executable(self) -> Optional[str]:
         """Find Chrome executable on the HOST system"""
         system = platform.system()
         paths = []
-        
+
         if system == "Windows":
             paths = [
                 "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
@@ -45,143 +138,348 @@ class HostChromeService:
                 "/usr/bin/chromium-browser",
                 "/usr/bin/chromium"
             ]
-        
+
         for path in paths:
             if os.path.exists(path):
                 return path
         return None
-    
-    def start_chrome_on_host(self) -> dict:
-        """Start Chrome on the HOST machine"""
+
+    def _port(self, port: Any = None) -> int:
+        if port is None:
+            return self.chrome_debug_port
+        try:
+            port = int(port)
+        except (TypeError, ValueError):
+            raise CommandError(f"Invalid port: {port!r}")
+        if not 0 < port < 65536:
+            raise CommandError(f"Invalid port: {port}")
+        return port
+
+    @staticmethod
+    def _timeout(timeout: Any) -> float:
+        if timeout is None:
+            return DEFAULT_PROBE_TIMEOUT
         try:
+            return max(0.0, min(float(timeout), MAX_WAIT_TIMEOUT))
+        except (TypeError, ValueError):
+            raise CommandError(f"Invalid timeout: {timeout!r}")
+
+    def _lock(self, port: int) -> asyncio.Lock:
+        return self._port_locks.setdefault(port, asyncio.Lock())
+
+    def _user_data_dir(self, port: int) -> Optional[str]:
+        """User data directory of the instance on port, cloned from the profile on first use (blocking)"""
+        if not self.profile and port == self.chrome_debug_port:
+            # Chrome's default profile, as started by hand
+            return None
+        user_data_dir = os.path.join(self.data_root, f"instance-{port}")
+        if not os.path.isdir(user_data_dir):
+            if self.profile:
+                logger.info(f"Cloning profile {self.profile} to {user_data_dir}")
+                shutil.copytree(self.profile, user_data_dir, ignore=PROFILE_IGNORE)
+            else:
+                os.makedirs(user_data_dir)
+        return user_data_dir
+
+    async def _fetch_version(self, port: int):
+        return await asyncio.get_running_loop().run_in_executor(None, fetch_version, '127.0.0.1', port)
+
+    async def start_chrome(self, port: Any = None, headless: bool = False, timeout: Any = None) -> Dict[str, Any]:
+        """Start Chrome on the HOST machine, answering once its DevTools endpoint is usable"""
+        port = self._port(port)
+        timeout = self._timeout(timeout)
+        async with self._lock(port):
             # Check if Chrome is already running
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            result = sock.connect_ex(('127.0.0.1', self.chrome_debug_port))
-            sock.close()
-            
-            if result == 0:
-                logger.info(f"Chrome is already running on port {self.chrome_debug_port}")
-                return {'success': True, 'message': 'Chrome already running', 'port': self.chrome_debug_port}
-            
+            endpoint = await self._fetch_version(port)
+            if endpoint:
+                instance = self.instances.get(port)
+                if instance is None or not instance.alive:
+                    # Started by hand or by an earlier run of this service
+                    instance = self.instances[port] = ChromeInstance(port=port)
+                instance.websocket_url, instance.browser = endpoint.websocket_url, endpoint.browser
+                logger.info(f"Chrome is already running on port {port}")
+                return {'message': 'Chrome already running', **instance.to_dict()}
+
             # Find Chrome executable
             chrome_path = self._find_chrome_executable()
             if not chrome_path:
-                logger.error("Chrome executable not found on host")
-                return {'success': False, 'error': 'Chrome executable not found on host'}
-            
+                raise CommandError('Chrome executable not found on host')
+            loop = asyncio.get_running_loop()
+            try:
+                user_data_dir = await loop.run_in_executor(None, self._user_data_dir, port)
+            except OSError as e:
+                raise CommandError(f"Could not prepare the user data directory for port {port}: {e}")
+
             # Build Chrome command
             cmd = [
                 chrome_path,
-                f"--remote-debugging-port={self.chrome_debug_port}",
+                f"--remote-debugging-port={port}",
                 "--no-first-run",
                 "--no-default-browser-check",
                 "--disable-extensions",
                 "--disable-plugins"
             ]
-            
+            if user_data_dir:
+                cmd.append(f"--user-data-dir={user_data_dir}")
+            if headless:
+                cmd.append("--headless=new")
+
             # Start Chrome process
+            kwargs = {}
             if platform.system() == "Windows":
-                subprocess.Popen(
-                    cmd,
-                    creationflags=subprocess.CREATE_NEW_PROCESS_GROUP,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
+                kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+                **kwargs
+            )
+            instance = self.instances[port] = ChromeInstance(port=port, process=process, user_data_dir=user_data_dir)
+
+            # Answer as soon as the DevTools endpoint is usable
+            try:
+                endpoint = await probe_cdp('127.0.0.1', port, timeout, is_alive=lambda: process.returncode is None)
+            except BaseException:
+                await self._discard(port, process)
+                raise
+            if not endpoint:
+                logger.error(f"Chrome did not open its DevTools endpoint on port {port}")
+                # Do not leave a Chrome behind that would count towards the pool
+                await self._discard(port, process)
+                raise CommandError('Chrome did not become ready')
+            instance.websocket_url, instance.browser = endpoint.websocket_url, endpoint.browser
+
+            logger.info(f"Chrome started on host with debug port {port}")
+            return {'message': 'Chrome started', **instance.to_dict()}
+
+    async def start_pool(self, count: Any = 1, port: Any = None, headless: bool = False,
+                         timeout: Any = None) -> Dict[str, Any]:
+        """Start count instances on consecutive debug ports from port, concurrently
+
+        Succeeds when at least one instance is ready; the others are reported
+        under errors by port.
+        """
+        first = self._port(port)
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            raise CommandError(f"Invalid count: {count!r}")
+        low, high = self.port_range
+        if count < 1 or first < low or first + count - 1 > high:
+            raise CommandError(f"{count} instances from port {first} do not fit the port range {low}-{high}")
+
+        ports = list(range(first, first + count))
+        results = await asyncio.gather(
+            *(self.start_chrome(port, headless, timeout) for port in ports), return_exceptions=True
+        )
+        instances, errors = [], {}
+        for port, result in zip(ports, results):
+            if isinstance(result, BaseException):
+                errors[str(port)] = str(result)
             else:
-                subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-            
-            # Wait a bit for Chrome to start
-            time.sleep(3)
-            
-            logger.info(f"Chrome started on host with debug port {self.chrome_debug_port}")
-            return {'success': True, 'message': 'Chrome started', 'port': self.chrome_debug_port}
-            
-        except Exception as e:
-            logger.error(f"Failed to start Chrome on host: {e}")
-            return {'success': False, 'error': str(e)}
-    
-    def handle_client(self, client_socket, address):
-        """Handle a client connection"""
+                instances.append(result)
+        if not instances:
+            raise CommandError(f"No Chrome instance became ready: {errors}")
+        logger.info(f"{len(instances)} of {count} Chrome instances ready")
+        return {'instances': instances, 'errors': errors}
+
+    async def stop_chrome(self, port: Any = None) -> Dict[str, Any]:
+        """Stop a Chrome instance started by this service"""
+        port = self._port(port)
+        async with self._lock(port):
+            instance = self.instances.get(port)
+            if instance is None:
+                raise CommandError(f"No Chrome instance on port {port}")
+            if not instance.managed:
+                raise CommandError(f"Chrome on port {port} was not started by this service")
+            process = instance.process
+            await self._terminate(process)
+            del self.instances[port]
+            logger.info(f"Chrome on port {port} stopped")
+            return {'message': 'Chrome stopped', 'port': port, 'returncode': process.returncode}
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process):
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=STOP_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+    async def _discard(self, port: int, process: asyncio.subprocess.Process):
+        """Stop a Chrome that failed to start and forget it"""
+        if self.instances.get(port) is not None and self.instances[port].process is process:
+            del self.instances[port]
         try:
-            data = client_socket.recv(1024)
-            if data:
-                request = json.loads(data.decode('utf-8'))
-                logger.info(f"Received request from {address}: {request}")
-                
-                if request.get('action') == 'start_chrome':
-                    result = self.start_chrome_on_host()
-                    response = json.dumps(result)
-                    client_socket.send(response.encode('utf-8'))
-                else:
-                    response = json.dumps({'error': 'Unknown action'})
-                    client_socket.send(response.encode('utf-8'))
-        except Exception as e:
-            logger.error(f"Error handling client {address}: {e}")
-            error_response = json.dumps({'error': str(e)})
-            client_socket.send(error_response.encode('utf-8'))
-        finally:
-            client_socket.close()
-    
-    def start_service(self):
-        """Start the TCP service to listen for Chrome start requests"""
+            await self._terminate(process)
+        except ProcessLookupError:
+            pass
+
+    async def status(self, port: Any = None) -> Dict[str, Any]:
+        """Status of the debug port, or of the whole service when no port is given"""
+        if port is None:
+            return {
+                'listen_port': self.listen_port,
+                'port_range': list(self.port_range),
+                'uptime': time.time() - self.started_at,
+                'instances': len(self.instances)
+            }
+        port = self._port(port)
+        endpoint = await self._fetch_version(port)
+        instance = self.instances.get(port)
+        return {
+            **(instance.to_dict() if instance else {'port': port, 'managed': False}),
+            'ready': endpoint is not None,
+            'websocket_url': endpoint.websocket_url if endpoint else None
+        }
+
+    async def list_instances(self) -> Dict[str, Any]:
+        """All Chrome instances known to this service"""
+        # Forget instances whose process has exited
+        for port in [port for port, instance in self.instances.items() if not instance.alive]:
+            del self.instances[port]
+        return {'instances': [instance.to_dict() for instance in self.instances.values()]}
+
+    async def wait_ready(self, port: Any = None, timeout: Any = None) -> Dict[str, Any]:
+        """Wait until the DevTools endpoint of a port answers"""
+        port = self._port(port)
+        instance = self.instances.get(port)
+        is_alive = (lambda: instance.alive) if instance and instance.managed else None
+        endpoint = await probe_cdp('127.0.0.1', port, self._timeout(timeout), is_alive=is_alive)
+        if not endpoint:
+            raise CommandError(f"Chrome on port {port} is not ready")
+        return {'port': port, 'ready': True, 'websocket_url': endpoint.websocket_url, 'browser': endpoint.browser}
+
+    async def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request and build its response"""
+        request_id = request.get('id')
+        command = request.get('command')
+        handler = self.commands.get(command)
+        if handler is None:
+            return {'id': request_id, 'ok': False, 'error': f"Unknown command: {command}"}
+        arguments = {key: value for key, value in request.items() if key not in ('id', 'command')}
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind(('127.0.0.1', self.listen_port))
-            self.server_socket.listen(5)
-            self.running = True
-            
-            logger.info(f"Host Chrome Service listening on 127.0.0.1:{self.listen_port}")
-            logger.info("Send {'action': 'start_chrome'} to start Chrome on host")
-            logger.info("Make sure to run your container with: podman run -p 9223:9223 ...")
-            
-            while self.running:
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    # Handle each client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self.handle_client, 
-                        args=(client_socket, address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.error:
-                    if self.running:
-                        logger.error("Socket error in service loop")
-                    break
-                    
+            inspect.signature(handler).bind(**arguments)
+        except TypeError as e:
+            return {'id': request_id, 'ok': False, 'error': f"Invalid arguments for {command}: {e}"}
+        try:
+            result = await handler(**arguments)
+        except CommandError as e:
+            return {'id': request_id, 'ok': False, 'error': str(e)}
         except Exception as e:
-            logger.error(f"Service error: {e}")
+            logger.error(f"{command} failed: {e}")
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+        return {'id': request_id, 'ok': True, 'result': result}
+
+    async def _respond(self, request: Dict[str, Any], writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        response = await self.execute(request)
+        async with write_lock:
+            try:
+                await write_message(writer, response)
+            except (OSError, ProtocolError) as e:
+                logger.warning(f"Could not answer {request.get('command')}: {e}")
+
+    async def _handle_legacy(self, first: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer one unframed {'action': 'start_chrome'} request of an older container"""
+        data = first + await reader.read(1024)
+        try:
+            request = json.loads(data.decode('utf-8'))
+        except ValueError as e:
+            response = {'success': False, 'error': f"Invalid request: {e}"}
+        else:
+            if request.get('action') == 'start_chrome':
+                result = await self.execute({'command': 'start', 'port': request.get('debug_port')})
+                response = {'success': result['ok'], **result.get('result', {})}
+                if not result['ok']:
+                    response['error'] = result['error']
+            else:
+                response = {'success': False, 'error': 'Unknown action'}
+        writer.write(json.dumps(response).encode('utf-8'))
+        await writer.drain()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one persistent connection, running its requests concurrently"""
+        address = writer.get_extra_info('peername')
+        logger.info(f"Client connected: {address}")
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            first = await reader.readexactly(1)
+            if first == b'{':
+                await self._handle_legacy(first, reader, writer)
+                return
+            header = first
+            while True:
+                request = await read_message(reader, header)
+                header = b""
+                logger.info(f"Request from {address}: {request}")
+                task = asyncio.create_task(self._respond(request, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except asyncio.IncompleteReadError:
+            pass
+        except ProtocolError as e:
+            logger.warning(f"Closing connection to {address}: {e}")
+            async with write_lock:
+                writer.write(encode_message({'id': None, 'ok': False, 'error': str(e)}))
+        except OSError as e:
+            logger.warning(f"Connection to {address} failed: {e}")
         finally:
-            if self.server_socket:
-                self.server_socket.close()
-    
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            logger.info(f"Client disconnected: {address}")
+
+    async def start_service(self):
+        """Listen for container requests until cancelled"""
+        self.server = await asyncio.start_server(self.handle_client, self.listen_host, self.listen_port)
+        logger.info(f"Host Chrome Service listening on {self.listen_host}:{self.listen_port}")
+        logger.info(f"Make sure to run your container with: podman run -p {self.listen_port}:{self.listen_port} ...")
+        async with self.server:
+            await self.server.serve_forever()
+
     def stop_service(self):
-        """Stop the service"""
-        self.running = False
-        if self.server_socket:
-            self.server_socket.close()
+        """Stop accepting connections; Chrome instances keep running"""
+        if self.server:
+            self.server.close()
 
-def main():
+def port_range(value: str) -> Tuple[int, int]:
+    """Parse FIRST-LAST"""
+    first, _, last = value.partition('-')
+    try:
+        low, high = int(first), int(last or first)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid port range: {value}")
+    if not 0 < low <= high < 65536:
+        raise argparse.ArgumentTypeError(f"invalid port range: {value}")
+    return low, high
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point"""
-    if len(sys.argv) > 1 and sys.argv[1] == '--start-chrome':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--start-chrome', nargs='?', type=int, const=DEFAULT_DEBUG_PORT, metavar='DEBUG_PORT',
+                        help="start Chrome once and exit instead of running the service")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVICE_PORT, help="port to listen on")
+    parser.add_argument('--debug-port', type=int, default=DEFAULT_DEBUG_PORT, help="default Chrome debug port")
+    parser.add_argument('--port-range', type=port_range, default=DEFAULT_PORT_RANGE, metavar='FIRST-LAST',
+                        help="debug ports available to start-pool (default: %d-%d)" % DEFAULT_PORT_RANGE)
+    parser.add_argument('--profile', help="logged-in user data directory to clone for every instance")
+    parser.add_argument('--data-root', default=DEFAULT_DATA_ROOT, help="where instance user data directories live")
+    args = parser.parse_args(argv)
+
+    service = HostChromeService(args.host, args.port, args.debug_port, args.port_range, args.profile, args.data_root)
+    if args.start_chrome is not None:
         # Direct command to start Chrome
-        service = HostChromeService()
-        result = service.start_chrome_on_host()
-        print(json.dumps(result))
-        sys.exit(0 if result['success'] else 1)
-    else:
-        # Start service mode
-        service = HostChromeService()
-        try:
-            service.start_service()
-        except KeyboardInterrupt:
-            logger.info("Service stopped by user")
-            service.stop_service()
+        result = asyncio.run(service.execute({'command': 'start', 'port': args.start_chrome}))
+        print(json.dumps(result.get('result') or {'error': result.get('error')}))
+        sys.exit(0 if result['ok'] else 1)
+    try:
+        asyncio.run(service.start_service())
+    except KeyboardInterrupt:
+        logger.info("Service stopped by user")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()